@@ -0,0 +1,323 @@
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+def _month_of(date: Optional[str]) -> Optional[str]:
+    return date[:7] if date else None
+
+def _collection_month(row: Dict[str, Any]) -> Optional[str]:
+    """Ledger month (YYYY-MM) of a payment: when it was paid, else when it was due"""
+    return _month_of(row.get('paidDate') or row.get('dueDate'))
+
+def _collected(row: Dict[str, Any]) -> float:
+    """Amount a payment contributes to society collections"""
+    return float(row.get('amountPaid') or 0) if row.get('status') == 'paid' else 0.0
+
+# Tracked tables: the dimensions a row is counted under and the measures summed
+TRACKED: Dict[str, Dict[str, Dict[str, Callable[[Dict[str, Any]], Any]]]] = {
+    'houses': {
+        'dimensions': {'status': lambda row: row.get('status')},
+        'measures': {},
+    },
+    'maintenance_payments': {
+        'dimensions': {
+            'status': lambda row: row.get('status'),
+            'month': lambda row: row.get('month'),
+            'month_status': lambda row: (row.get('month'), row.get('status')),
+            'ledger_month': _collection_month,
+        },
+        'measures': {
+            'amount': lambda row: row.get('amount'),
+            'amountPaid': lambda row: row.get('amountPaid'),
+            'collected': _collected,
+        },
+    },
+    'expenditures': {
+        'dimensions': {'category': lambda row: row.get('category'), 'month': lambda row: _month_of(row.get('date'))},
+        'measures': {'amount': lambda row: row.get('amount')},
+    },
+}
+
+# Columns needed to recompute the aggregates from scratch
+SOURCE_COLUMNS = {
+    'houses': ['status'],
+    'maintenance_payments': ['status', 'month', 'amount', 'amountPaid', 'paidDate', 'dueDate'],
+    'expenditures': ['category', 'date', 'amount'],
+}
+
+PAYMENT_STATUSES = ('pending', 'partial', 'paid', 'overdue')
+
+TOLERANCE = 0.005
+
+# Seconds between checks that the tables still hold what the counters say
+CHECK_INTERVAL = float(os.getenv("AGGREGATES_CHECK_INTERVAL", "5"))
+
+Contribution = Tuple[Tuple[Tuple[str, Any], ...], Dict[str, float]]
+
+class AggregateStore:
+    """Incrementally maintained summary counters.
+
+    For every tracked table the store keeps a count and measure sums in
+    total and per dimension value (houses per status, payments per status,
+    month and month/status, expenditures per category and month). The
+    contribution of each row is remembered by id, so an update or delete
+    subtracts exactly what the row added before without reading it back
+    from the database.
+
+    Counters live in the process; the store is built from one narrow scan
+    on first use and kept current through the repository's write listener.
+    Writes this process never hears about (another worker, a dashboard
+    edit) are caught through the database's per-table change counter (see
+    TableState): at most every `check_interval` seconds it is compared with
+    the version read at the last build plus one per row this process has
+    written since, and any difference triggers a rebuild.
+    """
+
+    def __init__(self, check_interval: float = CHECK_INTERVAL):
+        self._lock = threading.RLock()
+        self._built = False
+        self._rows: Dict[str, Dict[Any, Contribution]] = {}
+        self._counters: Dict[str, Dict[str, Dict[Any, Dict[str, float]]]] = {}
+        self.check_interval = check_interval
+        self._versions: Dict[str, int] = {}
+        self._checked_at = 0.0
+
+    @staticmethod
+    def _contribution(table: str, row: Dict[str, Any]) -> Contribution:
+        spec = TRACKED[table]
+        keys = tuple((dim, extract(row)) for dim, extract in spec['dimensions'].items())
+        measures = {'count': 1.0}
+        for name, extract in spec['measures'].items():
+            measures[name] = float(extract(row) or 0)
+        return keys, measures
+
+    @staticmethod
+    def _apply(counters: Dict, contribution: Contribution, sign: int) -> None:
+        keys, measures = contribution
+        for dim, key in (('total', None),) + keys:
+            buckets = counters.setdefault(dim, {})
+            bucket = buckets.setdefault(key, {})
+            for name, value in measures.items():
+                bucket[name] = bucket.get(name, 0.0) + sign * value
+            if bucket['count'] <= 0:
+                del buckets[key]
+
+    @classmethod
+    def _compute(cls, repo) -> Tuple[Dict, Dict]:
+        from repository import ListQuery
+
+        rows: Dict[str, Dict[Any, Contribution]] = {}
+        counters: Dict[str, Dict] = {}
+        for table in TRACKED:
+            rows[table], counters[table] = {}, {}
+            for row in repo.iter_rows(table, ListQuery(columns=SOURCE_COLUMNS[table])):
+                contribution = cls._contribution(table, row)
+                rows[table][row['id']] = contribution
+                cls._apply(counters[table], contribution, 1)
+        return rows, counters
+
+    @staticmethod
+    def _read_versions(repo) -> Dict[str, int]:
+        return {table: repo.table_state(table).version for table in TRACKED}
+
+    # Maintenance
+    def rebuild(self, repo) -> None:
+        """Recompute every counter from the raw tables"""
+        with self._lock:
+            # Read before the scan: a write racing it shows up as a change at the next check
+            versions = self._read_versions(repo)
+            self._rows, self._counters = self._compute(repo)
+            self._versions = versions
+            self._checked_at = time.monotonic()
+            self._built = True
+        logger.info("Aggregate store rebuilt")
+
+    def ensure_built(self, repo) -> None:
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self.rebuild(repo)
+
+    def ensure_current(self, repo) -> None:
+        """Build on first use, then rebuild if the tables changed behind the store's back"""
+        self.ensure_built(repo)
+        with self._lock:
+            if time.monotonic() - self._checked_at < self.check_interval:
+                return
+            self._checked_at = time.monotonic()
+        versions = self._read_versions(repo)
+        with self._lock:
+            changed = [table for table in TRACKED if versions[table] != self._versions.get(table)]
+            if changed:
+                logger.info(f"Aggregate store is stale ({', '.join(changed)} written elsewhere), rebuilding")
+                self.rebuild(repo)
+
+    def verify(self, repo) -> List[Dict[str, Any]]:
+        """Recompute from scratch and list every counter that has drifted"""
+        self.ensure_built(repo)
+        # Writers wait for the lock, so the scan and the counters describe the same rows
+        with self._lock:
+            _, expected = self._compute(repo)
+            actual = self._counters
+            drift = []
+            for table in TRACKED:
+                for dim in set(expected[table]) | set(actual.get(table, {})):
+                    exp_buckets = expected[table].get(dim, {})
+                    act_buckets = actual.get(table, {}).get(dim, {})
+                    for key in set(exp_buckets) | set(act_buckets):
+                        exp, act = exp_buckets.get(key, {}), act_buckets.get(key, {})
+                        for name in set(exp) | set(act):
+                            if abs(exp.get(name, 0.0) - act.get(name, 0.0)) > TOLERANCE:
+                                drift.append({
+                                    "table": table,
+                                    "dimension": dim,
+                                    "key": key,
+                                    "measure": name,
+                                    "expected": round(exp.get(name, 0.0), 2),
+                                    "actual": round(act.get(name, 0.0), 2),
+                                })
+        return drift
+
+    # Write listener
+    def on_write(self, table: str, op: str, row_id: Any, row: Optional[Dict[str, Any]] = None) -> None:
+        if table not in TRACKED:
+            return
+        with self._lock:
+            if not self._built:
+                return
+            previous = self._rows[table].pop(row_id, None)
+            if previous is not None:
+                self._apply(self._counters[table], previous, -1)
+            if op != 'delete' and row is not None:
+                contribution = self._contribution(table, row)
+                self._rows[table][row_id] = contribution
+                self._apply(self._counters[table], contribution, 1)
+            # Each row written bumps the table's version once
+            if table in self._versions:
+                self._versions[table] += 1
+
+    # Reads
+    def _bucket(self, table: str, dim: str = 'total', key: Any = None) -> Dict[str, float]:
+        return dict(self._counters[table].get(dim, {}).get(key, {}))
+
+    def house_summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "total": int(self._bucket('houses').get('count', 0)),
+                "occupied": int(self._bucket('houses', 'status', 'occupied').get('count', 0)),
+                "vacant": int(self._bucket('houses', 'status', 'vacant').get('count', 0)),
+            }
+
+    def payment_summary(self, month: Optional[str] = None) -> Dict[str, float]:
+        with self._lock:
+            if month is None:
+                total = self._bucket('maintenance_payments')
+                statuses = {s: self._bucket('maintenance_payments', 'status', s) for s in PAYMENT_STATUSES}
+            else:
+                total = self._bucket('maintenance_payments', 'month', month)
+                statuses = {s: self._bucket('maintenance_payments', 'month_status', (month, s)) for s in PAYMENT_STATUSES}
+
+        def outstanding(*names):
+            return sum(statuses[n].get('amount', 0.0) - statuses[n].get('amountPaid', 0.0) for n in names)
+
+        total_amount = total.get('amount', 0.0)
+        total_collected = statuses['paid'].get('amountPaid', 0.0)
+        collection_rate = (total_collected / total_amount * 100) if total_amount > 0 else 0
+        return {
+            "total": total_amount,
+            "collected": total_collected,
+            "pending": outstanding('pending', 'partial'),
+            "overdue": outstanding('overdue'),
+            "collectionRate": round(collection_rate, 2)
+        }
+
+    def expenditure_summary(self) -> Dict[str, Any]:
+        with self._lock:
+            by_category = self._counters['expenditures'].get('category', {})
+            total_expenditure = self._bucket('expenditures').get('amount', 0.0)
+            total_collection = self._bucket('maintenance_payments').get('collected', 0.0)
+            return {
+                "totalExpenditure": total_expenditure,
+                "totalCollection": total_collection,
+                "remainingBalance": total_collection - total_expenditure,
+                "categoryBreakdown": {category: bucket['amount'] for category, bucket in by_category.items()},
+            }
+
+    # Ledger
+    def ledger(self) -> Dict[str, Any]:
+        """Society balance (collections minus expenditures) with a per-month running balance"""
+        with self._lock:
+            collected = self._counters['maintenance_payments'].get('ledger_month', {})
+            spent = self._counters['expenditures'].get('month', {})
+            by_month = {
+                month: (collected.get(month, {}).get('collected', 0.0), spent.get(month, {}).get('amount', 0.0))
+                for month in set(collected) | set(spent)
+            }
+            total_collection = self._bucket('maintenance_payments').get('collected', 0.0)
+            total_expenditure = self._bucket('expenditures').get('amount', 0.0)
+        return _ledger_report(total_collection, total_expenditure, by_month)
+
+def _ledger_report(total_collection: float, total_expenditure: float,
+                   by_month: Dict[Optional[str], Tuple[float, float]]) -> Dict[str, Any]:
+    months, running = [], 0.0
+    for month in sorted(by_month, key=lambda m: m or ''):
+        collection, expenditure = by_month[month]
+        if not collection and not expenditure:
+            continue
+        running += collection - expenditure
+        months.append({
+            "month": month,
+            "collection": collection,
+            "expenditure": expenditure,
+            "net": collection - expenditure,
+            "runningBalance": running,
+        })
+    return {
+        "totalCollection": total_collection,
+        "totalExpenditure": total_expenditure,
+        "balance": total_collection - total_expenditure,
+        "months": months,
+    }
+
+def reconcile_ledger(repo, store: AggregateStore) -> Dict[str, Any]:
+    """Recompute the ledger straight from the raw rows and compare it with the store"""
+    from repository import ListQuery
+
+    store.ensure_built(repo)
+    # Same lock as the writers, so the scan and the store describe the same rows
+    with store._lock:
+        by_month: Dict[Optional[str], List[float]] = {}
+        total_collection = total_expenditure = 0.0
+        payments = repo.iter_rows('maintenance_payments', ListQuery(columns=['status', 'amountPaid', 'paidDate', 'dueDate']))
+        for row in payments:
+            if row.get('status') == 'paid':
+                amount = float(row.get('amountPaid') or 0)
+                total_collection += amount
+                by_month.setdefault(_collection_month(row), [0.0, 0.0])[0] += amount
+        for row in repo.iter_rows('expenditures', ListQuery(columns=['amount', 'date'])):
+            amount = float(row.get('amount') or 0)
+            total_expenditure += amount
+            by_month.setdefault(_month_of(row.get('date')), [0.0, 0.0])[1] += amount
+        expected = _ledger_report(total_collection, total_expenditure, {m: tuple(v) for m, v in by_month.items()})
+        actual = store.ledger()
+    mismatches = []
+    for key in ("totalCollection", "totalExpenditure", "balance"):
+        if abs(expected[key] - actual[key]) > TOLERANCE:
+            mismatches.append({"field": key, "expected": round(expected[key], 2), "actual": round(actual[key], 2)})
+    expected_months = {m["month"]: m for m in expected["months"]}
+    actual_months = {m["month"]: m for m in actual["months"]}
+    for month in sorted(set(expected_months) | set(actual_months), key=lambda m: m or ''):
+        exp, act = expected_months.get(month, {}), actual_months.get(month, {})
+        for key in ("collection", "expenditure", "runningBalance"):
+            if abs(exp.get(key, 0.0) - act.get(key, 0.0)) > TOLERANCE:
+                mismatches.append({
+                    "month": month,
+                    "field": key,
+                    "expected": round(exp.get(key, 0.0), 2),
+                    "actual": round(act.get(key, 0.0), 2),
+                })
+    return {"ok": not mismatches, "mismatches": mismatches, "balance": actual["balance"]}
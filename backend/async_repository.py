@@ -0,0 +1,64 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+from repository import SocietyRepository
+
+logger = logging.getLogger(__name__)
+
+class DatabaseTimeoutError(Exception):
+    """Raised when a database call does not finish within its timeout"""
+
+class AsyncRepository:
+    """Awaitable facade over a synchronous SocietyRepository.
+
+    Every repository method is exposed as a coroutine that runs the blocking
+    call on a bounded thread pool, so a slow query only occupies one worker
+    thread instead of freezing the event loop. Calls beyond `max_workers`
+    queue up; each call is abandoned after `timeout` seconds (the worker
+    thread finishes in the background and is then reused).
+    """
+
+    def __init__(self, repo: SocietyRepository, max_workers: int = 8, timeout: Optional[float] = 10.0):
+        self.repo = repo
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db")
+
+    async def run(self, fn: Callable, *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        # Run in a copy of the caller's context so request-scoped state (the call trace) follows the call
+        context = contextvars.copy_context()
+        future = loop.run_in_executor(self._executor, functools.partial(context.run, fn, *args, **kwargs))
+        try:
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            name = getattr(fn, '__name__', repr(fn))
+            logger.error(f"Database call {name} timed out after {self.timeout}s")
+            raise DatabaseTimeoutError(f"{name} timed out after {self.timeout}s")
+
+    async def prestart(self, fn: Callable[[], Any]) -> None:
+        """Start every worker thread, running fn once on each (opens per-thread connections)"""
+        barrier = threading.Barrier(self.max_workers)
+
+        def on_worker():
+            # Hold this worker until all are busy, so each call starts a new thread
+            barrier.wait(timeout=self.timeout)
+            fn()
+        await asyncio.gather(*(self.run(on_worker) for _ in range(self.max_workers)))
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.repo, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return await self.run(attr, *args, **kwargs)
+        return call
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
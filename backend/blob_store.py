@@ -0,0 +1,176 @@
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ROOT_DIR = Path(__file__).parent
+
+# Largest attachment accepted by the upload endpoint
+MAX_ATTACHMENT_BYTES = int(os.getenv("ATTACHMENT_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# Seconds an unreferenced blob is kept, so an upload that stored it can still attach it
+ORPHAN_GRACE_SECONDS = float(os.getenv("ATTACHMENT_ORPHAN_GRACE", "3600"))
+
+class BlobWriter:
+    """Streams one blob to a temporary file while hashing it"""
+
+    def __init__(self, store: "BlobStore"):
+        self._store = store
+        fd, self._tmp_path = tempfile.mkstemp(dir=store.tmp_dir)
+        self._file = os.fdopen(fd, 'wb')
+        self._hash = hashlib.sha256()
+        self.size = 0
+
+    def write(self, chunk: bytes) -> None:
+        self._file.write(chunk)
+        self._hash.update(chunk)
+        self.size += len(chunk)
+
+    def commit(self) -> Tuple[str, int]:
+        """Move the blob to its content address and return (digest, size)"""
+        self._file.close()
+        digest = self._hash.hexdigest()
+        target = self._store.path(digest)
+        if target.exists():
+            # Same content already stored; touch it so the orphan sweep's grace period starts over
+            os.unlink(self._tmp_path)
+            os.utime(target)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self._tmp_path, target)
+        return digest, self.size
+
+    def abort(self) -> None:
+        self._file.close()
+        if os.path.exists(self._tmp_path):
+            os.unlink(self._tmp_path)
+
+class BlobStore:
+    """Content-addressed file store: every blob lives at <root>/<ab>/<cd>/<sha256>.
+
+    Identical uploads share one file, and a blob never changes once
+    written, so its digest doubles as a strong ETag.
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.tmp_dir = self.root / 'tmp'
+
+    def path(self, digest: str) -> Path:
+        if len(digest) != 64 or any(c not in '0123456789abcdef' for c in digest):
+            raise ValueError("Invalid blob reference")
+        return self.root / digest[:2] / digest[2:4] / digest
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).exists()
+
+    def delete(self, digest: str) -> None:
+        """Remove a blob; only safe for one no row references (see sweep_orphaned_blobs)"""
+        try:
+            os.unlink(self.path(digest))
+        except FileNotFoundError:
+            pass
+
+    def blobs(self) -> Iterator[Tuple[str, float]]:
+        """(digest, modification time) of every stored blob"""
+        for path in self.root.glob('??/??/*'):
+            try:
+                yield path.name, path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+
+    def writer(self) -> BlobWriter:
+        self.tmp_dir.mkdir(parents=True, exist_ok=True)
+        return BlobWriter(self)
+
+    def put_bytes(self, data: bytes) -> Tuple[str, int]:
+        writer = self.writer()
+        try:
+            writer.write(data)
+        except Exception:
+            writer.abort()
+            raise
+        return writer.commit()
+
+_blob_store: Optional[BlobStore] = None
+
+def get_blob_store() -> BlobStore:
+    global _blob_store
+    if _blob_store is None:
+        _blob_store = BlobStore(os.getenv("ATTACHMENTS_DIR", str(ROOT_DIR / 'attachments')))
+    return _blob_store
+
+def decode_attachment_data(data: str) -> Tuple[bytes, Optional[str]]:
+    """Decode a base64 payload or data URL into (bytes, content type)"""
+    content_type = None
+    if data.startswith('data:') and ',' in data:
+        header, data = data.split(',', 1)
+        content_type = header[5:].split(';')[0] or None
+    try:
+        return base64.b64decode(data, validate=True), content_type
+    except (binascii.Error, ValueError):
+        raise ValueError("attachmentData is not valid base64")
+
+def store_inline_attachment(store: BlobStore, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Replace inline base64 `attachmentData` in an expenditure payload with a blob reference"""
+    inline = data.pop('attachmentData', None)
+    if not inline:
+        return data
+    raw, content_type = decode_attachment_data(inline)
+    if len(raw) > MAX_ATTACHMENT_BYTES:
+        raise ValueError(f"Attachment exceeds {MAX_ATTACHMENT_BYTES} bytes")
+    digest, size = store.put_bytes(raw)
+    data.update(attachmentRef=digest, attachmentSize=size)
+    if content_type:
+        data['attachmentType'] = content_type
+    return data
+
+def migrate_inline_attachments(repo, store: BlobStore, limit: int = 50, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """Move legacy base64 attachments of one page of expenditures (in id order) into the store.
+
+    Returns the counts and the cursor of the next page, None once every row was seen.
+    """
+    from repository import ListQuery
+
+    page = repo.list_expenditures(ListQuery(columns=['id', 'attachmentData', 'attachmentRef'], limit=limit, cursor=cursor))
+    migrated = failed = 0
+    for row in page.rows:
+        if not row.get('attachmentData') or row.get('attachmentRef'):
+            continue
+        try:
+            update = store_inline_attachment(store, {'attachmentData': row['attachmentData']})
+            update['attachmentData'] = None
+            repo.update_expenditure(row['id'], update)
+            migrated += 1
+        except Exception as e:
+            logger.error(f"Error migrating attachment of expenditure {row['id']}: {e}")
+            failed += 1
+    return {"migrated": migrated, "failed": failed, "nextCursor": page.next_cursor}
+
+def sweep_orphaned_blobs(repo, store: BlobStore, grace: float = ORPHAN_GRACE_SECONDS) -> Dict[str, int]:
+    """Delete blobs no expenditure references and nothing has stored for `grace` seconds.
+
+    Failed or rejected uploads leave their blob behind: an identical upload
+    may be attaching the same content at the same moment, so only this
+    sweep, with the grace period covering uploads still in flight, removes
+    them.
+    """
+    from repository import ListQuery
+
+    referenced = {row['attachmentRef'] for row in repo.iter_rows('expenditures', ListQuery(columns=['attachmentRef']))}
+    cutoff = time.time() - grace
+    deleted = kept = 0
+    for digest, modified in list(store.blobs()):
+        if digest in referenced or modified > cutoff:
+            kept += 1
+            continue
+        store.delete(digest)
+        deleted += 1
+    return {"deleted": deleted, "kept": kept}
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+# Seconds a cached row stays fresh, per table
+DEFAULT_TTLS = {
+    'houses': 300,
+    'members': 300,
+    'vehicles': 300,
+    'maintenance_payments': 60,
+    'expenditures': 120,
+}
+
+# Write generations are kept per hash slot of (table, id), so memory stays bounded
+GENERATION_SLOTS = 4096
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse "houses=300,maintenance_payments=30" into a TTL mapping"""
+    ttls = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        table, _, seconds = item.partition('=')
+        ttls[table.strip()] = float(seconds)
+    return ttls
+
+class EntityCache:
+    """Bounded LRU of rows by (table, id) with per-table TTLs.
+
+    The repository consults it before get_row() and keeps it current as a
+    write listener: an update writes the row the database returned through
+    to the cache and a delete evicts it. Inserts are not cached, so a bulk
+    insert cannot flush the hot entries. Other processes' writes are only
+    picked up once the TTL expires.
+
+    A read-through put races the writes that land while its row is being
+    read: readers take generation() before the read and pass it to put(),
+    which drops the row if a write to the key has happened since.
+    """
+
+    def __init__(self, max_entries: int = 2048, ttls: Optional[Dict[str, float]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._stats = {table: {'hits': 0, 'misses': 0} for table in self.ttls}
+        self._generations = [0] * GENERATION_SLOTS
+        self.evictions = 0
+
+    def get(self, table: str, row_id: Any) -> Optional[Dict[str, Any]]:
+        key = (table, row_id)
+        with self._lock:
+            stats = self._stats.setdefault(table, {'hits': 0, 'misses': 0})
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                stats['hits'] += 1
+                return dict(entry[1])
+            if entry is not None:
+                del self._entries[key]
+            stats['misses'] += 1
+            return None
+
+    def generation(self, table: str, row_id: Any) -> int:
+        """Write generation of a key, to pass to put() after reading its row"""
+        return self._generations[hash((table, row_id)) % GENERATION_SLOTS]
+
+    def put(self, table: str, row_id: Any, row: Dict[str, Any], generation: Optional[int] = None) -> None:
+        ttl = self.ttls.get(table, 0)
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+        key = (table, row_id)
+        with self._lock:
+            if generation is not None and self._generations[hash(key) % GENERATION_SLOTS] != generation:
+                # Written since the row was read; it may be older than what the writer cached
+                return
+            self._entries[key] = (self._clock() + ttl, dict(row))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, table: str, row_id: Any) -> None:
+        with self._lock:
+            self._entries.pop((table, row_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    # Write listener
+    def on_write(self, table: str, op: str, row_id: Any, row: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            self._generations[hash((table, row_id)) % GENERATION_SLOTS] += 1
+        if op == 'update' and row is not None:
+            self.put(table, row_id, row)
+        else:
+            self.invalidate(table, row_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(s['hits'] for s in self._stats.values())
+            misses = sum(s['misses'] for s in self._stats.values())
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": hits,
+                "misses": misses,
+                "evictions": self.evictions,
+                "hitRate": round(hits / (hits + misses), 4) if hits + misses else 0.0,
+                "tables": {table: dict(s) for table, s in self._stats.items()},
+            }
@@ -0,0 +1,160 @@
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Media types worth compressing; images, PDFs and pre-gzipped exports are not
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/', 'application/javascript')
+
+# Bodies at least this large are compressed on a worker thread
+OFFLOAD_SIZE = 256 * 1024
+
+def choose_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Preferred coding the client accepts: br, then gzip; None for identity"""
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(','):
+        name, _, params = item.strip().lower().partition(';')
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip()] = q
+    available = ('br', 'gzip') if brotli is not None else ('gzip',)
+    candidates = [(weights.get(name, weights.get('*', 0.0)), -rank, name) for rank, name in enumerate(available)]
+    q, _, name = max(candidates)
+    return name if q > 0 else None
+
+def compress(body: bytes, encoding: str, gzip_level: int = 6, brotli_quality: int = 5) -> bytes:
+    if encoding == 'br':
+        return brotli.compress(body, quality=brotli_quality)
+    return gzip.compress(body, compresslevel=gzip_level, mtime=0)
+
+class CompressedBodyCache:
+    """LRU of compressed response bodies keyed by (URL, ETag, coding), bounded in bytes.
+
+    An ETag alone does not name a body: a row ETag only encodes the row's
+    updatedAt, which every row of a batch update shares. Together with the
+    path and query string it does, so an entry can only be hit while that
+    resource is unchanged; after a write the new ETag misses and the stale
+    entry ages out.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, str, str], bytes]" = OrderedDict()
+
+    def get(self, url: str, etag: str, encoding: str) -> Optional[bytes]:
+        key = (url, etag, encoding)
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def put(self, url: str, etag: str, encoding: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        key = (url, etag, encoding)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+class CompressionMiddleware:
+    """Negotiated br/gzip compression of complete response bodies.
+
+    Bodies under `minimum_size`, already-encoded responses and streamed
+    responses (exports) pass through untouched. Compressed bodies of GET
+    responses that carry an ETag are kept in `cache` under their URL, so
+    polling a list or row that has not changed costs no compression.
+    """
+
+    def __init__(self, app, minimum_size: int = 1024, cache: Optional[CompressedBodyCache] = None,
+                 gzip_level: int = 6, brotli_quality: int = 5):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get('accept-encoding'))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message['type'] == 'http.response.start':
+                start_message = message
+                return
+            headers = MutableHeaders(scope=start_message)
+            body = message.get('body', b'')
+            content_type = headers.get('content-type', '')
+            if message.get('more_body') or 'content-encoding' in headers \
+                    or not content_type.startswith(COMPRESSIBLE_TYPES):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+            headers.add_vary_header('Accept-Encoding')
+            if len(body) < self.minimum_size:
+                await send(start_message)
+                await send(message)
+                return
+
+            etag = headers.get('etag') if scope['method'] == 'GET' and start_message['status'] == 200 else None
+            url = f"{scope['path']}?{scope.get('query_string', b'').decode('latin-1')}"
+            compressed = self.cache.get(url, etag, encoding) if self.cache is not None and etag else None
+            if compressed is None:
+                if len(body) >= OFFLOAD_SIZE:
+                    compressed = await run_in_threadpool(compress, body, encoding, self.gzip_level, self.brotli_quality)
+                else:
+                    compressed = compress(body, encoding, self.gzip_level, self.brotli_quality)
+                if self.cache is not None and etag:
+                    self.cache.put(url, etag, encoding, compressed)
+            headers['Content-Encoding'] = encoding
+            headers['Content-Length'] = str(len(compressed))
+            await send(start_message)
+            await send({'type': 'http.response.body', 'body': compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -1,9 +1,9 @@
 import os
 import logging
-from supabase import create_client, Client
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from dotenv import load_dotenv
 from pathlib import Path
+from repository import SocietyRepository, ListQuery, Page, TableState, decode_cursor, page_from_rows, query_columns
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
@@ -11,227 +11,177 @@ load_dotenv(ROOT_DIR / '.env')
 
 logger = logging.getLogger(__name__)
 
-class SupabaseDB:
-    def __init__(self):
+def _filter_value(value: Any) -> str:
+    """Quote a value for use inside a PostgREST or=(...) filter"""
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, (int, float)):
+        return str(value)
+    escaped = str(value).replace('\\', '\\\\').replace('"', '\\"')
+    return f'"{escaped}"'
+
+class SupabaseDB(SocietyRepository):
+    def __init__(self, client: Any = None):
+        super().__init__()
+        self.http_client = None
+        if client is not None:
+            # e.g. a FakeSupabaseClient for hermetic tests
+            self.supabase = client
+            return
+        from supabase import create_client
+        from supabase.lib.client_options import SyncClientOptions
+        from http_pool import get_http_client
+
         url = os.getenv("SUPABASE_URL")
         key = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-        
+
         if not url or not key:
             raise ValueError("Missing Supabase credentials")
-            
-        self.supabase: Client = create_client(url, key)
+
+        # Every client in the process shares one tuned, instrumented connection pool
+        self.http_client = get_http_client()
+        self.supabase = create_client(url, key, options=SyncClientOptions(httpx_client=self.http_client))
         logger.info("Supabase client initialized successfully")
-    
-    # Houses operations
-    def create_house(self, house_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            result = self.supabase.table('houses').insert(house_data).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error creating house: {e}")
-            raise
-    
-    def get_houses(self, limit: int = 1000) -> List[Dict[str, Any]]:
-        try:
-            result = self.supabase.table('houses').select('*').limit(limit).execute()
-            return result.data or []
-        except Exception as e:
-            logger.error(f"Error getting houses: {e}")
-            return []
-    
-    def get_house_by_id(self, house_id: str) -> Optional[Dict[str, Any]]:
-        try:
-            result = self.supabase.table('houses').select('*').eq('id', house_id).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error getting house by ID: {e}")
-            return None
-    
-    def update_house(self, house_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            result = self.supabase.table('houses').update(update_data).eq('id', house_id).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error updating house: {e}")
-            raise
-    
-    def delete_house(self, house_id: str) -> bool:
-        try:
-            result = self.supabase.table('houses').delete().eq('id', house_id).execute()
-            return len(result.data) > 0
-        except Exception as e:
-            logger.error(f"Error deleting house: {e}")
-            return False
-    
-    # Members operations
-    def create_member(self, member_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            result = self.supabase.table('members').insert(member_data).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error creating member: {e}")
-            raise
-    
-    def get_members(self, limit: int = 1000) -> List[Dict[str, Any]]:
-        try:
-            result = self.supabase.table('members').select('*').limit(limit).execute()
-            return result.data or []
-        except Exception as e:
-            logger.error(f"Error getting members: {e}")
-            return []
-    
-    def get_member_by_id(self, member_id: str) -> Optional[Dict[str, Any]]:
-        try:
-            result = self.supabase.table('members').select('*').eq('id', member_id).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error getting member by ID: {e}")
-            return None
-    
-    def update_member(self, member_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            result = self.supabase.table('members').update(update_data).eq('id', member_id).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error updating member: {e}")
-            raise
-    
-    def delete_member(self, member_id: str) -> bool:
-        try:
-            result = self.supabase.table('members').delete().eq('id', member_id).execute()
-            return len(result.data) > 0
-        except Exception as e:
-            logger.error(f"Error deleting member: {e}")
-            return False
-    
-    # Vehicles operations
-    def create_vehicle(self, vehicle_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            result = self.supabase.table('vehicles').insert(vehicle_data).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error creating vehicle: {e}")
-            raise
-    
-    def get_vehicles(self, limit: int = 1000) -> List[Dict[str, Any]]:
-        try:
-            result = self.supabase.table('vehicles').select('*').limit(limit).execute()
-            return result.data or []
-        except Exception as e:
-            logger.error(f"Error getting vehicles: {e}")
-            return []
-    
-    def get_vehicle_by_id(self, vehicle_id: str) -> Optional[Dict[str, Any]]:
-        try:
-            result = self.supabase.table('vehicles').select('*').eq('id', vehicle_id).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error getting vehicle by ID: {e}")
-            return None
-    
-    def update_vehicle(self, vehicle_id: str, update_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            result = self.supabase.table('vehicles').update(update_data).eq('id', vehicle_id).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error updating vehicle: {e}")
-            raise
-    
-    def delete_vehicle(self, vehicle_id: str) -> bool:
-        try:
-            result = self.supabase.table('vehicles').delete().eq('id', vehicle_id).execute()
-            return len(result.data) > 0
-        except Exception as e:
-            logger.error(f"Error deleting vehicle: {e}")
-            return False
-    
-    # Payments operations
-    def create_payment(self, payment_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            result = self.supabase.table('maintenance_payments').insert(payment_data).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error creating payment: {e}")
-            raise
-    
-    def get_payments(self, limit: int = 1000) -> List[Dict[str, Any]]:
-        try:
-            result = self.supabase.table('maintenance_payments').select('*').limit(limit).execute()
-            return result.data or []
-        except Exception as e:
-            logger.error(f"Error getting payments: {e}")
+
+    def insert_row(self, table: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        result = self.supabase.table(table).insert(data).execute()
+        return result.data[0] if result.data else None
+
+    def insert_rows(self, table: str, rows: List[Dict[str, Any]],
+                    on_conflict: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        if not rows:
             return []
-    
-    def get_payment_by_id(self, payment_id: int) -> Optional[Dict[str, Any]]:
-        try:
-            result = self.supabase.table('maintenance_payments').select('*').eq('id', payment_id).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error getting payment by ID: {e}")
-            return None
-    
-    def update_payment(self, payment_id: int, update_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            result = self.supabase.table('maintenance_payments').update(update_data).eq('id', payment_id).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error updating payment: {e}")
-            raise
-    
-    def delete_payment(self, payment_id: int) -> bool:
-        try:
-            result = self.supabase.table('maintenance_payments').delete().eq('id', payment_id).execute()
-            return len(result.data) > 0
-        except Exception as e:
-            logger.error(f"Error deleting payment: {e}")
-            return False
-    
-    # Expenditures operations
-    def create_expenditure(self, expenditure_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            result = self.supabase.table('expenditures').insert(expenditure_data).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error creating expenditure: {e}")
-            raise
-    
-    def get_expenditures(self, limit: int = 1000) -> List[Dict[str, Any]]:
-        try:
-            result = self.supabase.table('expenditures').select('*').limit(limit).execute()
-            return result.data or []
-        except Exception as e:
-            logger.error(f"Error getting expenditures: {e}")
+        if on_conflict:
+            request = self.supabase.table(table).upsert(
+                rows, on_conflict=','.join(on_conflict), ignore_duplicates=True
+            )
+        else:
+            request = self.supabase.table(table).insert(rows)
+        return request.execute().data or []
+
+    @staticmethod
+    def _filtered(request, query: ListQuery):
+        """Apply a query's equality filters and ranges to a PostgREST request"""
+        for column, value in query.filters.items():
+            request = request.eq(column, value)
+        for column, (low, high) in query.ranges.items():
+            if low is not None:
+                request = request.gte(column, low)
+            if high is not None:
+                request = request.lte(column, high)
+        return request
+
+    def list_rows(self, table: str, query: ListQuery) -> Page:
+        columns = query_columns(query)
+        request = self._filtered(self.supabase.table(table).select('*' if columns is None else ','.join(columns)), query)
+
+        position = decode_cursor(query)
+        op = 'lt' if query.descending else 'gt'
+        if position is not None:
+            value, last_id = position
+            if query.sort == 'id':
+                request = getattr(request, op)('id', last_id)
+            else:
+                # (sort, id) > (value, last_id) spelled out for PostgREST
+                request = request.or_(
+                    f'{query.sort}.{op}.{_filter_value(value)},'
+                    f'and({query.sort}.eq.{_filter_value(value)},id.{op}.{_filter_value(last_id)})'
+                )
+        if query.sort != 'id':
+            request = request.order(query.sort, desc=query.descending)
+        request = request.order('id', desc=query.descending)
+        result = request.limit(query.limit + 1).execute()
+        return page_from_rows(query, result.data or [])
+
+    def get_row(self, table: str, row_id: Any) -> Optional[Dict[str, Any]]:
+        result = self.supabase.table(table).select('*').eq('id', row_id).execute()
+        return result.data[0] if result.data else None
+
+    def update_row(self, table: str, row_id: Any, data: Dict[str, Any],
+                   expected: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        request = self._match(self.supabase.table(table).update(data).eq('id', row_id), expected)
+        result = request.execute()
+        return result.data[0] if result.data else None
+
+    def delete_row(self, table: str, row_id: Any, expected: Optional[Dict[str, Any]] = None) -> bool:
+        result = self._match(self.supabase.table(table).delete().eq('id', row_id), expected).execute()
+        return len(result.data) > 0
+
+    def delete_rows(self, table: str, row_ids: List[Any]) -> List[Any]:
+        if not row_ids:
             return []
-    
-    def get_expenditure_by_id(self, expenditure_id: int) -> Optional[Dict[str, Any]]:
-        try:
-            result = self.supabase.table('expenditures').select('*').eq('id', expenditure_id).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error getting expenditure by ID: {e}")
-            return None
-    
-    def update_expenditure(self, expenditure_id: int, update_data: Dict[str, Any]) -> Dict[str, Any]:
-        try:
-            result = self.supabase.table('expenditures').update(update_data).eq('id', expenditure_id).execute()
-            return result.data[0] if result.data else None
-        except Exception as e:
-            logger.error(f"Error updating expenditure: {e}")
-            raise
-    
-    def delete_expenditure(self, expenditure_id: int) -> bool:
-        try:
-            result = self.supabase.table('expenditures').delete().eq('id', expenditure_id).execute()
-            return len(result.data) > 0
-        except Exception as e:
-            logger.error(f"Error deleting expenditure: {e}")
-            return False
+        result = self.supabase.table(table).delete().in_('id', row_ids).execute()
+        return [row['id'] for row in result.data or []]
+
+    def count_rows(self, table: str, query: ListQuery) -> int:
+        result = self._filtered(self.supabase.table(table).select('id', count='exact'), query).limit(1).execute()
+        return result.count or 0
+
+    def table_state(self, table: str) -> TableState:
+        result = self.supabase.table('table_versions').select('version').eq('name', table).limit(1).execute()
+        return TableState(result.data[0]['version'] if result.data else 0)
+
+    @staticmethod
+    def _match(request, expected: Optional[Dict[str, Any]]):
+        for column, value in (expected or {}).items():
+            request = request.is_(column, 'null') if value is None else request.eq(column, value)
+        return request
 
 # Create a simple initialization function
 _db_instance = None
+_async_db_instance = None
+
+def create_db() -> SocietyRepository:
+    """Build the backend selected by DB_BACKEND (supabase, sqlite or fake-supabase)"""
+    backend = os.getenv("DB_BACKEND", "supabase").lower()
+    if backend == "supabase":
+        return SupabaseDB()
+    if backend == "fake-supabase":
+        from fake_supabase import FakeSupabaseClient
+        return SupabaseDB(client=FakeSupabaseClient(
+            latency=float(os.getenv("FAKE_SUPABASE_LATENCY_MS", "0")) / 1000,
+            jitter=float(os.getenv("FAKE_SUPABASE_JITTER_MS", "0")) / 1000,
+        ))
+    if backend == "sqlite":
+        from database_sqlite import SQLiteDB
+        return SQLiteDB(os.getenv("SQLITE_PATH", str(ROOT_DIR / 'society.db')))
+    raise ValueError(f"Unknown DB_BACKEND: {backend}")
 
 def get_db():
     global _db_instance
     if _db_instance is None:
-        _db_instance = SupabaseDB()
-    return _db_instance
\ No newline at end of file
+        _db_instance = create_db()
+        cache_size = int(os.getenv("ENTITY_CACHE_SIZE", "2048"))
+        if cache_size > 0:
+            from cache import EntityCache, parse_ttls
+            _db_instance.enable_cache(EntityCache(cache_size, parse_ttls(os.getenv("ENTITY_CACHE_TTLS", ""))))
+        from metrics import DatabaseCallMetrics
+        _db_instance.add_call_listener(DatabaseCallMetrics())
+        from tracing import CallTracer
+        _db_instance.add_call_listener(CallTracer())
+    return _db_instance
+
+def get_async_db():
+    """Shared awaitable repository used by the API handlers"""
+    global _async_db_instance
+    if _async_db_instance is None:
+        from async_repository import AsyncRepository
+        timeout = float(os.getenv("DB_CALL_TIMEOUT", "10"))
+        _async_db_instance = AsyncRepository(
+            get_db(),
+            max_workers=int(os.getenv("DB_POOL_SIZE", "8")),
+            timeout=timeout if timeout > 0 else None,
+        )
+    return _async_db_instance
+
+def close_http_pool():
+    """Close the Supabase HTTP connection pool, if the supabase backend opened one"""
+    if getattr(_db_instance, 'http_client', None) is not None:
+        from http_pool import close_http_client
+        close_http_client()
+
+def close_async_db():
+    global _async_db_instance
+    if _async_db_instance is not None:
+        _async_db_instance.shutdown(wait=False)
+        _async_db_instance = None
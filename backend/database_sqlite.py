@@ -0,0 +1,390 @@
+import logging
+import sqlite3
+import threading
+from contextlib import nullcontext
+from datetime import datetime
+from itertools import groupby
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Union
+from repository import SocietyRepository, ListQuery, Page, TableState, decode_cursor, page_from_rows, query_columns
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on bound parameters per statement (SQLITE_MAX_VARIABLE_NUMBER)
+MAX_VARIABLES = 32766
+
+# Mirrors setup_database.sql using SQLite types
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS houses (
+    id TEXT PRIMARY KEY,
+    "houseNo" TEXT NOT NULL,
+    block TEXT NOT NULL,
+    floor TEXT NOT NULL,
+    status TEXT DEFAULT 'vacant' CHECK (status IN ('occupied', 'vacant', 'maintenance')),
+    notes TEXT,
+    "ownerName" TEXT,
+    "membersCount" INTEGER DEFAULT 0,
+    "vehiclesCount" INTEGER DEFAULT 0,
+    "createdAt" TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    "updatedAt" TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS members (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    house TEXT NOT NULL,
+    role TEXT NOT NULL CHECK (role IN ('Owner', 'Tenant', 'Family Member')),
+    relationship TEXT CHECK (relationship IN ('Owner', 'Father', 'Mother', 'Son', 'Daughter', 'Spouse', 'Other')),
+    phone TEXT NOT NULL,
+    email TEXT,
+    status TEXT DEFAULT 'active' CHECK (status IN ('active', 'inactive')),
+    "createdAt" TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    "updatedAt" TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS vehicles (
+    id TEXT PRIMARY KEY,
+    number TEXT NOT NULL,
+    type TEXT NOT NULL CHECK (type IN ('Two Wheeler', 'Four Wheeler')),
+    "brandModel" TEXT,
+    color TEXT,
+    "ownerName" TEXT,
+    house TEXT NOT NULL,
+    "registrationDate" TEXT,
+    status TEXT DEFAULT 'active' CHECK (status IN ('active', 'inactive')),
+    "createdAt" TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    "updatedAt" TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now'))
+);
+
+CREATE TABLE IF NOT EXISTS maintenance_payments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    house TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    amount REAL NOT NULL,
+    "amountPaid" REAL DEFAULT 0,
+    month TEXT NOT NULL,
+    "monthRange" TEXT,
+    "fromMonth" TEXT,
+    "toMonth" TEXT,
+    "fromMonthRaw" TEXT,
+    "toMonthRaw" TEXT,
+    "monthsCount" INTEGER DEFAULT 1,
+    "latePayment" BOOLEAN DEFAULT 0,
+    "dueDate" TEXT NOT NULL,
+    "paidDate" TEXT,
+    status TEXT DEFAULT 'pending' CHECK (status IN ('pending', 'partial', 'paid', 'overdue')),
+    method TEXT,
+    remarks TEXT,
+    "createdAt" TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    "updatedAt" TEXT
+);
+
+CREATE TABLE IF NOT EXISTS expenditures (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    category TEXT NOT NULL CHECK (category IN ('Security', 'Cleaning', 'Repairs', 'Utilities', 'Events', 'Maintenance', 'Administration', 'Other')),
+    amount REAL NOT NULL,
+    "paymentMode" TEXT NOT NULL CHECK ("paymentMode" IN ('Cash', 'Bank', 'Online', 'Vendor Transfer')),
+    date TEXT NOT NULL,
+    description TEXT,
+    "attachmentName" TEXT,
+    "attachmentData" TEXT,
+    "attachmentRef" TEXT,
+    "attachmentSize" INTEGER,
+    "attachmentType" TEXT,
+    "createdAt" TEXT DEFAULT (strftime('%Y-%m-%dT%H:%M:%fZ', 'now')),
+    "updatedAt" TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_houses_house_no ON houses("houseNo");
+CREATE INDEX IF NOT EXISTS idx_members_house ON members(house);
+CREATE INDEX IF NOT EXISTS idx_vehicles_house ON vehicles(house);
+CREATE INDEX IF NOT EXISTS idx_payments_house ON maintenance_payments(house);
+CREATE INDEX IF NOT EXISTS idx_payments_status ON maintenance_payments(status);
+CREATE INDEX IF NOT EXISTS idx_expenditures_category ON expenditures(category);
+CREATE INDEX IF NOT EXISTS idx_expenditures_date ON expenditures(date);
+
+-- Keyset pagination indexes (default sort key, id)
+CREATE INDEX IF NOT EXISTS idx_houses_house_no_id ON houses("houseNo", id);
+CREATE INDEX IF NOT EXISTS idx_members_name_id ON members(name, id);
+CREATE INDEX IF NOT EXISTS idx_vehicles_number_id ON vehicles(number, id);
+CREATE INDEX IF NOT EXISTS idx_payments_due_date_id ON maintenance_payments("dueDate", id);
+CREATE INDEX IF NOT EXISTS idx_expenditures_date_id ON expenditures(date, id);
+
+-- One bill per house per month
+CREATE UNIQUE INDEX IF NOT EXISTS uq_payments_house_month ON maintenance_payments(house, month);
+
+-- Change counter per table, bumped by a trigger on every row written (see TableState)
+CREATE TABLE IF NOT EXISTS table_versions (
+    name TEXT PRIMARY KEY,
+    version INTEGER NOT NULL DEFAULT 0
+);
+""" + ''.join(f"""
+INSERT OR IGNORE INTO table_versions (name) VALUES ('{table}');
+CREATE TRIGGER IF NOT EXISTS {table}_version_{event} AFTER {event.upper()} ON {table}
+BEGIN UPDATE table_versions SET version = version + 1 WHERE name = '{table}'; END;
+""" for table in ('houses', 'members', 'vehicles', 'maintenance_payments', 'expenditures')
+    for event in ('insert', 'update', 'delete'))
+
+# Columns added after the first release: (table, column, type), applied to older files on open
+COLUMN_MIGRATIONS = [
+    ('expenditures', 'attachmentRef', 'TEXT'),
+    ('expenditures', 'attachmentSize', 'INTEGER'),
+    ('expenditures', 'attachmentType', 'TEXT'),
+]
+
+def _quote(column: str) -> str:
+    return f'"{column}"'
+
+def _where_id(conditions: Sequence[str]) -> str:
+    """WHERE clause matching a primary key plus null-safe equality on `conditions`"""
+    return ' AND '.join(['id = ?'] + [f'{_quote(c)} IS ?' for c in conditions])
+
+def _to_db_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat() + ('Z' if value.tzinfo is None else '')
+    return value
+
+class SQLiteDB(SocietyRepository):
+    """Embedded backend for running the API fully on-box.
+
+    File databases run in WAL mode so readers never block the writer and
+    each thread gets its own connection. An in-memory database lives on a
+    single connection guarded by a lock. Every statement is built once per
+    (table, columns) shape and executed with bound parameters, so sqlite's
+    statement cache serves them as prepared statements.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        super().__init__()
+        self.path = path
+        self._in_memory = path == ":memory:"
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._sql_cache: Dict[tuple, str] = {}
+        self._sql_lock = threading.Lock()
+        self._memory_lock = threading.RLock() if self._in_memory else None
+
+        # Held for the lifetime of the instance; the only connection in memory mode
+        self._anchor = self._connect()
+        if not self._in_memory:
+            self._anchor.execute("PRAGMA journal_mode=WAL")
+        self._anchor.executescript(SCHEMA)
+        for table, column, column_type in COLUMN_MIGRATIONS:
+            existing = {col['name'] for col in self._anchor.execute(f'PRAGMA table_info("{table}")')}
+            if column not in existing:
+                self._anchor.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {column_type}')
+
+        self._columns: Dict[str, set] = {}
+        self._bool_columns: Dict[str, set] = {}
+        for table in ('houses', 'members', 'vehicles', 'maintenance_payments', 'expenditures'):
+            info = self._anchor.execute(f'PRAGMA table_info("{table}")').fetchall()
+            self._columns[table] = {col['name'] for col in info}
+            self._bool_columns[table] = {col['name'] for col in info if col['type'] == 'BOOLEAN'}
+        logger.info(f"SQLite database initialized at {path}")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._in_memory:
+            return self._anchor
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            self._connections.append(conn)
+        return conn
+
+    def _guard(self):
+        return self._memory_lock if self._in_memory else nullcontext()
+
+    def _fetchone(self, sql: str, params) -> Optional[sqlite3.Row]:
+        with self._guard():
+            return self.conn.execute(sql, params).fetchone()
+
+    def _fetchall(self, sql: str, params) -> List[sqlite3.Row]:
+        with self._guard():
+            return self.conn.execute(sql, params).fetchall()
+
+    def _execute(self, sql: str, params) -> int:
+        with self._guard():
+            return self.conn.execute(sql, params).rowcount
+
+    def close(self):
+        for conn in self._connections:
+            conn.close()
+        self._connections.clear()
+        self._local = threading.local()
+        self._anchor.close()
+
+    def _check_columns(self, table: str, columns) -> None:
+        if table not in self._columns:
+            raise ValueError(f"Unknown table: {table}")
+        unknown = set(columns) - self._columns[table]
+        if unknown:
+            raise ValueError(f"Unknown columns for {table}: {sorted(unknown)}")
+
+    def _sql(self, key: tuple, build) -> str:
+        sql = self._sql_cache.get(key)
+        if sql is None:
+            sql = build()
+            with self._sql_lock:
+                self._sql_cache[key] = sql
+        return sql
+
+    def _to_dict(self, table: str, row: Optional[sqlite3.Row]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        data = dict(row)
+        for col in self._bool_columns[table]:
+            if data.get(col) is not None:
+                data[col] = bool(data[col])
+        return data
+
+    def insert_row(self, table: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        columns = tuple(data)
+        self._check_columns(table, columns)
+        sql = self._sql(('insert', table, columns), lambda: (
+            f'INSERT INTO "{table}" ({", ".join(_quote(c) for c in columns)}) '
+            f'VALUES ({", ".join("?" for _ in columns)}) RETURNING *'
+        ))
+        row = self._fetchone(sql, [_to_db_value(data[c]) for c in columns])
+        return self._to_dict(table, row)
+
+    def insert_rows(self, table: str, rows: List[Dict[str, Any]],
+                    on_conflict: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        inserted: List[Dict[str, Any]] = []
+        # One multi-row statement per column layout (rows usually share one)
+        for columns, group in groupby(rows, key=lambda row: tuple(row)):
+            group = list(group)
+            self._check_columns(table, list(columns) + list(on_conflict or ()))
+            conflict = ''
+            if on_conflict:
+                conflict = f' ON CONFLICT ({", ".join(_quote(c) for c in on_conflict)}) DO NOTHING'
+            per_statement = max(1, MAX_VARIABLES // max(1, len(columns)))
+            for start in range(0, len(group), per_statement):
+                chunk = group[start:start + per_statement]
+                placeholders = f'({", ".join("?" for _ in columns)})'
+                sql = (
+                    f'INSERT INTO "{table}" ({", ".join(_quote(c) for c in columns)}) '
+                    f'VALUES {", ".join(placeholders for _ in chunk)}{conflict} RETURNING *'
+                )
+                params = [_to_db_value(row[c]) for row in chunk for c in columns]
+                inserted.extend(self._to_dict(table, row) for row in self._fetchall(sql, params))
+        return inserted
+
+    @staticmethod
+    def _filter_clauses(query: ListQuery) -> Tuple[List[str], List[Any]]:
+        """WHERE conditions for a query's equality filters and ranges"""
+        clauses, params = [], []
+        for column, value in query.filters.items():
+            clauses.append(f'{_quote(column)} = ?')
+            params.append(value)
+        for column, (low, high) in query.ranges.items():
+            if low is not None:
+                clauses.append(f'{_quote(column)} >= ?')
+                params.append(low)
+            if high is not None:
+                clauses.append(f'{_quote(column)} <= ?')
+                params.append(high)
+        return clauses, params
+
+    def list_rows(self, table: str, query: ListQuery) -> Page:
+        columns = query_columns(query)
+        self._check_columns(table, list(query.filters) + list(query.ranges) + [query.sort] + (columns or []))
+        position = decode_cursor(query)
+
+        clauses, params = self._filter_clauses(query)
+        op = '<' if query.descending else '>'
+        if position is not None:
+            if query.sort == 'id':
+                clauses.append(f'id {op} ?')
+                params.append(position[1])
+            else:
+                clauses.append(f'({_quote(query.sort)}, id) {op} (?, ?)')
+                params.extend(position)
+
+        direction = 'DESC' if query.descending else 'ASC'
+        order = f'id {direction}' if query.sort == 'id' else f'{_quote(query.sort)} {direction}, id {direction}'
+        select = '*' if columns is None else ', '.join(_quote(c) for c in columns)
+        where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+        sql = f'SELECT {select} FROM "{table}"{where} ORDER BY {order} LIMIT ?'
+        params.append(query.limit + 1)
+        return page_from_rows(query, [self._to_dict(table, row) for row in self._fetchall(sql, params)])
+
+    def count_rows(self, table: str, query: ListQuery) -> int:
+        self._check_columns(table, list(query.filters) + list(query.ranges))
+        clauses, params = self._filter_clauses(query)
+        where = f' WHERE {" AND ".join(clauses)}' if clauses else ''
+        return self._fetchone(f'SELECT COUNT(*) FROM "{table}"{where}', params)[0]
+
+    def table_state(self, table: str) -> TableState:
+        self._check_columns(table, ())
+        row = self._fetchone('SELECT version FROM table_versions WHERE name = ?', (table,))
+        return TableState(row[0] if row else 0)
+
+    def get_row(self, table: str, row_id: Any) -> Optional[Dict[str, Any]]:
+        self._check_columns(table, ())
+        sql = self._sql(('get', table), lambda: f'SELECT * FROM "{table}" WHERE id = ?')
+        return self._to_dict(table, self._fetchone(sql, (row_id,)))
+
+    def update_row(self, table: str, row_id: Any, data: Dict[str, Any],
+                   expected: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        columns = tuple(data)
+        conditions = tuple(expected or ())
+        if not columns:
+            row = self.get_row(table, row_id)
+            return row if row and all(row.get(c) == expected[c] for c in conditions) else None
+        self._check_columns(table, columns + conditions)
+        sql = self._sql(('update', table, columns, conditions), lambda: (
+            f'UPDATE "{table}" SET {", ".join(f"{_quote(c)} = ?" for c in columns)} '
+            f'WHERE {_where_id(conditions)} RETURNING *'
+        ))
+        params = [_to_db_value(data[c]) for c in columns] + [row_id] + [_to_db_value(expected[c]) for c in conditions]
+        return self._to_dict(table, self._fetchone(sql, params))
+
+    def update_rows(self, table: str, updates: List[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]
+                    ) -> List[Union[Optional[Dict[str, Any]], Exception]]:
+        # One transaction (a single fsync) for the whole group; a failing row only loses its own statement
+        results: List[Union[Optional[Dict[str, Any]], Exception]] = []
+        with self._guard():
+            conn = self.conn
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                for row_id, data, expected in updates:
+                    try:
+                        results.append(self.update_row(table, row_id, data, expected))
+                    except sqlite3.Error as e:
+                        results.append(e)
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return results
+
+    def delete_rows(self, table: str, row_ids: List[Any]) -> List[Any]:
+        self._check_columns(table, ())
+        deleted: List[Any] = []
+        for start in range(0, len(row_ids), MAX_VARIABLES):
+            chunk = row_ids[start:start + MAX_VARIABLES]
+            sql = f'DELETE FROM "{table}" WHERE id IN ({", ".join("?" for _ in chunk)}) RETURNING id'
+            deleted.extend(row['id'] for row in self._fetchall(sql, chunk))
+        return deleted
+
+    def delete_row(self, table: str, row_id: Any, expected: Optional[Dict[str, Any]] = None) -> bool:
+        conditions = tuple(expected or ())
+        self._check_columns(table, conditions)
+        sql = self._sql(('delete', table, conditions), lambda: (
+            f'DELETE FROM "{table}" WHERE {_where_id(conditions)}'
+        ))
+        return self._execute(sql, [row_id] + [_to_db_value(expected[c]) for c in conditions]) > 0
@@ -0,0 +1,446 @@
+"""Seeded synthetic society dataset for scale testing.
+
+The same seed and sizes always produce the same rows, so datasets can be
+regenerated instead of shipped. Rows go through the repository bulk path
+(insert_rows) of the configured backend, into a SQLite file, or to one
+NDJSON file per table:
+
+  python datagen.py --to sqlite --output society.db
+  python datagen.py --to ndjson --output data/ --flats 1000 --members 3000
+  DB_BACKEND=supabase python datagen.py --to db
+"""
+import calendar
+import math
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import date, datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, IO, Iterator, List, Optional, Sequence, Tuple
+
+import typer
+
+from repository import INSERT_CHUNK_SIZE, SocietyRepository
+
+app = typer.Typer(help="Generate a synthetic society dataset")
+
+# Insert order; payments reference houses by houseNo
+TABLES = ('houses', 'members', 'vehicles', 'maintenance_payments', 'expenditures')
+
+UNITS_PER_FLOOR = 4
+
+FIRST_NAMES = (
+    'Aarav', 'Aditi', 'Akash', 'Ananya', 'Arjun', 'Bhavna', 'Chetan', 'Deepa', 'Dev', 'Divya', 'Farhan',
+    'Gauri', 'Harsh', 'Isha', 'Jay', 'Kavya', 'Karan', 'Lakshmi', 'Manish', 'Meera', 'Nikhil', 'Neha',
+    'Om', 'Pooja', 'Pranav', 'Priya', 'Rahul', 'Riya', 'Rohan', 'Sakshi', 'Sanjay', 'Shreya', 'Siddharth',
+    'Sneha', 'Tanvi', 'Tushar', 'Varun', 'Vidya', 'Yash', 'Zoya',
+)
+SURNAMES = (
+    'Agarwal', 'Bhatt', 'Chauhan', 'Desai', 'Gupta', 'Iyer', 'Jain', 'Joshi', 'Kapoor', 'Khan', 'Kulkarni',
+    'Mehta', 'Menon', 'Nair', 'Patel', 'Pillai', 'Prajapati', 'Rao', 'Reddy', 'Shah', 'Sharma', 'Singh',
+    'Trivedi', 'Verma',
+)
+RELATIVES = ('Spouse', 'Son', 'Daughter', 'Father', 'Mother', 'Other')
+RELATIVE_WEIGHTS = (30, 25, 25, 8, 8, 4)
+
+VEHICLE_MODELS = {
+    'Two Wheeler': ('Honda Activa', 'TVS Jupiter', 'Bajaj Pulsar', 'Hero Splendor', 'Royal Enfield Classic',
+                    'Suzuki Access', 'Ather 450X'),
+    'Four Wheeler': ('Maruti Swift', 'Hyundai Creta', 'Tata Nexon', 'Honda City', 'Mahindra XUV700',
+                     'Toyota Innova', 'Kia Seltos', 'Maruti Baleno'),
+}
+COLORS = ('White', 'Black', 'Silver', 'Grey', 'Red', 'Blue', 'Brown')
+STATE_CODES = ('GJ', 'MH', 'KA', 'DL', 'RJ')
+
+# Flat size (by unit position on the floor) -> monthly maintenance in the first year
+BASE_AMOUNTS = (1500, 2000, 2000, 2500)
+ANNUAL_INCREASE = 0.05
+
+# Payer habits: share of flats, and the odds a past bill ends up paid / partial (the rest go overdue)
+PAYERS = {
+    'prompt': (0.70, 0.99, 0.005),
+    'late': (0.20, 0.90, 0.04),
+    'defaulter': (0.10, 0.60, 0.15),
+}
+
+# (title, category, payment mode, min amount, max amount); the recurring ones are booked every month
+RECURRING_EXPENSES = (
+    ('Security guard salaries', 'Security', 'Bank', 45000, 60000),
+    ('Housekeeping staff salaries', 'Cleaning', 'Bank', 30000, 40000),
+    ('Common area electricity bill', 'Utilities', 'Online', 18000, 35000),
+    ('Water supply bill', 'Utilities', 'Online', 8000, 15000),
+    ('Society manager salary', 'Administration', 'Bank', 25000, 25000),
+)
+OCCASIONAL_EXPENSES = (
+    ('Lift servicing', 'Maintenance', 'Vendor Transfer', 4000, 12000),
+    ('Plumbing repairs', 'Repairs', 'Cash', 500, 8000),
+    ('Electrical repairs', 'Repairs', 'Cash', 500, 6000),
+    ('Garden upkeep', 'Maintenance', 'Cash', 1000, 5000),
+    ('Pest control', 'Cleaning', 'Vendor Transfer', 3000, 9000),
+    ('CCTV maintenance', 'Security', 'Vendor Transfer', 2000, 10000),
+    ('Water tank cleaning', 'Cleaning', 'Vendor Transfer', 5000, 15000),
+    ('Festival celebration', 'Events', 'Cash', 10000, 80000),
+    ('Stationery and printing', 'Administration', 'Cash', 200, 3000),
+    ('Audit fees', 'Administration', 'Bank', 15000, 30000),
+    ('Painting touch-ups', 'Repairs', 'Vendor Transfer', 5000, 40000),
+    ('Miscellaneous', 'Other', 'Cash', 100, 5000),
+)
+
+@dataclass
+class DatasetSpec:
+    seed: int = 42
+    blocks: int = 50
+    flats: int = 10000
+    members: int = 30000
+    vehicles: int = 15000
+    years: int = 5
+    # Last billed month (YYYY-MM); fixed rather than "now" so datasets are reproducible
+    end_month: str = '2025-12'
+    expenses_per_month: int = 40
+
+@dataclass
+class Flat:
+    house_no: str
+    block: str
+    floor: int
+    unit: int
+    status: str
+    owner: str
+    surname: str
+    payer: str
+    tenanted: bool
+    members: int = 0
+    vehicles: int = 0
+
+def block_name(index: int) -> str:
+    """A..Z, then AA, AB, ..."""
+    name = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+def _timestamp(day: date, rng: random.Random) -> str:
+    return f'{day.isoformat()}T{rng.randrange(8, 21):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}Z'
+
+class SocietyGenerator:
+    """Rows of every table for one DatasetSpec.
+
+    Each table draws from its own seeded stream, so generating (or
+    skipping) one table never changes the rows of another.
+    """
+
+    def __init__(self, spec: DatasetSpec):
+        self.spec = spec
+        end = datetime.strptime(spec.end_month, '%Y-%m')
+        first = end.year * 12 + end.month - 1 - (spec.years * 12 - 1)
+        self.months = [(n // 12, n % 12 + 1) for n in range(first, end.year * 12 + end.month)]
+        self.start = date(*self.months[0], 1)
+        self.flats = self._plan()
+
+    def _rng(self, name: str) -> random.Random:
+        return random.Random(f'{self.spec.seed}:{name}')
+
+    def _plan(self) -> List[Flat]:
+        """Lay out the flats and decide who lives where before any table is generated"""
+        rng = self._rng('plan')
+        spec = self.spec
+        per_block = math.ceil(spec.flats / max(1, spec.blocks))
+        flats = []
+        for n in range(spec.flats):
+            block, position = divmod(n, per_block)
+            floor, unit = divmod(position, UNITS_PER_FLOOR)
+            surname = rng.choice(SURNAMES)
+            flats.append(Flat(
+                house_no=f'{block_name(block)}-{floor + 1}{unit + 1:02d}',
+                block=block_name(block),
+                floor=floor + 1,
+                unit=unit,
+                status=rng.choices(('occupied', 'vacant', 'maintenance'), (88, 9, 3))[0],
+                owner=f'{rng.choice(FIRST_NAMES)} {surname}',
+                surname=surname,
+                payer=rng.choices(tuple(PAYERS), [share for share, _, _ in PAYERS.values()])[0],
+                tenanted=rng.random() < 0.2,
+            ))
+        occupied = [flat for flat in flats if flat.status == 'occupied']
+        if occupied:
+            # Every occupied flat gets one resident, the rest land at random
+            for flat in occupied[:spec.members]:
+                flat.members = 1
+            for flat in rng.choices(occupied, k=max(0, spec.members - len(occupied))):
+                flat.members += 1
+            for flat in rng.choices(occupied, k=spec.vehicles):
+                flat.vehicles += 1
+        return flats
+
+    def tables(self) -> Dict[str, Callable[[], Iterator[Dict[str, Any]]]]:
+        return {
+            'houses': self.houses,
+            'members': self.members,
+            'vehicles': self.vehicles,
+            'maintenance_payments': self.payments,
+            'expenditures': self.expenditures,
+        }
+
+    def houses(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('houses')
+        for flat in self.flats:
+            created = _timestamp(self.start, rng)
+            yield {
+                'id': _uuid(rng),
+                'houseNo': flat.house_no,
+                'block': flat.block,
+                'floor': str(flat.floor),
+                'status': flat.status,
+                'notes': 'Under renovation' if flat.status == 'maintenance' else None,
+                'ownerName': flat.owner,
+                'membersCount': flat.members,
+                'vehiclesCount': flat.vehicles,
+                'createdAt': created,
+                'updatedAt': created,
+            }
+
+    def members(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('members')
+        serial = 0
+        for flat in self.flats:
+            surname = rng.choice(SURNAMES) if flat.tenanted else flat.surname
+            for n in range(flat.members):
+                if n == 0:
+                    name = f'{rng.choice(FIRST_NAMES)} {surname}' if flat.tenanted else flat.owner
+                    role, relationship = ('Tenant', 'Other') if flat.tenanted else ('Owner', 'Owner')
+                else:
+                    name = f'{rng.choice(FIRST_NAMES)} {surname}'
+                    role, relationship = 'Family Member', rng.choices(RELATIVES, RELATIVE_WEIGHTS)[0]
+                serial += 1
+                first = name.split(' ', 1)[0].lower()
+                created = _timestamp(self.start.replace(day=rng.randrange(1, 29)), rng)
+                yield {
+                    'id': _uuid(rng),
+                    'name': name,
+                    'house': flat.house_no,
+                    'role': role,
+                    'relationship': relationship,
+                    'phone': f'{rng.choice("6789")}{rng.randrange(10 ** 9):09d}',
+                    'email': f'{first}.{surname.lower()}{serial}@example.com' if rng.random() < 0.8 else None,
+                    'status': 'active' if rng.random() < 0.97 else 'inactive',
+                    'createdAt': created,
+                    'updatedAt': created,
+                }
+
+    def vehicles(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('vehicles')
+        numbers = set()
+        end = date(*self.months[-1], 28)
+        for flat in self.flats:
+            for _ in range(flat.vehicles):
+                kind = 'Two Wheeler' if rng.random() < 0.55 else 'Four Wheeler'
+                while True:
+                    number = (f'{rng.choice(STATE_CODES)} {rng.randrange(1, 40):02d} '
+                              f'{chr(65 + rng.randrange(26))}{chr(65 + rng.randrange(26))} {rng.randrange(1, 10000):04d}')
+                    if number not in numbers:
+                        numbers.add(number)
+                        break
+                registered = date.fromordinal(end.toordinal() - rng.randrange(10 * 365))
+                created = _timestamp(self.start.replace(day=rng.randrange(1, 29)), rng)
+                yield {
+                    'id': _uuid(rng),
+                    'number': number,
+                    'type': kind,
+                    'brandModel': rng.choice(VEHICLE_MODELS[kind]),
+                    'color': rng.choice(COLORS),
+                    'ownerName': flat.owner,
+                    'house': flat.house_no,
+                    'registrationDate': registered.isoformat(),
+                    'status': 'active' if rng.random() < 0.95 else 'inactive',
+                    'createdAt': created,
+                    'updatedAt': created,
+                }
+
+    def payments(self) -> Iterator[Dict[str, Any]]:
+        """One bill per flat per month; the current month is still open, older ones are settled or overdue"""
+        rng = self._rng('maintenance_payments')
+        last = len(self.months) - 1
+        for index, (year, month) in enumerate(self.months):
+            label = f'{calendar.month_name[month]} {year}'
+            due = f'{year}-{month:02d}-05'
+            created = f'{year}-{month:02d}-01T00:00:00Z'
+            days = calendar.monthrange(year, month)[1]
+            increase = (1 + ANNUAL_INCREASE) ** (index // 12)
+            for flat in self.flats:
+                amount = round(BASE_AMOUNTS[flat.unit] * increase / 50) * 50
+                _, paid_odds, partial_odds = PAYERS[flat.payer]
+                if index == last:
+                    paid_odds, partial_odds = paid_odds * 0.6, partial_odds * 2
+                draw = rng.random()
+                if draw < paid_odds:
+                    status, paid = 'paid', amount
+                elif draw < paid_odds + partial_odds:
+                    status, paid = 'partial', round(amount * rng.uniform(0.2, 0.8), -1)
+                else:
+                    status, paid = ('pending' if index == last else 'overdue'), 0
+                day = None
+                if paid:
+                    day = rng.randrange(1, 6) if flat.payer == 'prompt' else rng.randrange(1, days + 1)
+                paid_date = f'{year}-{month:02d}-{day:02d}' if day else None
+                yield {
+                    'house': flat.house_no,
+                    'owner': flat.owner,
+                    'amount': amount,
+                    'amountPaid': paid,
+                    'month': label,
+                    'monthsCount': 1,
+                    'latePayment': bool(day and day > 5),
+                    'dueDate': due,
+                    'paidDate': paid_date,
+                    'status': status,
+                    'method': (('Online' if rng.random() < 0.7 else 'Cash') if paid else None),
+                    'remarks': None,
+                    'createdAt': created,
+                    'updatedAt': f'{paid_date}T10:00:00Z' if paid_date else created,
+                }
+
+    def expenditures(self) -> Iterator[Dict[str, Any]]:
+        rng = self._rng('expenditures')
+        for year, month in self.months:
+            days = calendar.monthrange(year, month)[1]
+            entries = [(expense, 1 + rng.randrange(10)) for expense in RECURRING_EXPENSES]
+            extra = max(0, self.spec.expenses_per_month - len(RECURRING_EXPENSES))
+            entries += [(rng.choice(OCCASIONAL_EXPENSES), rng.randrange(1, days + 1)) for _ in range(extra)]
+            for (title, category, mode, low, high), day in sorted(entries, key=lambda entry: entry[1]):
+                spent = f'{year}-{month:02d}-{day:02d}'
+                yield {
+                    'title': title,
+                    'category': category,
+                    'amount': round(rng.uniform(low, high), -1),
+                    'paymentMode': mode,
+                    'date': spent,
+                    'description': f'{title} for {calendar.month_name[month]} {year}',
+                    'createdAt': f'{spent}T12:00:00Z',
+                    'updatedAt': f'{spent}T12:00:00Z',
+                }
+
+class RepositorySink:
+    """Writes through SocietyRepository.insert_rows, then rebuilds the summary aggregates"""
+
+    def __init__(self, repo: SocietyRepository):
+        self.repo = repo
+
+    def write(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        self.repo.insert_rows(table, rows)
+
+    def close(self) -> None:
+        # insert_rows bypasses the write listeners that keep the aggregates current
+        self.repo.rebuild_aggregates()
+
+class NDJSONSink:
+    """One <table>.ndjson file per table in `directory`"""
+
+    def __init__(self, directory: Path):
+        from responses import dumps
+        self.dumps = dumps
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.files: Dict[str, IO[bytes]] = {}
+
+    def write(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        file = self.files.get(table)
+        if file is None:
+            file = self.files[table] = (self.directory / f'{table}.ndjson').open('wb')
+        file.write(b''.join(self.dumps(row) + b'\n' for row in rows))
+
+    def close(self) -> None:
+        for file in self.files.values():
+            file.close()
+
+def write_dataset(generator: SocietyGenerator, sink, tables: Sequence[str] = TABLES,
+                  chunk_size: int = INSERT_CHUNK_SIZE,
+                  progress: Optional[Callable[[str, int, float], None]] = None) -> Dict[str, Tuple[int, float]]:
+    """Stream each table into the sink in chunks; returns table -> (rows, seconds)"""
+    sources = generator.tables()
+    written: Dict[str, Tuple[int, float]] = {}
+    try:
+        for table in tables:
+            started = time.perf_counter()
+            count = 0
+            chunk: List[Dict[str, Any]] = []
+            for row in sources[table]():
+                chunk.append(row)
+                if len(chunk) >= chunk_size:
+                    sink.write(table, chunk)
+                    count += len(chunk)
+                    chunk = []
+            if chunk:
+                sink.write(table, chunk)
+                count += len(chunk)
+            written[table] = (count, time.perf_counter() - started)
+            if progress:
+                progress(table, *written[table])
+    finally:
+        sink.close()
+    return written
+
+class Target(str, Enum):
+    db = 'db'
+    sqlite = 'sqlite'
+    ndjson = 'ndjson'
+
+@app.command()
+def generate(
+    to: Target = typer.Option(Target.sqlite, help="db (the DB_BACKEND repository), sqlite or ndjson"),
+    output: Optional[Path] = typer.Option(None, help="SQLite file or NDJSON directory"),
+    seed: int = typer.Option(DatasetSpec.seed, help="Same seed and sizes, same rows"),
+    blocks: int = typer.Option(DatasetSpec.blocks),
+    flats: int = typer.Option(DatasetSpec.flats),
+    members: int = typer.Option(DatasetSpec.members),
+    vehicles: int = typer.Option(DatasetSpec.vehicles),
+    years: int = typer.Option(DatasetSpec.years, help="Months of payments and expenditures, in years"),
+    end_month: str = typer.Option(DatasetSpec.end_month, help="Last billed month as YYYY-MM"),
+    expenses_per_month: int = typer.Option(DatasetSpec.expenses_per_month),
+    only: Optional[List[str]] = typer.Option(None, help="Generate just these tables (repeatable)"),
+    chunk_size: int = typer.Option(5000, help="Rows per write")
+):
+    """Generate the dataset and report rows per table and throughput"""
+    tables = only or list(TABLES)
+    unknown = set(tables) - set(TABLES)
+    if unknown:
+        raise typer.BadParameter(f"unknown tables: {', '.join(sorted(unknown))}", param_hint="--only")
+    try:
+        datetime.strptime(end_month, '%Y-%m')
+    except ValueError:
+        raise typer.BadParameter("must be formatted as YYYY-MM", param_hint="--end-month")
+
+    if to is Target.db:
+        from database_simple import get_db
+        sink = RepositorySink(get_db())
+        chunk_size = min(chunk_size, INSERT_CHUNK_SIZE)
+    elif output is None:
+        raise typer.BadParameter(f"required with --to {to.value}", param_hint="--output")
+    elif to is Target.sqlite:
+        if output.exists():
+            raise typer.BadParameter(f"{output} already exists", param_hint="--output")
+        from database_sqlite import SQLiteDB
+        output.parent.mkdir(parents=True, exist_ok=True)
+        sink = RepositorySink(SQLiteDB(str(output)))
+    else:
+        sink = NDJSONSink(output)
+
+    generator = SocietyGenerator(DatasetSpec(seed, blocks, flats, members, vehicles, years, end_month,
+                                             expenses_per_month))
+
+    def report(table: str, rows: int, seconds: float) -> None:
+        typer.echo(f"{table:<22} {rows:>9} rows  {seconds:7.1f} s  {rows / max(seconds, 1e-9):>9.0f} rows/s")
+
+    started = time.perf_counter()
+    written = write_dataset(generator, sink, tables, chunk_size, report)
+    total = sum(rows for rows, _ in written.values())
+    typer.echo(f"Wrote {total} rows in {time.perf_counter() - started:.1f} s")
+
+if __name__ == "__main__":
+    app()
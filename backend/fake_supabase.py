@@ -0,0 +1,335 @@
+"""In-process stand-in for the part of the Supabase client SupabaseDB uses.
+
+FakeSupabaseClient answers client.table(...) query builders (select,
+insert, upsert, update, delete with eq/neq/gt/gte/lt/lte/is_/in_/or_
+filters, order and limit) and client.rpc(...) from an in-memory SQLite
+database built from the same schema as the embedded backend, so
+defaults, CHECK and UNIQUE constraints behave like the real tables.
+Every execute() can be delayed by an injected latency to model the
+network round trip:
+
+    db = SupabaseDB(client=FakeSupabaseClient(latency=0.004, jitter=0.002))
+"""
+import json
+import random
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from database_sqlite import SCHEMA, COLUMN_MIGRATIONS
+
+try:
+    from postgrest.exceptions import APIError
+except ImportError:  # supabase not installed
+    class APIError(Exception):
+        def __init__(self, error: Dict[str, Any]):
+            self.code = error.get('code')
+            self.message = error.get('message')
+            super().__init__(error)
+
+# Operators PostgREST filters use -> SQL
+OPERATORS = {'eq': '=', 'neq': '!=', 'gt': '>', 'gte': '>=', 'lt': '<', 'lte': '<='}
+
+class FakeResponse:
+    """Shape of postgrest's APIResponse that callers read"""
+
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+def _quote(column: str) -> str:
+    if not column.replace('_', '').isalnum():
+        raise APIError({'code': '42703', 'message': f'column "{column}" is not a plain identifier'})
+    return f'"{column}"'
+
+def _literal(text: str) -> Any:
+    """Value of an unquoted/quoted PostgREST filter operand; SQLite column affinity does the casting"""
+    if text.startswith('"') and text.endswith('"'):
+        return text[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    return {'true': 1, 'false': 0, 'null': None}.get(text, text)
+
+def _split_top_level(expression: str) -> List[str]:
+    parts, depth, quoted, escaped, current = [], 0, False, False, []
+    for char in expression:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif not quoted and char == '(':
+            depth += 1
+        elif not quoted and char == ')':
+            depth -= 1
+        elif not quoted and depth == 0 and char == ',':
+            parts.append(''.join(current))
+            current = []
+            continue
+        current.append(char)
+    parts.append(''.join(current))
+    return [part.strip() for part in parts if part.strip()]
+
+def parse_logic_tree(expression: str, joiner: str = 'OR') -> Tuple[str, List[Any]]:
+    """SQL for a PostgREST or=(...) expression such as a.gt.1,and(a.eq.1,id.gt."x")"""
+    clauses, params = [], []
+    for item in _split_top_level(expression):
+        for group, sql_joiner in (('and(', 'AND'), ('or(', 'OR')):
+            if item.startswith(group) and item.endswith(')'):
+                sql, nested = parse_logic_tree(item[len(group):-1], sql_joiner)
+                clauses.append(f'({sql})')
+                params.extend(nested)
+                break
+        else:
+            column, op, operand = item.split('.', 2)
+            if op == 'is':
+                clauses.append(f'{_quote(column)} IS NULL' if operand == 'null' else f'{_quote(column)} IS ?')
+                if operand != 'null':
+                    params.append(_literal(operand))
+            elif op in OPERATORS:
+                clauses.append(f'{_quote(column)} {OPERATORS[op]} ?')
+                params.append(_literal(operand))
+            else:
+                raise APIError({'code': 'PGRST100', 'message': f'unsupported operator "{op}"'})
+    return f' {joiner} '.join(clauses), params
+
+def _json_ready(payload: Any) -> Any:
+    # The real client sends JSON; a value it could not encode must fail here too
+    return json.loads(json.dumps(payload))
+
+class FakeQuery:
+    """Chainable request builder; nothing runs until execute()"""
+
+    def __init__(self, client: 'FakeSupabaseClient', table: str):
+        self.client = client
+        self.table = table
+        self.action = 'select'
+        self.columns = '*'
+        self.count = None
+        self.payload: Any = None
+        self.on_conflict: Optional[str] = None
+        self.ignore_duplicates = False
+        self.where: List[str] = []
+        self.params: List[Any] = []
+        self.orders: List[str] = []
+        self.row_limit: Optional[int] = None
+
+    # Actions
+    def select(self, columns: str = '*', count: Optional[str] = None) -> 'FakeQuery':
+        self.action, self.columns, self.count = 'select', columns, count
+        return self
+
+    def insert(self, rows: Any) -> 'FakeQuery':
+        self.action, self.payload = 'insert', _json_ready(rows)
+        return self
+
+    def upsert(self, rows: Any, on_conflict: str = '', ignore_duplicates: bool = False) -> 'FakeQuery':
+        self.action, self.payload = 'insert', _json_ready(rows)
+        self.on_conflict, self.ignore_duplicates = on_conflict or 'id', ignore_duplicates
+        return self
+
+    def update(self, data: Dict[str, Any]) -> 'FakeQuery':
+        self.action, self.payload = 'update', _json_ready(data)
+        return self
+
+    def delete(self) -> 'FakeQuery':
+        self.action = 'delete'
+        return self
+
+    # Filters
+    def _filter(self, column: str, op: str, value: Any) -> 'FakeQuery':
+        self.where.append(f'{_quote(column)} {OPERATORS[op]} ?')
+        self.params.append(value)
+        return self
+
+    def eq(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'eq', value)
+
+    def neq(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'neq', value)
+
+    def gt(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'gt', value)
+
+    def gte(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'gte', value)
+
+    def lt(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'lt', value)
+
+    def lte(self, column: str, value: Any) -> 'FakeQuery':
+        return self._filter(column, 'lte', value)
+
+    def is_(self, column: str, value: Any) -> 'FakeQuery':
+        if value in (None, 'null'):
+            self.where.append(f'{_quote(column)} IS NULL')
+        else:
+            self.where.append(f'{_quote(column)} IS ?')
+            self.params.append(_literal(str(value).lower()))
+        return self
+
+    def in_(self, column: str, values: Sequence[Any]) -> 'FakeQuery':
+        values = list(values)
+        self.where.append(f'{_quote(column)} IN ({", ".join("?" for _ in values)})' if values else '0')
+        self.params.extend(values)
+        return self
+
+    def or_(self, filters: str) -> 'FakeQuery':
+        sql, params = parse_logic_tree(filters)
+        self.where.append(f'({sql})')
+        self.params.extend(params)
+        return self
+
+    # Modifiers
+    def order(self, column: str, desc: bool = False, nullsfirst: Optional[bool] = None) -> 'FakeQuery':
+        # Postgres puts NULLs first in descending order unless told otherwise
+        nulls = 'FIRST' if (desc if nullsfirst is None else nullsfirst) else 'LAST'
+        self.orders.append(f'{_quote(column)} {"DESC" if desc else "ASC"} NULLS {nulls}')
+        return self
+
+    def limit(self, size: int) -> 'FakeQuery':
+        self.row_limit = size
+        return self
+
+    def execute(self) -> FakeResponse:
+        return self.client._execute(self)
+
+class FakeRPC:
+    def __init__(self, client: 'FakeSupabaseClient', name: str, params: Dict[str, Any]):
+        self.client = client
+        self.name = name
+        self.params = params
+
+    def execute(self) -> FakeResponse:
+        return self.client._call_function(self.name, self.params)
+
+class FakeSupabaseClient:
+    """Hermetic replacement for supabase.create_client(...) in tests and load runs.
+
+    `latency` seconds (plus up to `jitter` more, drawn from a seeded RNG)
+    are slept before each execute(), on the calling thread like a real
+    HTTP round trip. Functions for rpc() are registered with
+    register_function(name, fn); fn(client, **params) returns the data.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, seed: Optional[int] = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = 0
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self.functions: Dict[str, Callable[..., Any]] = {}
+        self.conn = sqlite3.connect(':memory:', isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        for table, column, column_type in COLUMN_MIGRATIONS:
+            existing = {col['name'] for col in self.conn.execute(f'PRAGMA table_info("{table}")')}
+            if column not in existing:
+                self.conn.execute(f'ALTER TABLE "{table}" ADD COLUMN "{column}" {column_type}')
+        self._bool_columns = {
+            table: {col['name'] for col in self.conn.execute(f'PRAGMA table_info("{table}")') if col['type'] == 'BOOLEAN'}
+            for (table,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    from_ = table
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> FakeRPC:
+        return FakeRPC(self, name, params or {})
+
+    def register_function(self, name: str, fn: Callable[..., Any]) -> None:
+        self.functions[name] = fn
+
+    def _delay(self) -> None:
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _call_function(self, name: str, params: Dict[str, Any]) -> FakeResponse:
+        self._delay()
+        fn = self.functions.get(name)
+        if fn is None:
+            raise APIError({'code': 'PGRST202', 'message': f'Could not find the function public.{name}'})
+        return FakeResponse(fn(self, **params))
+
+    def _rows(self, table: str, rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+        bools = self._bool_columns.get(table, ())
+        result = []
+        for row in rows:
+            data = dict(row)
+            for column in bools:
+                if data.get(column) is not None:
+                    data[column] = bool(data[column])
+            result.append(data)
+        return result
+
+    def _execute(self, query: FakeQuery) -> FakeResponse:
+        self._delay()
+        if query.table not in self._bool_columns:
+            raise APIError({'code': '42P01', 'message': f'relation "public.{query.table}" does not exist'})
+        where = f' WHERE {" AND ".join(query.where)}' if query.where else ''
+        table = f'"{query.table}"'
+        try:
+            with self._lock:
+                if query.action == 'select':
+                    return self._select(query, table, where)
+                if query.action == 'insert':
+                    return self._insert(query, table)
+                if query.action == 'update':
+                    columns = list(query.payload)
+                    if not columns:
+                        raise APIError({'code': 'PGRST102', 'message': 'Empty update body'})
+                    sql = (f'UPDATE {table} SET {", ".join(f"{_quote(c)} = ?" for c in columns)}'
+                           f'{where} RETURNING *')
+                    params = [query.payload[c] for c in columns] + query.params
+                else:
+                    sql = f'DELETE FROM {table}{where} RETURNING *'
+                    params = query.params
+                return FakeResponse(self._rows(query.table, self.conn.execute(sql, params).fetchall()))
+        except sqlite3.IntegrityError as e:
+            code = '23505' if 'UNIQUE' in str(e) else '23514' if 'CHECK' in str(e) else '23502'
+            raise APIError({'code': code, 'message': str(e)})
+        except sqlite3.OperationalError as e:
+            raise APIError({'code': '42703', 'message': str(e)})
+
+    def _select(self, query: FakeQuery, table: str, where: str) -> FakeResponse:
+        columns = '*' if query.columns.strip() == '*' else ', '.join(
+            _quote(c.strip()) for c in query.columns.split(','))
+        sql = f'SELECT {columns} FROM {table}{where}'
+        if query.orders:
+            sql += f' ORDER BY {", ".join(query.orders)}'
+        if query.row_limit is not None:
+            sql += f' LIMIT {int(query.row_limit)}'
+        rows = self._rows(query.table, self.conn.execute(sql, query.params).fetchall())
+        count = None
+        if query.count == 'exact':
+            count = self.conn.execute(f'SELECT COUNT(*) FROM {table}{where}', query.params).fetchone()[0]
+        return FakeResponse(rows, count)
+
+    def _insert(self, query: FakeQuery, table: str) -> FakeResponse:
+        rows = query.payload if isinstance(query.payload, list) else [query.payload]
+        created: List[sqlite3.Row] = []
+        # PostgREST inserts a request atomically
+        self.conn.execute('BEGIN')
+        try:
+            for row in rows:
+                columns = list(row)
+                sql = (f'INSERT INTO {table} ({", ".join(_quote(c) for c in columns)}) '
+                       f'VALUES ({", ".join("?" for _ in columns)})')
+                if query.on_conflict:
+                    target = ', '.join(_quote(c.strip()) for c in query.on_conflict.split(','))
+                    if query.ignore_duplicates:
+                        sql += f' ON CONFLICT ({target}) DO NOTHING'
+                    else:
+                        sql += (f' ON CONFLICT ({target}) DO UPDATE SET '
+                                + ', '.join(f'{_quote(c)} = excluded.{_quote(c)}' for c in columns))
+                created.extend(self.conn.execute(sql + ' RETURNING *', [row[c] for c in columns]).fetchall())
+            self.conn.execute('COMMIT')
+        except BaseException:
+            self.conn.execute('ROLLBACK')
+            raise
+        return FakeResponse(self._rows(query.table, created))
@@ -0,0 +1,170 @@
+import importlib.util
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PoolConfig:
+    """Connection pool of the HTTP client every Supabase client in the process shares.
+
+    Limits are per process: with several uvicorn workers the database sees
+    up to workers x max_connections connections. Idle connections are kept
+    for keepalive_expiry seconds (httpx defaults to 5), so bursts separated
+    by short lulls reuse them instead of paying TCP and TLS setup again.
+    """
+    max_connections: int = 20
+    max_keepalive: int = 20
+    keepalive_expiry: float = 60.0
+    http2: bool = True
+    connect_timeout: float = 5.0
+    # Matches DB_CALL_TIMEOUT, so a call AsyncRepository gave up on also frees its worker thread
+    read_timeout: float = 10.0
+    write_timeout: float = 10.0
+    # Longest wait for a free connection before httpx.PoolTimeout
+    pool_timeout: float = 5.0
+
+    @classmethod
+    def from_env(cls) -> 'PoolConfig':
+        max_connections = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "20"))
+        return cls(
+            max_connections=max_connections,
+            max_keepalive=int(os.getenv("SUPABASE_MAX_KEEPALIVE", str(max_connections))),
+            keepalive_expiry=float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "60")),
+            http2=os.getenv("SUPABASE_HTTP2", "true").lower() == "true",
+            connect_timeout=float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5")),
+            read_timeout=float(os.getenv("SUPABASE_READ_TIMEOUT", os.getenv("DB_CALL_TIMEOUT", "10"))),
+            write_timeout=float(os.getenv("SUPABASE_WRITE_TIMEOUT", "10")),
+            pool_timeout=float(os.getenv("SUPABASE_POOL_TIMEOUT", "5")),
+        )
+
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_keepalive,
+                            keepalive_expiry=self.keepalive_expiry)
+
+    def timeout(self) -> httpx.Timeout:
+        return httpx.Timeout(connect=self.connect_timeout, read=self.read_timeout, write=self.write_timeout,
+                             pool=self.pool_timeout)
+
+# First event once a new connection can carry requests: TLS done, or the first bytes sent on plain HTTP
+CONNECTED_EVENTS = ('connection.start_tls.complete', 'http11.send_request_headers.started',
+                    'http2.send_connection_init.started')
+
+class _ClosingStream(httpx.SyncByteStream):
+    """Response body that reports when the request releases its connection"""
+
+    def __init__(self, stream: httpx.SyncByteStream, on_close: Callable[[], None]):
+        self.stream = stream
+        self.on_close = on_close
+        self.closed = False
+
+    def __iter__(self):
+        yield from self.stream
+
+    def close(self) -> None:
+        try:
+            self.stream.close()
+        finally:
+            if not self.closed:
+                self.closed = True
+                self.on_close()
+
+class InstrumentedTransport(httpx.BaseTransport):
+    """Pooled HTTP transport feeding the supabase_http_* metrics.
+
+    New connections, TLS handshakes and their setup time come from the
+    httpcore trace events of each request; open, idle and queued counts
+    are sampled from the pool when /metrics is scraped.
+    """
+
+    def __init__(self, config: PoolConfig, transport: Optional[httpx.BaseTransport] = None):
+        self.config = config
+        self.transport = transport or httpx.HTTPTransport(http2=config.http2, limits=config.limits())
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        connect_started = None
+
+        def trace(event: str, info: Dict[str, Any]) -> None:
+            nonlocal connect_started
+            if event == 'connection.connect_tcp.started':
+                connect_started = time.perf_counter()
+            elif event == 'connection.connect_tcp.complete':
+                metrics.HTTP_POOL_CONNECTIONS_OPENED.inc()
+            elif event == 'connection.start_tls.complete':
+                metrics.HTTP_POOL_TLS_HANDSHAKES.inc()
+            if connect_started is not None and event in CONNECTED_EVENTS:
+                metrics.HTTP_POOL_CONNECT_LATENCY.observe(time.perf_counter() - connect_started)
+                connect_started = None
+
+        request.extensions['trace'] = trace
+        metrics.HTTP_POOL_IN_FLIGHT.inc()
+        try:
+            response = self.transport.handle_request(request)
+        except httpx.PoolTimeout:
+            metrics.HTTP_POOL_TIMEOUTS.inc()
+            metrics.HTTP_POOL_IN_FLIGHT.dec()
+            raise
+        except Exception:
+            metrics.HTTP_POOL_IN_FLIGHT.dec()
+            raise
+        response.stream = _ClosingStream(response.stream, metrics.HTTP_POOL_IN_FLIGHT.dec)
+        return response
+
+    def pool_state(self) -> Dict[str, int]:
+        """Open connections by state and requests queued for one (best effort; reads httpcore internals)"""
+        pool = getattr(self.transport, '_pool', None)
+        connections = list(getattr(pool, 'connections', ()))
+        idle = sum(1 for connection in connections if connection.is_idle())
+        waiting = sum(1 for request in list(getattr(pool, '_requests', ())) if request.is_queued())
+        return {'active': len(connections) - idle, 'idle': idle, 'waiting': waiting}
+
+    def close(self) -> None:
+        self.transport.close()
+
+def build_http_client(config: PoolConfig, transport: Optional[httpx.BaseTransport] = None) -> httpx.Client:
+    if config.http2 and importlib.util.find_spec('h2') is None:
+        logger.warning("SUPABASE_HTTP2 is on but the h2 package is missing; using HTTP/1.1")
+        config.http2 = False
+    return httpx.Client(transport=InstrumentedTransport(config, transport), timeout=config.timeout(),
+                        follow_redirects=True)
+
+_client: Optional[httpx.Client] = None
+_client_lock = threading.Lock()
+
+def get_http_client() -> httpx.Client:
+    """The process-wide pooled client, configured from SUPABASE_* environment variables"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            config = PoolConfig.from_env()
+            _client = build_http_client(config)
+            logger.info(f"Supabase HTTP pool: {config}")
+    return _client
+
+def close_http_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
+
+def collect_pool_metrics() -> None:
+    """Registry collector: sample the shared pool into the saturation gauges"""
+    transport = getattr(_client, '_transport', None)
+    if not isinstance(transport, InstrumentedTransport):
+        return
+    state = transport.pool_state()
+    metrics.HTTP_POOL_CONNECTIONS.set(state['active'], state='active')
+    metrics.HTTP_POOL_CONNECTIONS.set(state['idle'], state='idle')
+    metrics.HTTP_POOL_WAITING.set(state['waiting'])
+    metrics.HTTP_POOL_MAX_CONNECTIONS.set(transport.config.max_connections)
+
+metrics.REGISTRY.add_collector(collect_pool_metrics)
@@ -0,0 +1,190 @@
+import logging
+import re
+import time
+import typing
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models import House, HouseCreate, MaintenancePaymentCreate, Member, MemberCreate, Vehicle, VehicleCreate
+from repository import INSERT_CHUNK_SIZE, BatchOp
+
+logger = logging.getLogger(__name__)
+
+# Rows read, validated and inserted at a time
+IMPORT_CHUNK_SIZE = 5000
+
+# Row errors listed in the report; the counts always cover every row
+MAX_REPORTED_ERRORS = 1000
+
+# Importable tables: the schema rows are validated against and, when the
+# API generates ids and timestamps for the entity, the record model that
+# supplies them
+IMPORT_SPECS = {
+    'houses': {'model': HouseCreate, 'record': House},
+    'members': {'model': MemberCreate, 'record': Member},
+    'vehicles': {'model': VehicleCreate, 'record': Vehicle},
+    'maintenance_payments': {'model': MaintenancePaymentCreate, 'record': None},
+}
+
+# Mirrors the CHECK constraints of setup_database.sql; matched case-insensitively
+ALLOWED_VALUES = {
+    'houses': {'status': ('occupied', 'vacant', 'maintenance')},
+    'members': {
+        'role': ('Owner', 'Tenant', 'Family Member'),
+        'relationship': ('Owner', 'Father', 'Mother', 'Son', 'Daughter', 'Spouse', 'Other'),
+        'status': ('active', 'inactive'),
+    },
+    'vehicles': {'type': ('Two Wheeler', 'Four Wheeler'), 'status': ('active', 'inactive')},
+    'maintenance_payments': {'status': ('pending', 'partial', 'paid', 'overdue')},
+}
+
+# Stored as YYYY-MM-DD
+DATE_COLUMNS = {
+    'vehicles': ('registrationDate',),
+    'maintenance_payments': ('dueDate',),
+}
+
+BOOLEAN_VALUES = {'true': True, 'yes': True, 'y': True, '1': True,
+                  'false': False, 'no': False, 'n': False, '0': False}
+
+def _normalize_header(name: Any) -> str:
+    """'House No', 'house_no' and 'houseNo' all become 'houseno'"""
+    return re.sub(r'[^a-z0-9]', '', str(name).lower())
+
+def _base_type(annotation: Any) -> Any:
+    args = [a for a in typing.get_args(annotation) if a is not type(None)]
+    return args[0] if args else annotation
+
+def _parse_dates(text: pd.Series) -> pd.Series:
+    # ISO first so 2025-05-10 is never read day-first; then 10/05/2025 style dates
+    iso = pd.to_datetime(text, errors='coerce', format='ISO8601')
+    rest = pd.to_datetime(text.where(iso.isna()), errors='coerce', format='mixed', dayfirst=True)
+    return iso.fillna(rest).dt.strftime('%Y-%m-%d').astype('string')
+
+def _to_python(values: pd.Series) -> List[Any]:
+    return values.astype(object).where(values.notna(), None).tolist()
+
+def read_chunks(file: BinaryIO, filename: str, chunk_size: int = IMPORT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Read a CSV in chunks of `chunk_size` rows, or a whole Excel sheet split into chunks"""
+    if filename.lower().endswith(('.xlsx', '.xls')):
+        # Excel workbooks cannot be read incrementally
+        frame = pd.read_excel(file, dtype=str)
+        for start in range(0, len(frame), chunk_size):
+            yield frame.iloc[start:start + chunk_size]
+        return
+    yield from pd.read_csv(file, dtype=str, keep_default_na=False, chunksize=chunk_size, skipinitialspace=True)
+
+def validate_frame(table: str, frame: pd.DataFrame, first_row: int) -> Tuple[List[Dict[str, Any]], List[int], List[Dict[str, Any]]]:
+    """Validate and normalize a chunk column by column.
+
+    Returns the rows ready to insert, their spreadsheet row numbers and
+    the errors of the rejected rows (row, column, error).
+    """
+    spec = IMPORT_SPECS[table]
+    allowed = ALLOWED_VALUES.get(table, {})
+    dates = DATE_COLUMNS.get(table, ())
+    headers = {_normalize_header(column): column for column in frame.columns}
+    missing = [name for name, info in spec['model'].model_fields.items()
+               if info.is_required() and _normalize_header(name) not in headers]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    row_numbers = np.arange(first_row, first_row + len(frame))
+    invalid = np.zeros(len(frame), dtype=bool)
+    errors: List[Dict[str, Any]] = []
+    columns: Dict[str, pd.Series] = {}
+
+    def reject(column: str, mask: pd.Series, message: str) -> None:
+        mask = mask.to_numpy(dtype=bool, na_value=False)
+        for row in row_numbers[mask]:
+            errors.append({"row": int(row), "column": column, "error": message})
+        invalid[mask] = True
+
+    for name, info in spec['model'].model_fields.items():
+        source = headers.get(_normalize_header(name))
+        if source is None:
+            text = pd.Series(pd.NA, index=frame.index, dtype='string')
+        else:
+            text = frame[source].astype('string').str.strip().replace('', pd.NA)
+        kind = _base_type(info.annotation)
+
+        if name in dates:
+            values = _parse_dates(text)
+            reject(name, text.notna() & values.isna(), "is not a date")
+        elif name in allowed:
+            canonical = {value.lower(): value for value in allowed[name]}
+            values = text.str.lower().map(canonical).astype('string')
+            reject(name, text.notna() & values.isna(), f"must be one of {', '.join(allowed[name])}")
+        elif kind in (int, float):
+            values = pd.to_numeric(text.str.replace(',', '', regex=False), errors='coerce')
+            bad = text.notna() & values.isna()
+            if kind is int:
+                bad |= values.notna() & (values % 1 != 0)
+                values = values.where(~bad).astype('Int64')
+            reject(name, bad, f"is not a{'n integer' if kind is int else ' number'}")
+        elif kind is bool:
+            values = text.str.lower().map(BOOLEAN_VALUES).astype('boolean')
+            reject(name, text.notna() & values.isna(), "is not a yes/no value")
+        else:
+            values = text
+
+        if info.is_required():
+            reject(name, text.isna(), "is required")
+        elif info.default is not None:
+            values = values.fillna(info.default)
+        columns[name] = values
+
+    valid = ~invalid
+    count = int(valid.sum())
+    data = {name: _to_python(values[valid]) for name, values in columns.items()}
+    record = spec['record']
+    if record is not None:
+        # Ids, timestamps and counters the API would fill in on a single create
+        for name, info in record.model_fields.items():
+            if name not in data:
+                data[name] = [info.default_factory() for _ in range(count)] if info.default_factory else [info.default] * count
+    names = list(data)
+    rows = [dict(zip(names, values)) for values in zip(*data.values())]
+    errors.sort(key=lambda error: error["row"])
+    return rows, row_numbers[valid].tolist(), errors
+
+def import_file(repo, table: str, file: BinaryIO, filename: str, dry_run: bool = False,
+                chunk_size: int = IMPORT_CHUNK_SIZE) -> Dict[str, Any]:
+    """Validate a CSV/Excel file chunk by chunk and bulk-insert the valid rows"""
+    started = time.perf_counter()
+    total = imported = failed = error_count = 0
+    errors: List[Dict[str, Any]] = []
+    first_row = 2  # row 1 holds the headers
+
+    for frame in read_chunks(file, filename, chunk_size):
+        rows, row_numbers, row_errors = validate_frame(table, frame, first_row)
+        total += len(frame)
+        first_row += len(frame)
+        failed += len({error["row"] for error in row_errors})
+        error_count += len(row_errors)
+        errors.extend(row_errors[:MAX_REPORTED_ERRORS - len(errors)])
+        if dry_run:
+            imported += len(rows)
+            continue
+        operations = [BatchOp('create', data=row) for row in rows]
+        for row_number, outcome in zip(row_numbers, repo.apply_batch(table, operations, INSERT_CHUNK_SIZE)):
+            if outcome.outcome == 'created':
+                imported += 1
+            else:
+                failed += 1
+                error_count += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"row": row_number, "column": None, "error": outcome.error})
+
+    logger.info(f"Imported {imported}/{total} {table} rows from {filename}")
+    return {
+        "table": table,
+        "dryRun": dry_run,
+        "rows": total,
+        "imported": imported,
+        "failed": failed,
+        "errors": errors,
+        "errorsTruncated": error_count > len(errors),
+        "durationMs": round((time.perf_counter() - started) * 1000, 1),
+    }
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Maintenance commands for a running Society Management API.
+
+Usage: python manage.py aggregates verify --api-url http://localhost:8001
+"""
+import json
+import os
+from pathlib import Path
+
+import requests
+import typer
+
+app = typer.Typer(help="Society Management maintenance commands")
+aggregates_app = typer.Typer(help="Summary aggregate store")
+ledger_app = typer.Typer(help="Society ledger balance")
+attachments_app = typer.Typer(help="Expenditure attachment blob store")
+app.add_typer(aggregates_app, name="aggregates")
+app.add_typer(ledger_app, name="ledger")
+app.add_typer(attachments_app, name="attachments")
+
+DEFAULT_API_URL = os.getenv("API_URL", "http://localhost:8001")
+
+def _call(method: str, api_url: str, path: str, params: dict = None) -> dict:
+    response = requests.request(method, f"{api_url.rstrip('/')}/api{path}", params=params, timeout=300)
+    response.raise_for_status()
+    return response.json()
+
+@aggregates_app.command("verify")
+def verify_aggregates(api_url: str = typer.Option(DEFAULT_API_URL, help="Base URL of the API")):
+    """Recompute aggregates from scratch and report drift (exit code 1 on drift)"""
+    result = _call("GET", api_url, "/admin/aggregates/verify")
+    if result["ok"]:
+        typer.echo("Aggregates match the raw tables")
+        return
+    typer.echo(f"Found {len(result['drift'])} drifted counters:")
+    for item in result["drift"]:
+        typer.echo(json.dumps(item))
+    raise typer.Exit(code=1)
+
+@aggregates_app.command("rebuild")
+def rebuild_aggregates(api_url: str = typer.Option(DEFAULT_API_URL, help="Base URL of the API")):
+    """Rebuild aggregates from the raw tables"""
+    typer.echo(_call("POST", api_url, "/admin/aggregates/rebuild")["message"])
+
+@ledger_app.command("reconcile")
+def reconcile_ledger(api_url: str = typer.Option(DEFAULT_API_URL, help="Base URL of the API")):
+    """Check the ledger balance against the raw tables (exit code 1 on mismatch)"""
+    result = _call("GET", api_url, "/admin/ledger/reconcile")
+    if result["ok"]:
+        typer.echo(f"Ledger reconciled, balance {result['balance']:.2f}")
+        return
+    typer.echo(f"Found {len(result['mismatches'])} ledger mismatches:")
+    for item in result["mismatches"]:
+        typer.echo(json.dumps(item))
+    raise typer.Exit(code=1)
+
+@attachments_app.command("migrate")
+def migrate_attachments(
+    api_url: str = typer.Option(DEFAULT_API_URL, help="Base URL of the API"),
+    batch_size: int = typer.Option(50, help="Expenditures scanned per request")
+):
+    """Move inline base64 expenditure attachments into the blob store (exit code 1 on failures)"""
+    migrated = failed = 0
+    cursor = None
+    while True:
+        params = {"limit": batch_size, **({"cursor": cursor} if cursor else {})}
+        result = _call("POST", api_url, "/admin/attachments/migrate", params=params)
+        migrated += result["migrated"]
+        failed += result["failed"]
+        cursor = result["nextCursor"]
+        if not cursor:
+            break
+    typer.echo(f"Migrated {migrated} attachments, {failed} failed")
+    if failed:
+        raise typer.Exit(code=1)
+
+@attachments_app.command("sweep")
+def sweep_attachments(api_url: str = typer.Option(DEFAULT_API_URL, help="Base URL of the API")):
+    """Delete stored attachments no expenditure references (kept for ATTACHMENT_ORPHAN_GRACE seconds)"""
+    result = _call("POST", api_url, "/admin/attachments/sweep")
+    typer.echo(f"Deleted {result['deleted']} orphaned attachments, kept {result['kept']}")
+
+@app.command("import")
+def import_entity(
+    entity: str = typer.Argument(..., help="houses, members, vehicles or payments"),
+    path: Path = typer.Argument(..., exists=True, dir_okay=False, help="CSV or Excel file"),
+    dry_run: bool = typer.Option(False, help="Validate only, insert nothing"),
+    api_url: str = typer.Option(DEFAULT_API_URL, help="Base URL of the API")
+):
+    """Bulk-import a spreadsheet (exit code 1 if any row failed)"""
+    with path.open("rb") as file:
+        response = requests.post(f"{api_url.rstrip('/')}/api/import/{entity}", params={"dryRun": dry_run},
+                                 files={"file": (path.name, file)}, timeout=600)
+    response.raise_for_status()
+    result = response.json()
+    verb = "Validated" if result["dryRun"] else "Imported"
+    typer.echo(f"{verb} {result['imported']} of {result['rows']} rows in {result['durationMs']} ms")
+    for error in result["errors"]:
+        typer.echo(json.dumps(error))
+    if result["failed"]:
+        typer.echo(f"{result['failed']} rows failed")
+        raise typer.Exit(code=1)
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,219 @@
+import bisect
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+# Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+class Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+        lines.extend(self.samples())
+        return '\n'.join(lines)
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f'{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}' for key, value in items]
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(Metric):
+    """Cumulative-bucket histogram of observed durations, in seconds"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = REQUEST_BUCKETS):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(counts), total) for key, (counts, total) in self._series.items())
+        lines = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.label_names, key, le)} {cumulative}')
+            labels = _format_labels(self.label_names, key)
+            lines.append(f'{self.name}_sum{labels} {repr(total)}')
+            lines.append(f'{self.name}_count{labels} {cumulative}')
+        return lines
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(self, name: str, documentation: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = REQUEST_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def add_collector(self, collect: Callable[[], None]) -> None:
+        """Called before every render, to refresh gauges sampled from elsewhere"""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            collect()
+        return '\n'.join(metric.render() for metric in self._metrics.values()) + '\n'
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'http_requests_total', 'HTTP requests handled', ('method', 'route', 'status'))
+HTTP_LATENCY = REGISTRY.histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ('method', 'route', 'status'))
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    'http_requests_in_flight', 'HTTP requests being handled')
+DB_LATENCY = REGISTRY.histogram(
+    'db_call_duration_seconds', 'Latency of repository primitive calls', ('table', 'op'), DB_BUCKETS)
+DB_ERRORS = REGISTRY.counter(
+    'db_call_errors_total', 'Repository primitive calls that raised', ('table', 'op'))
+DB_ROWS = REGISTRY.counter(
+    'db_rows_total', 'Rows returned or affected by repository primitive calls', ('table', 'op'))
+
+# Fed by http_pool when the supabase backend is in use
+HTTP_POOL_CONNECTIONS = REGISTRY.gauge(
+    'supabase_http_pool_connections', 'Open connections in the Supabase HTTP pool', ('state',))
+HTTP_POOL_MAX_CONNECTIONS = REGISTRY.gauge(
+    'supabase_http_pool_max_connections', 'Connection limit of the Supabase HTTP pool')
+HTTP_POOL_WAITING = REGISTRY.gauge(
+    'supabase_http_pool_waiting', 'Requests queued for a free pool connection')
+HTTP_POOL_IN_FLIGHT = REGISTRY.gauge(
+    'supabase_http_requests_in_flight', 'Supabase HTTP requests holding a connection')
+HTTP_POOL_TIMEOUTS = REGISTRY.counter(
+    'supabase_http_pool_timeouts_total', 'Requests that gave up waiting for a pool connection')
+HTTP_POOL_CONNECTIONS_OPENED = REGISTRY.counter(
+    'supabase_http_connections_opened_total', 'TCP connections opened to Supabase')
+HTTP_POOL_TLS_HANDSHAKES = REGISTRY.counter(
+    'supabase_http_tls_handshakes_total', 'TLS handshakes with Supabase')
+HTTP_POOL_CONNECT_LATENCY = REGISTRY.histogram(
+    'supabase_http_connect_duration_seconds', 'Time to open a connection, TLS included', (), DB_BUCKETS)
+
+class DatabaseCallMetrics:
+    """Call listener feeding the db_* metrics"""
+
+    def on_call(self, table: str, op: str, duration: float, rows: int, error: Optional[BaseException] = None) -> None:
+        DB_LATENCY.observe(duration, table=table, op=op)
+        if error is not None:
+            DB_ERRORS.inc(table=table, op=op)
+        elif rows:
+            DB_ROWS.inc(rows, table=table, op=op)
+
+def route_label(scope) -> str:
+    """Path template of the matched route (/api/houses/{house_id}); keeps label cardinality bounded"""
+    route = scope.get('route')
+    return getattr(route, 'path', None) or 'unmatched'
+
+class MetricsMiddleware:
+    """Counts requests and records their latency by method, route template and status"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            labels = {'method': scope['method'], 'route': route_label(scope), 'status': status}
+            HTTP_REQUESTS.inc(**labels)
+            HTTP_LATENCY.observe(time.perf_counter() - started, **labels)
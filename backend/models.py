@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Any, Dict, Literal, Optional, List
 from datetime import datetime
 import uuid
 
@@ -168,7 +168,10 @@ class Expenditure(BaseModel):
     date: str  # YYYY-MM-DD
     description: Optional[str] = None
     attachmentName: Optional[str] = None
-    attachmentData: Optional[str] = None  # base64 encoded
+    attachmentData: Optional[str] = None  # legacy inline base64, moved to the blob store
+    attachmentRef: Optional[str] = None  # sha256 of the content in the blob store
+    attachmentSize: Optional[int] = None
+    attachmentType: Optional[str] = None
     createdAt: str = Field(default_factory=get_current_timestamp)
     updatedAt: Optional[str] = None
 
@@ -180,7 +183,7 @@ class ExpenditureCreate(BaseModel):
     date: str
     description: Optional[str] = None
     attachmentName: Optional[str] = None
-    attachmentData: Optional[str] = None
+    attachmentData: Optional[str] = None  # base64 or data URL, stored in the blob store
 
 class ExpenditureUpdate(BaseModel):
     title: Optional[str] = None
@@ -192,6 +195,18 @@ class ExpenditureUpdate(BaseModel):
     attachmentName: Optional[str] = None
     attachmentData: Optional[str] = None
 
+# Batch requests
+MAX_BATCH_OPERATIONS = 5000
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[str] = None  # required for update and delete
+    data: Optional[Dict[str, Any]] = None  # the entity's Create or Update model
+    version: Optional[str] = None  # row ETag (or its updatedAt) the write expects, like If-Match
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(..., min_length=1, max_length=MAX_BATCH_OPERATIONS)
+
 # Response models
 class HousesListResponse(BaseModel):
     list: List[House]
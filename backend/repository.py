@@ -0,0 +1,732 @@
+import base64
+import functools
+import itertools
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import List, Dict, Any, Iterator, Optional, Sequence, Tuple, Union
+from aggregates import AggregateStore, reconcile_ledger
+from versions import TableVersions
+
+logger = logging.getLogger(__name__)
+
+# Table name -> singular label used in log messages
+TABLES = {
+    'houses': 'house',
+    'members': 'member',
+    'vehicles': 'vehicle',
+    'maintenance_payments': 'payment',
+    'expenditures': 'expenditure',
+}
+
+# Per-table columns that list queries may filter (equality or range) and sort on.
+# Sort keys are NOT NULL columns so (sort key, id) is a total keyset order.
+LIST_SPECS = {
+    'houses': {
+        'filters': ('status', 'block', 'floor'),
+        'ranges': (),
+        'sorts': ('houseNo', 'block', 'status', 'id'),
+        'default_sort': 'houseNo',
+    },
+    'members': {
+        'filters': ('status', 'house', 'role'),
+        'ranges': (),
+        'sorts': ('name', 'house', 'role', 'id'),
+        'default_sort': 'name',
+    },
+    'vehicles': {
+        'filters': ('status', 'house', 'type'),
+        'ranges': (),
+        'sorts': ('number', 'house', 'type', 'id'),
+        'default_sort': 'number',
+    },
+    'maintenance_payments': {
+        'filters': ('status', 'house', 'month'),
+        'ranges': ('dueDate', 'paidDate'),
+        'sorts': ('dueDate', 'house', 'amount', 'status', 'id'),
+        'default_sort': 'dueDate',
+    },
+    'expenditures': {
+        'filters': ('category', 'paymentMode'),
+        'ranges': ('date',),
+        'sorts': ('date', 'amount', 'category', 'id'),
+        'default_sort': 'date',
+    },
+}
+
+MAX_PAGE_SIZE = 1000
+
+# Expenditure columns returned by list reads: attachments are referenced, never inlined
+EXPENDITURE_LIST_COLUMNS = (
+    'id', 'title', 'category', 'amount', 'paymentMode', 'date', 'description',
+    'attachmentName', 'attachmentRef', 'attachmentSize', 'attachmentType', 'createdAt', 'updatedAt',
+)
+
+# Rows per bulk insert statement
+INSERT_CHUNK_SIZE = 500
+
+# Uniquely indexed columns that tell which row a batch create inserted (payment ids come from the database)
+CREATE_KEYS = {
+    'houses': ('id',),
+    'members': ('id',),
+    'vehicles': ('id',),
+    'maintenance_payments': ('house', 'month'),
+}
+
+# Primitives reported to call listeners (update_rows is reported through its update_row calls)
+OBSERVED_PRIMITIVES = ('insert_row', 'insert_rows', 'list_rows', 'get_row', 'update_row', 'delete_row', 'delete_rows',
+                       'count_rows', 'table_state')
+
+class VersionConflictError(Exception):
+    """Raised when a conditional write finds the row at a different version"""
+
+    def __init__(self, table: str, row_id: Any, current: Dict[str, Any]):
+        super().__init__(f"{TABLES[table]} {row_id} was modified concurrently")
+        self.current = current
+
+@dataclass
+class ListQuery:
+    """A keyset-paginated, filtered and sorted list request.
+
+    `filters` are equality matches, `ranges` map a column to an inclusive
+    (low, high) pair where either end may be None, and `cursor` is the
+    opaque token returned as `Page.next_cursor` by the previous page.
+    """
+    filters: Dict[str, Any] = field(default_factory=dict)
+    ranges: Dict[str, Tuple[Optional[Any], Optional[Any]]] = field(default_factory=dict)
+    sort: str = 'id'
+    descending: bool = False
+    limit: int = 50
+    cursor: Optional[str] = None
+    columns: Optional[Sequence[str]] = None
+
+@dataclass
+class Page:
+    rows: List[Dict[str, Any]]
+    next_cursor: Optional[str] = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+@dataclass(frozen=True)
+class TableState:
+    """What one cheap query tells about a table's contents: its change counter.
+
+    The database bumps the counter (table_versions) from a trigger on
+    every row inserted, updated or deleted, whoever wrote it, so two
+    processes (or two reads) seeing the same version saw the same rows.
+    """
+    version: int
+
+@dataclass
+class BatchOp:
+    """One validated operation of a batch request"""
+    op: str  # create, update, delete
+    id: Any = None
+    data: Optional[Dict[str, Any]] = None
+    expected_version: Optional[str] = None
+
+@dataclass
+class BatchOutcome:
+    outcome: str  # created, updated, deleted, not_found, conflict, error
+    id: Any = None
+    row: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+def encode_cursor(query: ListQuery, row: Dict[str, Any]) -> str:
+    payload = {'s': query.sort, 'd': query.descending, 'v': row.get(query.sort), 'id': row.get('id')}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+def decode_cursor(query: ListQuery) -> Optional[Tuple[Any, Any]]:
+    """Return the (sort value, id) position encoded in the query's cursor"""
+    if not query.cursor:
+        return None
+    try:
+        padded = query.cursor + '=' * (-len(query.cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        position = payload['s'], payload['d'], payload['v'], payload['id']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if position[:2] != (query.sort, query.descending):
+        raise ValueError("Cursor does not match the requested sort order")
+    return position[2], position[3]
+
+def validate_query(table: str, query: ListQuery) -> None:
+    spec = LIST_SPECS[table]
+    unknown = set(query.filters) - set(spec['filters'])
+    if unknown:
+        raise ValueError(f"Cannot filter {table} by {sorted(unknown)}")
+    unknown = set(query.ranges) - set(spec['ranges'])
+    if unknown:
+        raise ValueError(f"Cannot filter {table} by range on {sorted(unknown)}")
+    if query.sort not in spec['sorts']:
+        raise ValueError(f"Cannot sort {table} by {query.sort}")
+    if not 1 <= query.limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    decode_cursor(query)
+
+def page_from_rows(query: ListQuery, rows: List[Dict[str, Any]]) -> Page:
+    """Build a Page from up to limit + 1 fetched rows"""
+    if len(rows) > query.limit:
+        rows = rows[:query.limit]
+        return Page(rows=rows, next_cursor=encode_cursor(query, rows[-1]))
+    return Page(rows=rows)
+
+def row_count(result: Any) -> int:
+    """Rows a primitive returned or affected"""
+    if isinstance(result, Page):
+        return len(result.rows)
+    if isinstance(result, list):
+        return len(result)
+    if isinstance(result, bool):
+        return int(result)
+    return 0 if result is None else 1
+
+def query_columns(query: ListQuery) -> Optional[List[str]]:
+    """Columns to select, always including the keyset columns"""
+    if query.columns is None:
+        return None
+    columns = list(dict.fromkeys(query.columns))
+    for key in (query.sort, 'id'):
+        if key not in columns:
+            columns.append(key)
+    return columns
+
+class SocietyRepository(ABC):
+    """Storage interface shared by every database backend.
+
+    Backends only implement the table-level primitives below; the entity
+    methods used by the API (create_house, get_payments, ...) are defined
+    once here on top of them, so every backend behaves the same way on
+    errors and cross-cutting features only need to hook the primitives.
+
+    Writes made through the entity methods are reported to every
+    registered write listener as on_write(table, op, row_id, row) with op
+    one of 'insert', 'update' or 'delete'. Once a call listener is added,
+    every primitive call is reported to it as
+    on_call(table, op, duration, rows, error).
+    """
+
+    def __init__(self):
+        self._write_listeners: List[Any] = []
+        self._call_listeners: List[Any] = []
+        self._call_state = threading.local()
+        self.aggregates = AggregateStore()
+        self.add_write_listener(self.aggregates)
+        self.versions = TableVersions()
+        self.add_write_listener(self.versions)
+        self.cache = None
+
+    def enable_cache(self, cache: Any) -> None:
+        """Serve get-by-id lookups through a read-through EntityCache"""
+        self.cache = cache
+        self.add_write_listener(cache)
+
+    def add_write_listener(self, listener: Any) -> None:
+        self._write_listeners.append(listener)
+
+    def add_call_listener(self, listener: Any) -> None:
+        if not self._call_listeners:
+            # Primitives are only wrapped once someone listens
+            for op in OBSERVED_PRIMITIVES:
+                setattr(self, op, self._observed(op, getattr(self, op)))
+        self._call_listeners.append(listener)
+
+    def _observed(self, op: str, fn: Any) -> Any:
+        @functools.wraps(fn)
+        def call(table: str, *args: Any, **kwargs: Any) -> Any:
+            state = self._call_state
+            if getattr(state, 'active', False):
+                # A primitive used by another (update_row reading the row back) is part of the outer call
+                return fn(table, *args, **kwargs)
+            state.active = True
+            result = error = None
+            started = time.perf_counter()
+            try:
+                result = fn(table, *args, **kwargs)
+                return result
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                state.active = False
+                duration = time.perf_counter() - started
+                rows = row_count(result)
+                for listener in self._call_listeners:
+                    try:
+                        listener.on_call(table, op, duration, rows, error)
+                    except Exception as e:
+                        logger.error(f"Call listener {type(listener).__name__} failed on {table}: {e}")
+        return call
+
+    def _notify(self, table: str, op: str, row_id: Any, row: Optional[Dict[str, Any]] = None) -> None:
+        for listener in self._write_listeners:
+            try:
+                listener.on_write(table, op, row_id, row)
+            except Exception as e:
+                logger.error(f"Write listener {type(listener).__name__} failed on {table}: {e}")
+
+    # Table-level primitives
+    @abstractmethod
+    def insert_row(self, table: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Insert a row and return it as stored"""
+
+    @abstractmethod
+    def insert_rows(self, table: str, rows: List[Dict[str, Any]],
+                    on_conflict: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        """Insert many rows in as few statements as possible.
+
+        With `on_conflict`, rows that collide with an existing row on
+        those (uniquely indexed) columns are skipped instead of failing.
+        Returns only the rows actually inserted.
+        """
+
+    @abstractmethod
+    def list_rows(self, table: str, query: ListQuery) -> Page:
+        """Return one keyset page of a table.
+
+        Implementations fetch `query.limit + 1` rows ordered by
+        (sort, id) strictly after the cursor position and hand them to
+        page_from_rows().
+        """
+
+    @abstractmethod
+    def get_row(self, table: str, row_id: Any) -> Optional[Dict[str, Any]]:
+        """Return a single row by primary key"""
+
+    @abstractmethod
+    def update_row(self, table: str, row_id: Any, data: Dict[str, Any],
+                   expected: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Update a row by primary key in one statement and return the new version.
+
+        With `expected`, only a row whose columns still hold those values
+        is updated. Returns None when no row matched.
+        """
+
+    @abstractmethod
+    def delete_row(self, table: str, row_id: Any, expected: Optional[Dict[str, Any]] = None) -> bool:
+        """Delete a row by primary key (and `expected` column values), returning whether one matched"""
+
+    @abstractmethod
+    def delete_rows(self, table: str, row_ids: List[Any]) -> List[Any]:
+        """Delete many rows by primary key in as few statements as possible, returning the ids deleted"""
+
+    @abstractmethod
+    def count_rows(self, table: str, query: ListQuery) -> int:
+        """Number of rows matching a query's filters and ranges (cursor, sort and limit are ignored)"""
+
+    @abstractmethod
+    def table_state(self, table: str) -> TableState:
+        """Change counter of a table, in one round trip"""
+
+    def update_rows(self, table: str, updates: List[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]
+                    ) -> List[Union[Optional[Dict[str, Any]], Exception]]:
+        """Apply (row_id, data, expected) updates, returning per update what update_row would.
+
+        A failing update yields its exception in place of the row instead
+        of aborting the rest. Backends that can group the statements
+        (e.g. in one transaction) override this.
+        """
+        results: List[Union[Optional[Dict[str, Any]], Exception]] = []
+        for row_id, data, expected in updates:
+            try:
+                results.append(self.update_row(table, row_id, data, expected))
+            except Exception as e:
+                results.append(e)
+        return results
+
+    # Shared behaviour
+    def iter_rows(self, table: str, query: Optional[ListQuery] = None, chunk_size: int = MAX_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+        """Yield every matching row, fetching keyset pages of `chunk_size`"""
+        query = replace(query or ListQuery(), limit=chunk_size, cursor=None)
+        validate_query(table, query)
+        while True:
+            page = self.list_rows(table, query)
+            yield from page.rows
+            if not page.has_more:
+                return
+            query = replace(query, cursor=page.next_cursor)
+
+    def fetch_all(self, table: str, query: Optional[ListQuery] = None) -> List[Dict[str, Any]]:
+        return list(self.iter_rows(table, query))
+
+    def _page(self, table: str, query: ListQuery) -> Page:
+        """One page for an API response: only the requested columns, even if the keyset needed more"""
+        validate_query(table, query)
+        try:
+            page = self.list_rows(table, query)
+        except Exception as e:
+            logger.error(f"Error listing {table}: {e}")
+            raise
+        if query.columns is not None and page.rows:
+            wanted = set(query.columns)
+            if len(page.rows[0]) > len(wanted):
+                page.rows = [{k: v for k, v in row.items() if k in wanted} for row in page.rows]
+        return page
+
+    def _count(self, table: str, query: ListQuery) -> int:
+        validate_query(table, query)
+        try:
+            return self.count_rows(table, query)
+        except Exception as e:
+            logger.error(f"Error counting {table}: {e}")
+            raise
+
+    @staticmethod
+    def _stamped(data: Dict[str, Any]) -> Dict[str, Any]:
+        """Row data carrying a version: its own updatedAt, else now"""
+        return {**data, 'updatedAt': data.get('updatedAt') or datetime.utcnow().isoformat() + 'Z'}
+
+    def _create(self, table: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        try:
+            row = self.insert_row(table, self._stamped(data))
+        except Exception as e:
+            logger.error(f"Error creating {TABLES[table]}: {e}")
+            raise
+        if row:
+            self._notify(table, 'insert', row.get('id'), row)
+        return row
+
+    def _create_many(self, table: str, rows: List[Dict[str, Any]],
+                     on_conflict: Optional[Sequence[str]] = None,
+                     chunk_size: int = INSERT_CHUNK_SIZE) -> List[Dict[str, Any]]:
+        created: List[Dict[str, Any]] = []
+        try:
+            for start in range(0, len(rows), chunk_size):
+                chunk = [self._stamped(row) for row in rows[start:start + chunk_size]]
+                created.extend(self.insert_rows(table, chunk, on_conflict))
+        except Exception as e:
+            logger.error(f"Error creating {TABLES[table]} batch: {e}")
+            raise
+        finally:
+            for row in created:
+                self._notify(table, 'insert', row.get('id'), row)
+        return created
+
+    def _list(self, table: str, limit: Optional[int], columns: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+        try:
+            return list(itertools.islice(self.iter_rows(table, ListQuery(columns=columns)), limit))
+        except Exception as e:
+            logger.error(f"Error getting {table}: {e}")
+            return []
+
+    def _get(self, table: str, row_id: Any) -> Optional[Dict[str, Any]]:
+        generation = None
+        if self.cache is not None:
+            row = self.cache.get(table, row_id)
+            if row is not None:
+                return row
+            generation = self.cache.generation(table, row_id)
+        try:
+            row = self.get_row(table, row_id)
+        except Exception as e:
+            logger.error(f"Error getting {TABLES[table]} by ID: {e}")
+            return None
+        if row is not None and self.cache is not None:
+            self.cache.put(table, row_id, row, generation)
+        return row
+
+    def _update(self, table: str, row_id: Any, data: Dict[str, Any],
+                expected_version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        # Every update stamps a new version
+        data = self._stamped(data)
+        expected = self._expected(expected_version)
+        try:
+            row = self.update_row(table, row_id, data, expected)
+        except Exception as e:
+            logger.error(f"Error updating {TABLES[table]}: {e}")
+            raise
+        if row:
+            self._notify(table, 'update', row_id, row)
+        elif expected:
+            self._raise_if_conflict(table, row_id)
+        return row
+
+    def _delete(self, table: str, row_id: Any, expected_version: Optional[str] = None) -> bool:
+        expected = self._expected(expected_version)
+        try:
+            deleted = self.delete_row(table, row_id, expected)
+        except Exception as e:
+            logger.error(f"Error deleting {TABLES[table]}: {e}")
+            return False
+        if deleted:
+            self._notify(table, 'delete', row_id)
+        elif expected:
+            self._raise_if_conflict(table, row_id)
+        return deleted
+
+    @staticmethod
+    def _expected(expected_version: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Row version (its updatedAt) a conditional write must still find"""
+        return {'updatedAt': expected_version} if expected_version is not None else None
+
+    def _raise_if_conflict(self, table: str, row_id: Any) -> None:
+        """Tell a missing row (None / False) from one at another version after a conditional write missed"""
+        generation = self.cache.generation(table, row_id) if self.cache is not None else None
+        current = self.get_row(table, row_id)
+        if current is None:
+            return
+        if self.cache is not None:
+            self.cache.put(table, row_id, current, generation)
+        raise VersionConflictError(table, row_id, current)
+
+    # Batches
+    def apply_batch(self, table: str, operations: List[BatchOp],
+                    chunk_size: int = INSERT_CHUNK_SIZE) -> List[BatchOutcome]:
+        """Apply validated operations as chunked bulk statements: creates, then updates, then deletes.
+
+        Returns one outcome per operation, in input order; a failing item
+        never fails the others.
+        """
+        outcomes: List[Optional[BatchOutcome]] = [None] * len(operations)
+        indexes: Dict[str, List[int]] = {'create': [], 'update': [], 'delete': []}
+        for index, op in enumerate(operations):
+            indexes[op.op].append(index)
+
+        for start in range(0, len(indexes['create']), chunk_size):
+            self._batch_create(table, operations, indexes['create'][start:start + chunk_size], outcomes)
+        for start in range(0, len(indexes['update']), chunk_size):
+            self._batch_update(table, operations, indexes['update'][start:start + chunk_size], outcomes)
+        for start in range(0, len(indexes['delete']), chunk_size):
+            self._batch_delete(table, operations, indexes['delete'][start:start + chunk_size], outcomes)
+        return outcomes
+
+    def _batch_create(self, table: str, operations: List[BatchOp], chunk: List[int],
+                      outcomes: List[Optional[BatchOutcome]]) -> None:
+        keys = CREATE_KEYS.get(table, ('id',))
+        rows = [self._stamped(operations[i].data) for i in chunk]
+        try:
+            inserted = self.insert_rows(table, rows, on_conflict=keys)
+        except Exception as e:
+            # Find the offending rows by inserting the chunk one by one
+            logger.error(f"Error creating {TABLES[table]} batch, retrying row by row: {e}")
+            inserted = []
+            for i, row in zip(chunk, rows):
+                try:
+                    inserted.extend(self.insert_rows(table, [row], on_conflict=keys))
+                except Exception as row_error:
+                    outcomes[i] = BatchOutcome('error', row.get('id'), error=str(row_error))
+        # RETURNING order is unspecified and skipped conflicts leave gaps, so match rows by key
+        by_key = {tuple(row.get(k) for k in keys): row for row in inserted}
+        for i, row in zip(chunk, rows):
+            if outcomes[i] is not None:
+                continue
+            key = tuple(row.get(k) for k in keys)
+            result = by_key.pop(key, None)
+            if result is not None:
+                outcomes[i] = BatchOutcome('created', result.get('id'), result)
+                self._notify(table, 'insert', result.get('id'), result)
+                continue
+            # The key was taken, by an existing row or an earlier create in this batch
+            existing = self.list_rows(table, ListQuery(filters=dict(zip(keys, key)), limit=1)).rows
+            current = existing[0] if existing else None
+            described = ', '.join(f'{k}={v}' for k, v in zip(keys, key))
+            outcomes[i] = BatchOutcome('conflict', (current or row).get('id'), current,
+                                       f"{TABLES[table]} with {described} already exists")
+
+    def _batch_update(self, table: str, operations: List[BatchOp], chunk: List[int],
+                      outcomes: List[Optional[BatchOutcome]]) -> None:
+        stamp = datetime.utcnow().isoformat() + 'Z'
+        updates = [
+            (operations[i].id, {**operations[i].data, 'updatedAt': stamp}, self._expected(operations[i].expected_version))
+            for i in chunk
+        ]
+        for i, (row_id, _, expected), result in zip(chunk, updates, self.update_rows(table, updates)):
+            if isinstance(result, Exception):
+                outcomes[i] = BatchOutcome('error', row_id, error=str(result))
+            elif result:
+                outcomes[i] = BatchOutcome('updated', row_id, result)
+                self._notify(table, 'update', row_id, result)
+            else:
+                outcomes[i] = self._missed_write(table, row_id, expected)
+
+    def _batch_delete(self, table: str, operations: List[BatchOp], chunk: List[int],
+                      outcomes: List[Optional[BatchOutcome]]) -> None:
+        unconditional = [i for i in chunk if operations[i].expected_version is None]
+        try:
+            deleted = set(self.delete_rows(table, [operations[i].id for i in unconditional]))
+        except Exception as e:
+            logger.error(f"Error deleting {TABLES[table]} batch: {e}")
+            for i in unconditional:
+                outcomes[i] = BatchOutcome('error', operations[i].id, error=str(e))
+        else:
+            for i in unconditional:
+                row_id = operations[i].id
+                if row_id in deleted:
+                    outcomes[i] = BatchOutcome('deleted', row_id)
+                    self._notify(table, 'delete', row_id)
+                else:
+                    outcomes[i] = BatchOutcome('not_found', row_id)
+        # Version-checked deletes need their own WHERE clause each
+        for i in chunk:
+            if operations[i].expected_version is None:
+                continue
+            row_id, expected = operations[i].id, self._expected(operations[i].expected_version)
+            try:
+                if self.delete_row(table, row_id, expected):
+                    outcomes[i] = BatchOutcome('deleted', row_id)
+                    self._notify(table, 'delete', row_id)
+                else:
+                    outcomes[i] = self._missed_write(table, row_id, expected)
+            except Exception as e:
+                outcomes[i] = BatchOutcome('error', row_id, error=str(e))
+
+    def _missed_write(self, table: str, row_id: Any, expected: Optional[Dict[str, Any]]) -> BatchOutcome:
+        if expected:
+            try:
+                self._raise_if_conflict(table, row_id)
+            except VersionConflictError as e:
+                return BatchOutcome('conflict', row_id, e.current, str(e))
+        return BatchOutcome('not_found', row_id)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        return self.cache.stats() if self.cache is not None else {"enabled": False}
+
+    def table_etag(self, tables: Sequence[str], key: str = '') -> str:
+        return self.versions.etag(self, tables, key)
+
+    def ping(self) -> None:
+        """Cheapest real round trip: one id from houses (never served from the cache)"""
+        self.list_rows('houses', ListQuery(columns=['id'], limit=1))
+
+    # Summaries
+    def get_house_summary(self) -> Dict[str, int]:
+        self.aggregates.ensure_current(self)
+        return self.aggregates.house_summary()
+
+    def get_payment_summary(self, month: Optional[str] = None) -> Dict[str, float]:
+        self.aggregates.ensure_current(self)
+        return self.aggregates.payment_summary(month)
+
+    def get_expenditure_summary(self) -> Dict[str, Any]:
+        self.aggregates.ensure_current(self)
+        return self.aggregates.expenditure_summary()
+
+    def get_ledger(self) -> Dict[str, Any]:
+        self.aggregates.ensure_current(self)
+        return self.aggregates.ledger()
+
+    def reconcile_ledger(self) -> Dict[str, Any]:
+        return reconcile_ledger(self, self.aggregates)
+
+    def rebuild_aggregates(self) -> None:
+        self.aggregates.rebuild(self)
+
+    def verify_aggregates(self) -> List[Dict[str, Any]]:
+        return self.aggregates.verify(self)
+
+    # Houses operations
+    def create_house(self, house_data: Dict[str, Any]) -> Dict[str, Any]:
+        return self._create('houses', house_data)
+
+    def get_houses(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._list('houses', limit)
+
+    def list_houses(self, query: ListQuery) -> Page:
+        return self._page('houses', query)
+
+    def count_houses(self, query: ListQuery) -> int:
+        return self._count('houses', query)
+
+    def get_house_by_id(self, house_id: str) -> Optional[Dict[str, Any]]:
+        return self._get('houses', house_id)
+
+    def update_house(self, house_id: str, update_data: Dict[str, Any],
+                     expected_version: Optional[str] = None) -> Dict[str, Any]:
+        return self._update('houses', house_id, update_data, expected_version)
+
+    def delete_house(self, house_id: str, expected_version: Optional[str] = None) -> bool:
+        return self._delete('houses', house_id, expected_version)
+
+    # Members operations
+    def create_member(self, member_data: Dict[str, Any]) -> Dict[str, Any]:
+        return self._create('members', member_data)
+
+    def get_members(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._list('members', limit)
+
+    def list_members(self, query: ListQuery) -> Page:
+        return self._page('members', query)
+
+    def get_member_by_id(self, member_id: str) -> Optional[Dict[str, Any]]:
+        return self._get('members', member_id)
+
+    def update_member(self, member_id: str, update_data: Dict[str, Any],
+                      expected_version: Optional[str] = None) -> Dict[str, Any]:
+        return self._update('members', member_id, update_data, expected_version)
+
+    def delete_member(self, member_id: str, expected_version: Optional[str] = None) -> bool:
+        return self._delete('members', member_id, expected_version)
+
+    # Vehicles operations
+    def create_vehicle(self, vehicle_data: Dict[str, Any]) -> Dict[str, Any]:
+        return self._create('vehicles', vehicle_data)
+
+    def get_vehicles(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._list('vehicles', limit)
+
+    def list_vehicles(self, query: ListQuery) -> Page:
+        return self._page('vehicles', query)
+
+    def get_vehicle_by_id(self, vehicle_id: str) -> Optional[Dict[str, Any]]:
+        return self._get('vehicles', vehicle_id)
+
+    def update_vehicle(self, vehicle_id: str, update_data: Dict[str, Any],
+                       expected_version: Optional[str] = None) -> Dict[str, Any]:
+        return self._update('vehicles', vehicle_id, update_data, expected_version)
+
+    def delete_vehicle(self, vehicle_id: str, expected_version: Optional[str] = None) -> bool:
+        return self._delete('vehicles', vehicle_id, expected_version)
+
+    # Payments operations
+    def create_payment(self, payment_data: Dict[str, Any]) -> Dict[str, Any]:
+        return self._create('maintenance_payments', payment_data)
+
+    def create_payments(self, payments_data: List[Dict[str, Any]], skip_existing: bool = True) -> List[Dict[str, Any]]:
+        """Bulk insert payments; with skip_existing a (house, month) already billed is left alone"""
+        return self._create_many('maintenance_payments', payments_data,
+                                 on_conflict=('house', 'month') if skip_existing else None)
+
+    def get_payments(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._list('maintenance_payments', limit)
+
+    def list_payments(self, query: ListQuery) -> Page:
+        return self._page('maintenance_payments', query)
+
+    def get_payment_by_id(self, payment_id: int) -> Optional[Dict[str, Any]]:
+        return self._get('maintenance_payments', payment_id)
+
+    def update_payment(self, payment_id: int, update_data: Dict[str, Any],
+                       expected_version: Optional[str] = None) -> Dict[str, Any]:
+        return self._update('maintenance_payments', payment_id, update_data, expected_version)
+
+    def delete_payment(self, payment_id: int, expected_version: Optional[str] = None) -> bool:
+        return self._delete('maintenance_payments', payment_id, expected_version)
+
+    # Expenditures operations
+    def create_expenditure(self, expenditure_data: Dict[str, Any]) -> Dict[str, Any]:
+        return self._create('expenditures', expenditure_data)
+
+    def get_expenditures(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return self._list('expenditures', limit, EXPENDITURE_LIST_COLUMNS)
+
+    def list_expenditures(self, query: ListQuery) -> Page:
+        if query.columns is None:
+            query = replace(query, columns=EXPENDITURE_LIST_COLUMNS)
+        return self._page('expenditures', query)
+
+    def get_expenditure_by_id(self, expenditure_id: int) -> Optional[Dict[str, Any]]:
+        return self._get('expenditures', expenditure_id)
+
+    def update_expenditure(self, expenditure_id: int, update_data: Dict[str, Any],
+                           expected_version: Optional[str] = None) -> Dict[str, Any]:
+        return self._update('expenditures', expenditure_id, update_data, expected_version)
+
+    def delete_expenditure(self, expenditure_id: int, expected_version: Optional[str] = None) -> bool:
+        return self._delete('expenditures', expenditure_id, expected_version)
@@ -0,0 +1,80 @@
+import json
+import os
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Optional
+
+from fastapi import HTTPException, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from repository import VersionConflictError
+from versions import row_etag
+
+try:
+    import orjson
+except ImportError:  # the stdlib encoder below is used instead
+    orjson = None
+
+# 'orjson' (default when installed) or 'json'
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson" if orjson is not None else "json").lower()
+
+def encode_default(value: Any) -> Any:
+    """JSON form of the values neither encoder handles the way the API stores them.
+
+    Datetimes are written like get_current_timestamp() (UTC ISO 8601 with a
+    trailing Z) so a datetime a handler set looks the same as one read back
+    from the database. Decimals stay numbers.
+    """
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.isoformat() + 'Z'
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def dumps(content: Any) -> bytes:
+    if JSON_ENCODER == "orjson":
+        # Passthrough hands datetimes to encode_default rather than orjson's own RFC 3339 form
+        return orjson.dumps(content, default=encode_default,
+                            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=encode_default, ensure_ascii=False, allow_nan=False,
+                      separators=(',', ':')).encode('utf-8')
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson when available; the app's default response class"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def trusted_json(content: Any, response: Optional[Response] = None, status_code: int = 200) -> JSONResponse:
+    """Serialize rows read from the database as-is, skipping pydantic.
+
+    The table schema already guarantees the rows match the models, so
+    building a model per row and having FastAPI validate the
+    response_model again only burns CPU on large lists. Returning a
+    Response bypasses both (response_model still documents the shape).
+    Headers set on the injected `response` (ETag, Cache-Control) are
+    carried over.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return FastJSONResponse(content=content, status_code=status_code, headers=headers)
+
+def tag_row(response: Response, row: Optional[dict]) -> None:
+    """ETag of a created or updated row, to send back as If-Match on the next write"""
+    etag = row_etag(row)
+    if etag is not None:
+        response.headers["ETag"] = etag
+
+def version_conflict(e: VersionConflictError) -> HTTPException:
+    """409 carrying the row as it is now (and its ETag), so the client can merge and retry"""
+    etag = row_etag(e.current)
+    return HTTPException(status_code=409, detail={"message": str(e), "current": e.current},
+                         headers={"ETag": etag} if etag else None)
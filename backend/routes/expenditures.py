@@ -2,12 +2,16 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from models import Expenditure, ExpenditureCreate, ExpenditureUpdate, ExpendituresListResponse
-from database import db
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from typing import List, Optional
+from models import Expenditure, ExpenditureCreate, ExpenditureUpdate, ExpendituresListResponse, get_current_timestamp
+from database_simple import get_async_db
+from repository import VersionConflictError
+from versions import parse_if_match
+from responses import tag_row, trusted_json, version_conflict
+from blob_store import get_blob_store, store_inline_attachment
+from starlette.concurrency import run_in_threadpool
 import logging
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/expenditures", tags=["expenditures"])
@@ -16,48 +20,25 @@ router = APIRouter(prefix="/expenditures", tags=["expenditures"])
 async def get_expenditures():
     """Get all expenditures with summary"""
     try:
-        expenditures_data = db.get_expenditures()
-        expenditures = [Expenditure(**exp) for exp in expenditures_data]
+        db = get_async_db()
+        expenditures_data = await db.get_expenditures()
+        summary = await db.get_expenditure_summary()
         
-        # Calculate summary
-        total_expenditure = sum(e.amount for e in expenditures)
-        
-        # Get total collection from maintenance payments
-        payments_data = db.get_payments()
-        total_collection = sum(p.get("amountPaid", 0) for p in payments_data if p.get("status") == "paid")
-        
-        remaining_balance = total_collection - total_expenditure
-        
-        # Category breakdown
-        category_breakdown = {}
-        for exp in expenditures:
-            category = exp.category
-            if category in category_breakdown:
-                category_breakdown[category] += exp.amount
-            else:
-                category_breakdown[category] = exp.amount
-        
-        return ExpendituresListResponse(
-            list=expenditures,
-            summary={
-                "totalExpenditure": total_expenditure,
-                "totalCollection": total_collection,
-                "remainingBalance": remaining_balance,
-                "categoryBreakdown": category_breakdown
-            }
-        )
+        return trusted_json({"list": expenditures_data, "summary": summary})
     except Exception as e:
         logger.error(f"Error fetching expenditures: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch expenditures")
 
 @router.get("/{expenditure_id}", response_model=Expenditure)
-async def get_expenditure(expenditure_id: int):
+async def get_expenditure(expenditure_id: int, response: Response):
     """Get a specific expenditure by ID"""
     try:
-        expenditure_data = db.get_expenditure_by_id(expenditure_id)
+        db = get_async_db()
+        expenditure_data = await db.get_expenditure_by_id(expenditure_id)
         if not expenditure_data:
             raise HTTPException(status_code=404, detail="Expenditure not found")
-        return Expenditure(**expenditure_data)
+        tag_row(response, expenditure_data)
+        return trusted_json(expenditure_data, response)
     except HTTPException:
         raise
     except Exception as e:
@@ -68,55 +49,65 @@ async def get_expenditure(expenditure_id: int):
 async def create_expenditure(expenditure_data: ExpenditureCreate):
     """Create a new expenditure"""
     try:
+        db = get_async_db()
         # Convert to dict and remove id field since it's auto-generated
-        expenditure_dict = expenditure_data.dict()
-        created_expenditure = db.create_expenditure(expenditure_dict)
+        expenditure_dict = expenditure_data.model_dump()
+        try:
+            expenditure_dict = await run_in_threadpool(store_inline_attachment, get_blob_store(), expenditure_dict)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        created_expenditure = await db.create_expenditure(expenditure_dict)
         if not created_expenditure:
             raise HTTPException(status_code=400, detail="Failed to create expenditure")
         return Expenditure(**created_expenditure)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating expenditure: {e}")
         raise HTTPException(status_code=500, detail="Failed to create expenditure")
 
 @router.put("/{expenditure_id}", response_model=Expenditure)
-async def update_expenditure(expenditure_id: int, update_data: ExpenditureUpdate):
+async def update_expenditure(expenditure_id: int, update_data: ExpenditureUpdate, response: Response, if_match: Optional[str] = Header(None)):
     """Update an expenditure"""
     try:
-        # Check if expenditure exists
-        existing_expenditure = db.get_expenditure_by_id(expenditure_id)
-        if not existing_expenditure:
-            raise HTTPException(status_code=404, detail="Expenditure not found")
-        
+        db = get_async_db()
         # Prepare update data
-        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
-        update_dict["updatedAt"] = datetime.utcnow()
+        update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
+        try:
+            update_dict = await run_in_threadpool(store_inline_attachment, get_blob_store(), update_dict)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        if "attachmentRef" in update_dict:
+            update_dict["attachmentData"] = None
+        update_dict["updatedAt"] = get_current_timestamp()
         
-        updated_expenditure = db.update_expenditure(expenditure_id, update_dict)
+        updated_expenditure = await db.update_expenditure(expenditure_id, update_dict, parse_if_match(if_match))
         if not updated_expenditure:
-            raise HTTPException(status_code=400, detail="Failed to update expenditure")
+            raise HTTPException(status_code=404, detail="Expenditure not found")
+        tag_row(response, updated_expenditure)
         return Expenditure(**updated_expenditure)
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error updating expenditure {expenditure_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to update expenditure")
 
 @router.delete("/{expenditure_id}")
-async def delete_expenditure(expenditure_id: int):
+async def delete_expenditure(expenditure_id: int, if_match: Optional[str] = Header(None)):
     """Delete an expenditure"""
     try:
-        # Check if expenditure exists
-        existing_expenditure = db.get_expenditure_by_id(expenditure_id)
-        if not existing_expenditure:
-            raise HTTPException(status_code=404, detail="Expenditure not found")
-        
-        success = db.delete_expenditure(expenditure_id)
+        db = get_async_db()
+        success = await db.delete_expenditure(expenditure_id, parse_if_match(if_match))
         if not success:
-            raise HTTPException(status_code=400, detail="Failed to delete expenditure")
+            raise HTTPException(status_code=404, detail="Expenditure not found")
         
         return {"message": "Expenditure deleted successfully"}
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error deleting expenditure {expenditure_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete expenditure")
\ No newline at end of file
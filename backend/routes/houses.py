@@ -2,65 +2,62 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 from typing import List, Optional
-from models import House, HouseCreate, HouseUpdate, HousesListResponse
-from database import initialize_db
-
-def get_db():
-    return initialize_db()
+from models import House, HouseCreate, HouseUpdate, HousesListResponse, get_current_timestamp
+from database_simple import get_async_db
+from repository import ListQuery, VersionConflictError
+from versions import parse_if_match
+from responses import tag_row, trusted_json, version_conflict
 import logging
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/houses", tags=["houses"])
 
 @router.get("", response_model=HousesListResponse)
 async def get_houses(
-    page: int = Query(1, ge=1),
-    page_size: int = Query(50, ge=1, le=100)
+    page_size: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    sort: str = Query("houseNo"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    status: Optional[str] = None,
+    block: Optional[str] = None
 ):
-    """Get all houses with pagination and summary"""
+    """Get a page of houses with summary"""
     try:
-        db = get_db()
-        houses_data = db.get_houses(limit=1000)  # Get all for now
-        houses = [House(**house) for house in houses_data]
-        
-        # Calculate summary
-        total = len(houses)
-        occupied = sum(1 for h in houses if h.status == 'occupied')
-        vacant = sum(1 for h in houses if h.status == 'vacant')
-        
-        # Apply pagination
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_houses = houses[start_idx:end_idx]
+        db = get_async_db()
+        filters = {k: v for k, v in {"status": status, "block": block}.items() if v is not None}
+        page = await db.list_houses(ListQuery(
+            filters=filters, sort=sort, descending=order == "desc", limit=page_size, cursor=cursor
+        ))
+        summary = await db.get_house_summary()
         
-        return HousesListResponse(
-            list=paginated_houses,
-            summary={
-                "total": total,
-                "occupied": occupied,
-                "vacant": vacant
-            },
-            pagination={
-                "total": total,
-                "page": page,
-                "pageSize": page_size
+        return trusted_json({
+            "list": page.rows,
+            "summary": summary,
+            "pagination": {
+                "total": summary["total"],
+                "pageSize": page_size,
+                "nextCursor": page.next_cursor,
+                "hasMore": page.has_more
             }
-        )
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching houses: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch houses")
 
 @router.get("/{house_id}", response_model=House)
-async def get_house(house_id: str):
+async def get_house(house_id: str, response: Response):
     """Get a specific house by ID"""
     try:
-        house_data = db.get_house_by_id(house_id)
+        db = get_async_db()
+        house_data = await db.get_house_by_id(house_id)
         if not house_data:
             raise HTTPException(status_code=404, detail="House not found")
-        return House(**house_data)
+        tag_row(response, house_data)
+        return trusted_json(house_data, response)
     except HTTPException:
         raise
     except Exception as e:
@@ -71,8 +68,9 @@ async def get_house(house_id: str):
 async def create_house(house_data: HouseCreate):
     """Create a new house"""
     try:
-        house = House(**house_data.dict())
-        created_house = db.create_house(house.dict())
+        db = get_async_db()
+        house = House(**house_data.model_dump())
+        created_house = await db.create_house(house.model_dump())
         if not created_house:
             raise HTTPException(status_code=400, detail="Failed to create house")
         return House(**created_house)
@@ -81,44 +79,41 @@ async def create_house(house_data: HouseCreate):
         raise HTTPException(status_code=500, detail="Failed to create house")
 
 @router.put("/{house_id}", response_model=House)
-async def update_house(house_id: str, update_data: HouseUpdate):
+async def update_house(house_id: str, update_data: HouseUpdate, response: Response, if_match: Optional[str] = Header(None)):
     """Update a house"""
     try:
-        # Check if house exists
-        existing_house = db.get_house_by_id(house_id)
-        if not existing_house:
-            raise HTTPException(status_code=404, detail="House not found")
-        
+        db = get_async_db()
         # Prepare update data
-        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
-        update_dict["updatedAt"] = datetime.utcnow()
+        update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
+        update_dict["updatedAt"] = get_current_timestamp()
         
-        updated_house = db.update_house(house_id, update_dict)
+        updated_house = await db.update_house(house_id, update_dict, parse_if_match(if_match))
         if not updated_house:
-            raise HTTPException(status_code=400, detail="Failed to update house")
+            raise HTTPException(status_code=404, detail="House not found")
+        tag_row(response, updated_house)
         return House(**updated_house)
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error updating house {house_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to update house")
 
 @router.delete("/{house_id}")
-async def delete_house(house_id: str):
+async def delete_house(house_id: str, if_match: Optional[str] = Header(None)):
     """Delete a house"""
     try:
-        # Check if house exists
-        existing_house = db.get_house_by_id(house_id)
-        if not existing_house:
-            raise HTTPException(status_code=404, detail="House not found")
-        
-        success = db.delete_house(house_id)
+        db = get_async_db()
+        success = await db.delete_house(house_id, parse_if_match(if_match))
         if not success:
-            raise HTTPException(status_code=400, detail="Failed to delete house")
+            raise HTTPException(status_code=404, detail="House not found")
         
         return {"message": "House deleted successfully"}
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error deleting house {house_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete house")
\ No newline at end of file
@@ -2,12 +2,14 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from models import Member, MemberCreate, MemberUpdate
-from database import db
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from typing import List, Optional
+from models import Member, MemberCreate, MemberUpdate, get_current_timestamp
+from database_simple import get_async_db
+from repository import VersionConflictError
+from versions import parse_if_match
+from responses import tag_row, trusted_json, version_conflict
 import logging
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/members", tags=["members"])
@@ -16,20 +18,23 @@ router = APIRouter(prefix="/members", tags=["members"])
 async def get_members():
     """Get all members"""
     try:
-        members_data = db.get_members()
-        return [Member(**member) for member in members_data]
+        db = get_async_db()
+        members_data = await db.get_members()
+        return trusted_json(members_data)
     except Exception as e:
         logger.error(f"Error fetching members: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch members")
 
 @router.get("/{member_id}", response_model=Member)
-async def get_member(member_id: str):
+async def get_member(member_id: str, response: Response):
     """Get a specific member by ID"""
     try:
-        member_data = db.get_member_by_id(member_id)
+        db = get_async_db()
+        member_data = await db.get_member_by_id(member_id)
         if not member_data:
             raise HTTPException(status_code=404, detail="Member not found")
-        return Member(**member_data)
+        tag_row(response, member_data)
+        return trusted_json(member_data, response)
     except HTTPException:
         raise
     except Exception as e:
@@ -40,8 +45,9 @@ async def get_member(member_id: str):
 async def create_member(member_data: MemberCreate):
     """Create a new member"""
     try:
-        member = Member(**member_data.dict())
-        created_member = db.create_member(member.dict())
+        db = get_async_db()
+        member = Member(**member_data.model_dump())
+        created_member = await db.create_member(member.model_dump())
         if not created_member:
             raise HTTPException(status_code=400, detail="Failed to create member")
         return Member(**created_member)
@@ -50,44 +56,41 @@ async def create_member(member_data: MemberCreate):
         raise HTTPException(status_code=500, detail="Failed to create member")
 
 @router.put("/{member_id}", response_model=Member)
-async def update_member(member_id: str, update_data: MemberUpdate):
+async def update_member(member_id: str, update_data: MemberUpdate, response: Response, if_match: Optional[str] = Header(None)):
     """Update a member"""
     try:
-        # Check if member exists
-        existing_member = db.get_member_by_id(member_id)
-        if not existing_member:
-            raise HTTPException(status_code=404, detail="Member not found")
-        
+        db = get_async_db()
         # Prepare update data
-        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
-        update_dict["updatedAt"] = datetime.utcnow()
+        update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
+        update_dict["updatedAt"] = get_current_timestamp()
         
-        updated_member = db.update_member(member_id, update_dict)
+        updated_member = await db.update_member(member_id, update_dict, parse_if_match(if_match))
         if not updated_member:
-            raise HTTPException(status_code=400, detail="Failed to update member")
+            raise HTTPException(status_code=404, detail="Member not found")
+        tag_row(response, updated_member)
         return Member(**updated_member)
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error updating member {member_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to update member")
 
 @router.delete("/{member_id}")
-async def delete_member(member_id: str):
+async def delete_member(member_id: str, if_match: Optional[str] = Header(None)):
     """Delete a member"""
     try:
-        # Check if member exists
-        existing_member = db.get_member_by_id(member_id)
-        if not existing_member:
-            raise HTTPException(status_code=404, detail="Member not found")
-        
-        success = db.delete_member(member_id)
+        db = get_async_db()
+        success = await db.delete_member(member_id, parse_if_match(if_match))
         if not success:
-            raise HTTPException(status_code=400, detail="Failed to delete member")
+            raise HTTPException(status_code=404, detail="Member not found")
         
         return {"message": "Member deleted successfully"}
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error deleting member {member_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete member")
\ No newline at end of file
@@ -2,10 +2,13 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from models import MaintenancePayment, MaintenancePaymentCreate, MaintenancePaymentUpdate, PaymentsListResponse
-from database import db
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from typing import List, Optional
+from models import MaintenancePayment, MaintenancePaymentCreate, MaintenancePaymentUpdate, PaymentsListResponse, get_current_timestamp
+from database_simple import get_async_db
+from repository import ListQuery, VersionConflictError
+from versions import parse_if_match
+from responses import tag_row, trusted_json, version_conflict
 import logging
 from datetime import datetime
 
@@ -16,38 +19,25 @@ router = APIRouter(prefix="/payments", tags=["payments"])
 async def get_payments():
     """Get all maintenance payments with summary"""
     try:
-        payments_data = db.get_payments()
-        payments = [MaintenancePayment(**payment) for payment in payments_data]
+        db = get_async_db()
+        payments_data = await db.get_payments()
+        summary = await db.get_payment_summary()
         
-        # Calculate summary
-        total_amount = sum(p.amount for p in payments)
-        total_collected = sum(p.amountPaid for p in payments if p.status == 'paid')
-        pending_amount = sum(p.amount - p.amountPaid for p in payments if p.status in ['pending', 'partial'])
-        overdue_amount = sum(p.amount - p.amountPaid for p in payments if p.status == 'overdue')
-        collection_rate = (total_collected / total_amount * 100) if total_amount > 0 else 0
-        
-        return PaymentsListResponse(
-            list=payments,
-            summary={
-                "total": total_amount,
-                "collected": total_collected,
-                "pending": pending_amount,
-                "overdue": overdue_amount,
-                "collectionRate": round(collection_rate, 2)
-            }
-        )
+        return trusted_json({"list": payments_data, "summary": summary})
     except Exception as e:
         logger.error(f"Error fetching payments: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch payments")
 
 @router.get("/{payment_id}", response_model=MaintenancePayment)
-async def get_payment(payment_id: int):
+async def get_payment(payment_id: int, response: Response):
     """Get a specific payment by ID"""
     try:
-        payment_data = db.get_payment_by_id(payment_id)
+        db = get_async_db()
+        payment_data = await db.get_payment_by_id(payment_id)
         if not payment_data:
             raise HTTPException(status_code=404, detail="Payment not found")
-        return MaintenancePayment(**payment_data)
+        tag_row(response, payment_data)
+        return trusted_json(payment_data, response)
     except HTTPException:
         raise
     except Exception as e:
@@ -58,9 +48,10 @@ async def get_payment(payment_id: int):
 async def create_payment(payment_data: MaintenancePaymentCreate):
     """Create a new maintenance payment"""
     try:
+        db = get_async_db()
         # Convert to dict and remove id field since it's auto-generated
-        payment_dict = payment_data.dict()
-        created_payment = db.create_payment(payment_dict)
+        payment_dict = payment_data.model_dump()
+        created_payment = await db.create_payment(payment_dict)
         if not created_payment:
             raise HTTPException(status_code=400, detail="Failed to create payment")
         return MaintenancePayment(**created_payment)
@@ -69,21 +60,26 @@ async def create_payment(payment_data: MaintenancePaymentCreate):
         raise HTTPException(status_code=500, detail="Failed to create payment")
 
 @router.put("/{payment_id}", response_model=MaintenancePayment)
-async def update_payment(payment_id: int, update_data: MaintenancePaymentUpdate):
+async def update_payment(payment_id: int, update_data: MaintenancePaymentUpdate, response: Response, if_match: Optional[str] = Header(None)):
     """Update a maintenance payment"""
     try:
-        # Check if payment exists
-        existing_payment = db.get_payment_by_id(payment_id)
-        if not existing_payment:
-            raise HTTPException(status_code=404, detail="Payment not found")
+        db = get_async_db()
+        expected_version = parse_if_match(if_match)
         
         # Prepare update data
-        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
-        update_dict["updatedAt"] = datetime.utcnow()
+        update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
+        update_dict["updatedAt"] = get_current_timestamp()
         
         # Update payment status based on amount paid
         if "amountPaid" in update_dict:
-            amount = existing_payment.get("amount", 0)
+            amount = update_dict.get("amount")
+            if amount is None:
+                # The status depends on the stored amount: read it, then only write if the row is still that version
+                existing_payment = await db.get_payment_by_id(payment_id)
+                if not existing_payment:
+                    raise HTTPException(status_code=404, detail="Payment not found")
+                amount = existing_payment.get("amount", 0)
+                expected_version = expected_version or existing_payment.get("updatedAt")
             amount_paid = update_dict["amountPaid"]
             if amount_paid >= amount:
                 update_dict["status"] = "paid"
@@ -93,73 +89,79 @@ async def update_payment(payment_id: int, update_data: MaintenancePaymentUpdate)
             else:
                 update_dict["status"] = "pending"
         
-        updated_payment = db.update_payment(payment_id, update_dict)
+        updated_payment = await db.update_payment(payment_id, update_dict, expected_version)
         if not updated_payment:
-            raise HTTPException(status_code=400, detail="Failed to update payment")
+            raise HTTPException(status_code=404, detail="Payment not found")
+        tag_row(response, updated_payment)
         return MaintenancePayment(**updated_payment)
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error updating payment {payment_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to update payment")
 
 @router.delete("/{payment_id}")
-async def delete_payment(payment_id: int):
+async def delete_payment(payment_id: int, if_match: Optional[str] = Header(None)):
     """Delete a maintenance payment"""
     try:
-        # Check if payment exists
-        existing_payment = db.get_payment_by_id(payment_id)
-        if not existing_payment:
-            raise HTTPException(status_code=404, detail="Payment not found")
-        
-        success = db.delete_payment(payment_id)
+        db = get_async_db()
+        success = await db.delete_payment(payment_id, parse_if_match(if_match))
         if not success:
-            raise HTTPException(status_code=400, detail="Failed to delete payment")
+            raise HTTPException(status_code=404, detail="Payment not found")
         
         return {"message": "Payment deleted successfully"}
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error deleting payment {payment_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete payment")
 
 @router.post("/generate-monthly")
-async def generate_monthly_payments(default_amount: float = Query(..., description="Default maintenance amount")):
-    """Generate monthly payments for all houses"""
+async def generate_monthly_payments(
+    default_amount: float = Query(..., description="Default maintenance amount"),
+    month: Optional[str] = Query(None, description="Month to bill as YYYY-MM, defaults to the current month")
+):
+    """Generate monthly payments for all houses, skipping houses already billed for the month"""
     try:
-        # Get all houses
-        houses_data = db.get_houses()
+        billing_date = datetime.strptime(month, "%Y-%m") if month else datetime.utcnow()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="month must be formatted as YYYY-MM")
+    
+    try:
+        db = get_async_db()
+        month_str = billing_date.strftime("%B %Y")
+        due_date = billing_date.replace(day=5).strftime("%Y-%m-%d")  # Due on 5th of month
         
-        generated_count = 0
-        current_date = datetime.utcnow()
-        month_str = current_date.strftime("%B %Y")
-        due_date = current_date.replace(day=5).strftime("%Y-%m-%d")  # Due on 5th of month
+        # Get all houses
+        houses_data = await db.fetch_all('houses', ListQuery(columns=['houseNo', 'ownerName']))
+        payments = [
+            {
+                "house": house_data["houseNo"],
+                "owner": house_data.get("ownerName") or "",
+                "amount": default_amount,
+                "amountPaid": 0,
+                "month": month_str,
+                "dueDate": due_date,
+                "status": "pending"
+            }
+            for house_data in houses_data if house_data.get("houseNo")
+        ]
         
-        for house_data in houses_data:
-            house_no = house_data.get("houseNo")
-            owner_name = house_data.get("ownerName", "")
-            
-            if house_no:
-                payment_data = {
-                    "house": house_no,
-                    "owner": owner_name,
-                    "amount": default_amount,
-                    "amountPaid": 0,
-                    "month": month_str,
-                    "dueDate": due_date,
-                    "status": "pending"
-                }
-                
-                created_payment = db.create_payment(payment_data)
-                if created_payment:
-                    generated_count += 1
+        created = await db.create_payments(payments)
+        generated_count = len(created)
         
         return {
             "message": f"Generated {generated_count} monthly payments",
             "month": month_str,
             "amount": default_amount,
-            "generated_count": generated_count
+            "generated_count": generated_count,
+            "created": generated_count,
+            "skipped": len(payments) - generated_count
         }
     except Exception as e:
         logger.error(f"Error generating monthly payments: {e}")
-        raise HTTPException(status_code=500, detail="Failed to generate monthly payments")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to generate monthly payments")
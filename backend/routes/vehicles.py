@@ -2,12 +2,14 @@ import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import APIRouter, HTTPException, Query
-from typing import List
-from models import Vehicle, VehicleCreate, VehicleUpdate
-from database import db
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from typing import List, Optional
+from models import Vehicle, VehicleCreate, VehicleUpdate, get_current_timestamp
+from database_simple import get_async_db
+from repository import VersionConflictError
+from versions import parse_if_match
+from responses import tag_row, trusted_json, version_conflict
 import logging
-from datetime import datetime
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/vehicles", tags=["vehicles"])
@@ -16,20 +18,23 @@ router = APIRouter(prefix="/vehicles", tags=["vehicles"])
 async def get_vehicles():
     """Get all vehicles"""
     try:
-        vehicles_data = db.get_vehicles()
-        return [Vehicle(**vehicle) for vehicle in vehicles_data]
+        db = get_async_db()
+        vehicles_data = await db.get_vehicles()
+        return trusted_json(vehicles_data)
     except Exception as e:
         logger.error(f"Error fetching vehicles: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch vehicles")
 
 @router.get("/{vehicle_id}", response_model=Vehicle)
-async def get_vehicle(vehicle_id: str):
+async def get_vehicle(vehicle_id: str, response: Response):
     """Get a specific vehicle by ID"""
     try:
-        vehicle_data = db.get_vehicle_by_id(vehicle_id)
+        db = get_async_db()
+        vehicle_data = await db.get_vehicle_by_id(vehicle_id)
         if not vehicle_data:
             raise HTTPException(status_code=404, detail="Vehicle not found")
-        return Vehicle(**vehicle_data)
+        tag_row(response, vehicle_data)
+        return trusted_json(vehicle_data, response)
     except HTTPException:
         raise
     except Exception as e:
@@ -40,8 +45,9 @@ async def get_vehicle(vehicle_id: str):
 async def create_vehicle(vehicle_data: VehicleCreate):
     """Create a new vehicle"""
     try:
-        vehicle = Vehicle(**vehicle_data.dict())
-        created_vehicle = db.create_vehicle(vehicle.dict())
+        db = get_async_db()
+        vehicle = Vehicle(**vehicle_data.model_dump())
+        created_vehicle = await db.create_vehicle(vehicle.model_dump())
         if not created_vehicle:
             raise HTTPException(status_code=400, detail="Failed to create vehicle")
         return Vehicle(**created_vehicle)
@@ -50,44 +56,41 @@ async def create_vehicle(vehicle_data: VehicleCreate):
         raise HTTPException(status_code=500, detail="Failed to create vehicle")
 
 @router.put("/{vehicle_id}", response_model=Vehicle)
-async def update_vehicle(vehicle_id: str, update_data: VehicleUpdate):
+async def update_vehicle(vehicle_id: str, update_data: VehicleUpdate, response: Response, if_match: Optional[str] = Header(None)):
     """Update a vehicle"""
     try:
-        # Check if vehicle exists
-        existing_vehicle = db.get_vehicle_by_id(vehicle_id)
-        if not existing_vehicle:
-            raise HTTPException(status_code=404, detail="Vehicle not found")
-        
+        db = get_async_db()
         # Prepare update data
-        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
-        update_dict["updatedAt"] = datetime.utcnow()
+        update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
+        update_dict["updatedAt"] = get_current_timestamp()
         
-        updated_vehicle = db.update_vehicle(vehicle_id, update_dict)
+        updated_vehicle = await db.update_vehicle(vehicle_id, update_dict, parse_if_match(if_match))
         if not updated_vehicle:
-            raise HTTPException(status_code=400, detail="Failed to update vehicle")
+            raise HTTPException(status_code=404, detail="Vehicle not found")
+        tag_row(response, updated_vehicle)
         return Vehicle(**updated_vehicle)
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error updating vehicle {vehicle_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to update vehicle")
 
 @router.delete("/{vehicle_id}")
-async def delete_vehicle(vehicle_id: str):
+async def delete_vehicle(vehicle_id: str, if_match: Optional[str] = Header(None)):
     """Delete a vehicle"""
     try:
-        # Check if vehicle exists
-        existing_vehicle = db.get_vehicle_by_id(vehicle_id)
-        if not existing_vehicle:
-            raise HTTPException(status_code=404, detail="Vehicle not found")
-        
-        success = db.delete_vehicle(vehicle_id)
+        db = get_async_db()
+        success = await db.delete_vehicle(vehicle_id, parse_if_match(if_match))
         if not success:
-            raise HTTPException(status_code=400, detail="Failed to delete vehicle")
+            raise HTTPException(status_code=404, detail="Vehicle not found")
         
         return {"message": "Vehicle deleted successfully"}
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error deleting vehicle {vehicle_id}: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete vehicle")
\ No newline at end of file
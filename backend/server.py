@@ -1,11 +1,26 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, File, Header, HTTPException, Query, Request, Response, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
 from dotenv import load_dotenv
 import os
 import logging
+import time
 from pathlib import Path
-from database_simple import get_db
+from database_simple import get_async_db, close_async_db, close_http_pool
+from repository import LIST_SPECS, MAX_PAGE_SIZE, BatchOp, BatchOutcome, ListQuery, VersionConflictError
+from versions import etag_matches, parse_if_match, row_etag
+from export import CONTENT_TYPES, export_stream
+from responses import FastJSONResponse, tag_row, trusted_json, version_conflict
+from compression import CompressedBodyCache, CompressionMiddleware
+import metrics
+from tracing import TracingMiddleware
+from startup import ping_database, warm_up
+from blob_store import MAX_ATTACHMENT_BYTES, decode_attachment_data, get_blob_store, migrate_inline_attachments, store_inline_attachment, sweep_orphaned_blobs
 from models import *
+from typing import List, Optional
+from datetime import datetime
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
@@ -15,7 +30,8 @@ load_dotenv(ROOT_DIR / '.env')
 app = FastAPI(
     title="Society Management API",
     description="API for managing residential society operations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # Configure CORS
@@ -27,6 +43,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Server-Timing header and query budget warnings (QUERY_BUDGET calls per request)
+app.add_middleware(TracingMiddleware)
+
+# Negotiated br/gzip for responses of at least COMPRESSION_MIN_SIZE bytes
+compressed_bodies = CompressedBodyCache(int(os.environ.get('COMPRESSION_CACHE_BYTES', str(32 * 1024 * 1024))))
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=int(os.environ.get('COMPRESSION_MIN_SIZE', '1024')),
+    cache=compressed_bodies,
+)
+
+# Outermost, so latencies include compression
+app.add_middleware(metrics.MetricsMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -34,6 +64,152 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+STARTED_AT = time.monotonic()
+
+# Seconds the readiness probe waits for the database ping
+READINESS_TIMEOUT = float(os.environ.get('READINESS_TIMEOUT', '2'))
+
+@app.on_event("startup")
+async def warm_up_on_startup():
+    # Runs before the server accepts connections, so the first request finds everything built
+    if os.environ.get('WARMUP_ON_STARTUP', 'true').lower() == 'true':
+        app.state.warmup = await warm_up(app)
+
+@app.on_event("shutdown")
+async def shutdown_db_pool():
+    close_async_db()
+    close_http_pool()
+
+# Model each list endpoint's `fields=` projection is validated against
+LIST_MODELS = {
+    'houses': House,
+    'members': Member,
+    'vehicles': Vehicle,
+    'maintenance_payments': MaintenancePayment,
+    'expenditures': Expenditure,
+}
+
+# Model fields that list endpoints never return
+UNLISTED_FIELDS = {'expenditures': {'attachmentData'}}
+
+def parse_fields(table: str, fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a comma separated `fields=` parameter into the columns to select"""
+    if fields is None:
+        return None
+    columns = list(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+    allowed = set(LIST_MODELS[table].model_fields) - UNLISTED_FIELDS.get(table, set())
+    unknown = [c for c in columns if c not in allowed]
+    if unknown or not columns:
+        raise ValueError(f"Unknown fields {unknown}; choose from {sorted(allowed)}" if unknown else "fields must not be empty")
+    return columns
+
+def build_list_query(table: str, limit: int, cursor: Optional[str], sort: Optional[str], order: str,
+                     fields: Optional[str] = None, filters: Optional[dict] = None,
+                     ranges: Optional[dict] = None) -> ListQuery:
+    """Turn list endpoint query parameters into a ListQuery, dropping unset filters"""
+    return ListQuery(
+        filters={k: v for k, v in (filters or {}).items() if v is not None},
+        ranges={k: r for k, r in (ranges or {}).items() if r != (None, None)},
+        sort=sort or LIST_SPECS[table]['default_sort'],
+        descending=order == 'desc',
+        limit=limit,
+        cursor=cursor,
+        columns=parse_fields(table, fields),
+    )
+
+def pagination_info(page, limit: int) -> dict:
+    return {
+        "pageSize": limit,
+        "nextCursor": page.next_cursor,
+        "hasMore": page.has_more
+    }
+
+async def check_etag(request: Request, response: Response, *tables: str) -> Optional[Response]:
+    """Tag the response with the version of `tables`; return a 304 if the client already has it.
+
+    Table versions are read from the database at most every ETAG_STATE_TTL
+    seconds, so a matching request is usually answered without touching
+    the database or serializing anything.
+    """
+    db = get_async_db()
+    key = f"{request.url.path}?{request.url.query}"
+    etag = db.versions.cached_etag(tables, key) or await db.table_etag(tables, key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+def check_row_etag(request: Request, response: Response, row: dict) -> Optional[Response]:
+    """Tag a single-row response with the row's ETag; return a 304 if the client already has this version"""
+    etag = row_etag(row)
+    if etag is None:
+        return None
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
+# Operations per apply_batch call; each call is one bounded trip to the DB thread pool
+BATCH_CHUNK_SIZE = 200
+
+BATCH_ORDER = {"create": 0, "update": 1, "delete": 2}
+
+BATCH_STATUS = {"created": 201, "updated": 200, "deleted": 200, "not_found": 404, "conflict": 409, "error": 400}
+
+def validate_batch_operation(operation: BatchOperation, create_model, update_model, record_model) -> BatchOp:
+    """Check one batch operation against the entity's models; raises ValueError"""
+    if operation.op == "create":
+        record = record_model(**create_model(**(operation.data or {})).model_dump())
+        return BatchOp("create", record.id, record.model_dump())
+    if not operation.id:
+        raise ValueError(f"{operation.op} needs an id")
+    if operation.op == "update":
+        data = update_model(**(operation.data or {})).model_dump(exclude_none=True)
+        return BatchOp("update", operation.id, data, parse_if_match(operation.version))
+    return BatchOp("delete", operation.id, expected_version=parse_if_match(operation.version))
+
+def batch_error(e: ValueError) -> List[str]:
+    if isinstance(e, ValidationError):
+        return [f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors()]
+    return [str(e)]
+
+async def run_batch(table: str, batch: BatchRequest, create_model, update_model, record_model) -> dict:
+    """Validate every operation in one pass, then apply the valid ones as chunked bulk statements.
+
+    Creates run first, then updates, then deletes. Each item gets its own
+    status; invalid or failing items never stop the others.
+    """
+    results: List[Optional[dict]] = [None] * len(batch.operations)
+    valid = []
+    for index, operation in enumerate(batch.operations):
+        try:
+            valid.append((index, validate_batch_operation(operation, create_model, update_model, record_model)))
+        except ValueError as e:
+            results[index] = {"index": index, "op": operation.op, "id": operation.id, "status": 422, "errors": batch_error(e)}
+    valid.sort(key=lambda item: BATCH_ORDER[item[1].op])
+
+    db = get_async_db()
+    for start in range(0, len(valid), BATCH_CHUNK_SIZE):
+        chunk = valid[start:start + BATCH_CHUNK_SIZE]
+        outcomes = await db.apply_batch(table, [op for _, op in chunk])
+        for (index, op), outcome in zip(chunk, outcomes):
+            results[index] = batch_result(index, op, outcome)
+
+    succeeded = sum(1 for result in results if result["status"] < 400)
+    return {"results": results, "summary": {"succeeded": succeeded, "failed": len(results) - succeeded}}
+
+def batch_result(index: int, op: BatchOp, outcome: BatchOutcome) -> dict:
+    result = {"index": index, "op": op.op, "id": outcome.id, "status": BATCH_STATUS[outcome.outcome]}
+    if outcome.outcome in ("created", "updated"):
+        result["version"] = outcome.row.get("updatedAt")
+    elif outcome.outcome == "conflict":
+        result["current"] = outcome.row
+    if outcome.error and outcome.outcome != "conflict":
+        result["errors"] = [outcome.error]
+    return result
+
 # Health endpoints
 @app.get("/api/")
 async def root():
@@ -41,65 +217,107 @@ async def root():
 
 @app.get("/api/health")
 async def health_check():
-    try:
-        db = get_db()
-        return {"status": "healthy", "database": "connected"}
-    except Exception as e:
-        return {"status": "unhealthy", "error": str(e)}
+    database = await ping_database(READINESS_TIMEOUT)
+    if database["status"] != "up":
+        return {"status": "unhealthy", "database": "unreachable", "error": database["error"]}
+    return {"status": "healthy", "database": "connected", "latencyMs": database["latencyMs"]}
+
+@app.get("/api/health/live")
+async def liveness():
+    """The process is up and serving; never touches the database"""
+    return {"status": "alive", "uptimeSeconds": round(time.monotonic() - STARTED_AT, 1)}
+
+@app.get("/api/health/ready")
+async def readiness():
+    """Ready once the database answers a ping within READINESS_TIMEOUT seconds; 503 otherwise"""
+    database = await ping_database(READINESS_TIMEOUT)
+    ready = database["status"] == "up"
+    body = {"status": "ready" if ready else "unavailable", "database": database}
+    warmup = getattr(app.state, 'warmup', None)
+    if warmup is not None:
+        body["warmup"] = warmup.as_dict()
+    return JSONResponse(body, status_code=200 if ready else 503)
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request, latency and database call metrics in the Prometheus text format"""
+    return Response(content=metrics.REGISTRY.render(), media_type=metrics.CONTENT_TYPE)
 
 # Houses endpoints
 @app.get("/api/houses")
-async def get_houses():
-    """Get all houses"""
+async def get_houses(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    fields: Optional[str] = None,
+    status: Optional[str] = None,
+    block: Optional[str] = None,
+    floor: Optional[str] = None
+):
+    """Get a page of houses"""
     try:
-        db = get_db()
-        houses_data = db.get_houses()
+        db = get_async_db()
+        not_modified = await check_etag(request, response, 'houses')
+        if not_modified:
+            return not_modified
+        query = build_list_query('houses', limit, cursor, sort, order, fields,
+                                 filters={"status": status, "block": block, "floor": floor})
+        page = await db.list_houses(query)
         
-        # Calculate summary
-        total = len(houses_data)
-        occupied = sum(1 for h in houses_data if h.get('status') == 'occupied')
-        vacant = sum(1 for h in houses_data if h.get('status') == 'vacant')
+        summary = await db.get_house_summary()
+        # The summary counts every house; a filtered list needs its own count
+        total = await db.count_houses(query) if query.filters else summary["total"]
         
-        return {
-            "list": houses_data,
-            "summary": {
-                "total": total,
-                "occupied": occupied,
-                "vacant": vacant
-            },
-            "pagination": {
-                "total": total,
-                "page": 1,
-                "pageSize": 50
-            }
-        }
+        return trusted_json({
+            "list": page.rows,
+            "summary": summary,
+            "pagination": {"total": total, **pagination_info(page, limit)}
+        }, response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching houses: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch houses")
 
+@app.post("/api/houses/batch")
+async def batch_houses(batch: BatchRequest):
+    """Create, update and delete many houses in one request, with a result per operation"""
+    try:
+        return await run_batch('houses', batch, HouseCreate, HouseUpdate, House)
+    except Exception as e:
+        logger.error(f"Error running house batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to run house batch")
+
 @app.post("/api/houses")
-async def create_house(house_data: HouseCreate):
+async def create_house(house_data: HouseCreate, response: Response):
     """Create a new house"""
     try:
-        db = get_db()
-        house = House(**house_data.dict())
-        created_house = db.create_house(house.dict())
+        db = get_async_db()
+        house = House(**house_data.model_dump())
+        created_house = await db.create_house(house.model_dump())
         if not created_house:
             raise HTTPException(status_code=400, detail="Failed to create house")
+        tag_row(response, created_house)
         return created_house
     except Exception as e:
         logger.error(f"Error creating house: {e}")
         raise HTTPException(status_code=500, detail="Failed to create house")
 
 @app.get("/api/houses/{house_id}")
-async def get_house(house_id: str):
+async def get_house(request: Request, response: Response, house_id: str):
     """Get a specific house"""
     try:
-        db = get_db()
-        house_data = db.get_house_by_id(house_id)
+        db = get_async_db()
+        house_data = await db.get_house_by_id(house_id)
         if not house_data:
             raise HTTPException(status_code=404, detail="House not found")
-        return house_data
+        not_modified = check_row_etag(request, response, house_data)
+        if not_modified:
+            return not_modified
+        return trusted_json(house_data, response)
     except HTTPException:
         raise
     except Exception as e:
@@ -107,66 +325,95 @@ async def get_house(house_id: str):
         raise HTTPException(status_code=500, detail="Failed to fetch house")
 
 @app.put("/api/houses/{house_id}")
-async def update_house(house_id: str, update_data: HouseUpdate):
-    """Update a house"""
+async def update_house(house_id: str, update_data: HouseUpdate, response: Response,
+                       if_match: Optional[str] = Header(None)):
+    """Update a house; with If-Match: <ETag from the last read or write> only if nobody changed it since"""
     try:
-        db = get_db()
-        existing_house = db.get_house_by_id(house_id)
-        if not existing_house:
-            raise HTTPException(status_code=404, detail="House not found")
-        
-        update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
-        updated_house = db.update_house(house_id, update_dict)
+        db = get_async_db()
+        update_dict = {k: v for k, v in update_data.model_dump().items() if v is not None}
+        updated_house = await db.update_house(house_id, update_dict, parse_if_match(if_match))
         if not updated_house:
-            raise HTTPException(status_code=400, detail="Failed to update house")
+            raise HTTPException(status_code=404, detail="House not found")
+        tag_row(response, updated_house)
         return updated_house
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error updating house: {e}")
         raise HTTPException(status_code=500, detail="Failed to update house")
 
 @app.delete("/api/houses/{house_id}")
-async def delete_house(house_id: str):
-    """Delete a house"""
+async def delete_house(house_id: str, if_match: Optional[str] = Header(None)):
+    """Delete a house; with If-Match: <ETag from the last read or write> only if nobody changed it since"""
     try:
-        db = get_db()
-        existing_house = db.get_house_by_id(house_id)
-        if not existing_house:
-            raise HTTPException(status_code=404, detail="House not found")
-        
-        success = db.delete_house(house_id)
+        db = get_async_db()
+        success = await db.delete_house(house_id, parse_if_match(if_match))
         if not success:
-            raise HTTPException(status_code=400, detail="Failed to delete house")
+            raise HTTPException(status_code=404, detail="House not found")
         
         return {"message": "House deleted successfully"}
     except HTTPException:
         raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
     except Exception as e:
         logger.error(f"Error deleting house: {e}")
         raise HTTPException(status_code=500, detail="Failed to delete house")
 
 # Members endpoints
 @app.get("/api/members")
-async def get_members():
-    """Get all members"""
+async def get_members(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    fields: Optional[str] = None,
+    status: Optional[str] = None,
+    house: Optional[str] = None,
+    role: Optional[str] = None
+):
+    """Get a page of members"""
     try:
-        db = get_db()
-        members_data = db.get_members()
-        return members_data
+        db = get_async_db()
+        not_modified = await check_etag(request, response, 'members')
+        if not_modified:
+            return not_modified
+        query = build_list_query('members', limit, cursor, sort, order, fields,
+                                 filters={"status": status, "house": house, "role": role})
+        page = await db.list_members(query)
+        return trusted_json({
+            "list": page.rows,
+            "pagination": pagination_info(page, limit)
+        }, response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching members: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch members")
 
+@app.post("/api/members/batch")
+async def batch_members(batch: BatchRequest):
+    """Create, update and delete many members in one request, with a result per operation"""
+    try:
+        return await run_batch('members', batch, MemberCreate, MemberUpdate, Member)
+    except Exception as e:
+        logger.error(f"Error running member batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to run member batch")
+
 @app.post("/api/members")
-async def create_member(member_data: MemberCreate):
+async def create_member(member_data: MemberCreate, response: Response):
     """Create a new member"""
     try:
-        db = get_db()
-        member = Member(**member_data.dict())
-        created_member = db.create_member(member.dict())
+        db = get_async_db()
+        member = Member(**member_data.model_dump())
+        created_member = await db.create_member(member.model_dump())
         if not created_member:
             raise HTTPException(status_code=400, detail="Failed to create member")
+        tag_row(response, created_member)
         return created_member
     except Exception as e:
         logger.error(f"Error creating member: {e}")
@@ -174,25 +421,56 @@ async def create_member(member_data: MemberCreate):
 
 # Vehicles endpoints
 @app.get("/api/vehicles")
-async def get_vehicles():
-    """Get all vehicles"""
+async def get_vehicles(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    fields: Optional[str] = None,
+    status: Optional[str] = None,
+    house: Optional[str] = None,
+    type: Optional[str] = None
+):
+    """Get a page of vehicles"""
     try:
-        db = get_db()
-        vehicles_data = db.get_vehicles()
-        return vehicles_data
+        db = get_async_db()
+        not_modified = await check_etag(request, response, 'vehicles')
+        if not_modified:
+            return not_modified
+        query = build_list_query('vehicles', limit, cursor, sort, order, fields,
+                                 filters={"status": status, "house": house, "type": type})
+        page = await db.list_vehicles(query)
+        return trusted_json({
+            "list": page.rows,
+            "pagination": pagination_info(page, limit)
+        }, response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching vehicles: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch vehicles")
 
+@app.post("/api/vehicles/batch")
+async def batch_vehicles(batch: BatchRequest):
+    """Create, update and delete many vehicles in one request, with a result per operation"""
+    try:
+        return await run_batch('vehicles', batch, VehicleCreate, VehicleUpdate, Vehicle)
+    except Exception as e:
+        logger.error(f"Error running vehicle batch: {e}")
+        raise HTTPException(status_code=500, detail="Failed to run vehicle batch")
+
 @app.post("/api/vehicles")
-async def create_vehicle(vehicle_data: VehicleCreate):
+async def create_vehicle(vehicle_data: VehicleCreate, response: Response):
     """Create a new vehicle"""
     try:
-        db = get_db()
-        vehicle = Vehicle(**vehicle_data.dict())
-        created_vehicle = db.create_vehicle(vehicle.dict())
+        db = get_async_db()
+        vehicle = Vehicle(**vehicle_data.model_dump())
+        created_vehicle = await db.create_vehicle(vehicle.model_dump())
         if not created_vehicle:
             raise HTTPException(status_code=400, detail="Failed to create vehicle")
+        tag_row(response, created_vehicle)
         return created_vehicle
     except Exception as e:
         logger.error(f"Error creating vehicle: {e}")
@@ -200,97 +478,382 @@ async def create_vehicle(vehicle_data: VehicleCreate):
 
 # Payments endpoints
 @app.get("/api/payments")
-async def get_payments():
-    """Get all payments"""
+async def get_payments(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    fields: Optional[str] = None,
+    status: Optional[str] = None,
+    house: Optional[str] = None,
+    month: Optional[str] = None,
+    due_from: Optional[str] = Query(None, alias="dueFrom"),
+    due_to: Optional[str] = Query(None, alias="dueTo")
+):
+    """Get a page of payments"""
     try:
-        db = get_db()
-        payments_data = db.get_payments()
+        db = get_async_db()
+        not_modified = await check_etag(request, response, 'maintenance_payments')
+        if not_modified:
+            return not_modified
+        query = build_list_query('maintenance_payments', limit, cursor, sort, order, fields,
+                                 filters={"status": status, "house": house, "month": month},
+                                 ranges={"dueDate": (due_from, due_to)})
+        page = await db.list_payments(query)
+        summary = await db.get_payment_summary()
         
-        # Calculate summary
-        total_amount = sum(p.get('amount', 0) for p in payments_data)
-        total_collected = sum(p.get('amountPaid', 0) for p in payments_data if p.get('status') == 'paid')
-        pending_amount = sum(p.get('amount', 0) - p.get('amountPaid', 0) for p in payments_data if p.get('status') in ['pending', 'partial'])
-        overdue_amount = sum(p.get('amount', 0) - p.get('amountPaid', 0) for p in payments_data if p.get('status') == 'overdue')
-        collection_rate = (total_collected / total_amount * 100) if total_amount > 0 else 0
-        
-        return {
-            "list": payments_data,
-            "summary": {
-                "total": total_amount,
-                "collected": total_collected,
-                "pending": pending_amount,
-                "overdue": overdue_amount,
-                "collectionRate": round(collection_rate, 2)
-            }
-        }
+        return trusted_json({
+            "list": page.rows,
+            "summary": summary,
+            "pagination": pagination_info(page, limit)
+        }, response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching payments: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch payments")
 
+@app.get("/api/payments/summary")
+async def get_payment_summary(request: Request, response: Response, month: Optional[str] = None):
+    """Get payment totals, optionally for a single month"""
+    try:
+        db = get_async_db()
+        not_modified = await check_etag(request, response, 'maintenance_payments')
+        if not_modified:
+            return not_modified
+        return await db.get_payment_summary(month)
+    except Exception as e:
+        logger.error(f"Error fetching payment summary: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch payment summary")
+
 @app.post("/api/payments")
-async def create_payment(payment_data: MaintenancePaymentCreate):
+async def create_payment(payment_data: MaintenancePaymentCreate, response: Response):
     """Create a new payment"""
     try:
-        db = get_db()
-        payment_dict = payment_data.dict()
-        created_payment = db.create_payment(payment_dict)
+        db = get_async_db()
+        payment_dict = payment_data.model_dump()
+        created_payment = await db.create_payment(payment_dict)
         if not created_payment:
             raise HTTPException(status_code=400, detail="Failed to create payment")
+        tag_row(response, created_payment)
         return created_payment
     except Exception as e:
         logger.error(f"Error creating payment: {e}")
         raise HTTPException(status_code=500, detail="Failed to create payment")
 
-# Expenditures endpoints
-@app.get("/api/expenditures")
-async def get_expenditures():
-    """Get all expenditures"""
+@app.post("/api/payments/generate-monthly")
+async def generate_monthly_payments(
+    default_amount: float = Query(..., description="Default maintenance amount"),
+    month: Optional[str] = Query(None, description="Month to bill as YYYY-MM, defaults to the current month")
+):
+    """Generate monthly payments for all houses, skipping houses already billed for the month"""
     try:
-        db = get_db()
-        expenditures_data = db.get_expenditures()
-        
-        # Calculate summary
-        total_expenditure = sum(e.get('amount', 0) for e in expenditures_data)
-        
-        # Get total collection from payments
-        payments_data = db.get_payments()
-        total_collection = sum(p.get('amountPaid', 0) for p in payments_data if p.get('status') == 'paid')
+        billing_date = datetime.strptime(month, "%Y-%m") if month else datetime.utcnow()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="month must be formatted as YYYY-MM")
+    
+    try:
+        db = get_async_db()
+        month_str = billing_date.strftime("%B %Y")
+        due_date = billing_date.replace(day=5).strftime("%Y-%m-%d")  # Due on 5th of month
         
-        remaining_balance = total_collection - total_expenditure
+        houses_data = await db.fetch_all('houses', ListQuery(columns=['houseNo', 'ownerName']))
+        payments = [
+            {
+                "house": house["houseNo"],
+                "owner": house.get("ownerName") or "",
+                "amount": default_amount,
+                "amountPaid": 0,
+                "month": month_str,
+                "dueDate": due_date,
+                "status": "pending"
+            }
+            for house in houses_data if house.get("houseNo")
+        ]
         
-        # Category breakdown
-        category_breakdown = {}
-        for exp in expenditures_data:
-            category = exp.get('category')
-            amount = exp.get('amount', 0)
-            if category in category_breakdown:
-                category_breakdown[category] += amount
-            else:
-                category_breakdown[category] = amount
+        created = await db.create_payments(payments)
         
         return {
-            "list": expenditures_data,
-            "summary": {
-                "totalExpenditure": total_expenditure,
-                "totalCollection": total_collection,
-                "remainingBalance": remaining_balance,
-                "categoryBreakdown": category_breakdown
-            }
+            "message": f"Generated {len(created)} monthly payments",
+            "month": month_str,
+            "amount": default_amount,
+            "generated_count": len(created),
+            "created": len(created),
+            "skipped": len(payments) - len(created)
         }
+    except Exception as e:
+        logger.error(f"Error generating monthly payments: {e}")
+        raise HTTPException(status_code=500, detail="Failed to generate monthly payments")
+
+# Expenditures endpoints
+@app.get("/api/expenditures")
+async def get_expenditures(
+    request: Request,
+    response: Response,
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    sort: Optional[str] = None,
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    fields: Optional[str] = None,
+    category: Optional[str] = None,
+    payment_mode: Optional[str] = Query(None, alias="paymentMode"),
+    date_from: Optional[str] = Query(None, alias="dateFrom"),
+    date_to: Optional[str] = Query(None, alias="dateTo")
+):
+    """Get a page of expenditures"""
+    try:
+        db = get_async_db()
+        not_modified = await check_etag(request, response, 'expenditures', 'maintenance_payments')
+        if not_modified:
+            return not_modified
+        query = build_list_query('expenditures', limit, cursor, sort, order, fields,
+                                 filters={"category": category, "paymentMode": payment_mode},
+                                 ranges={"date": (date_from, date_to)})
+        page = await db.list_expenditures(query)
+        summary = await db.get_expenditure_summary()
+        
+        return trusted_json({
+            "list": page.rows,
+            "summary": summary,
+            "pagination": pagination_info(page, limit)
+        }, response)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error fetching expenditures: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch expenditures")
 
+# Ledger endpoints
+@app.get("/api/ledger")
+async def get_ledger(request: Request, response: Response):
+    """Get the society balance with a per-month running balance"""
+    try:
+        db = get_async_db()
+        not_modified = await check_etag(request, response, 'expenditures', 'maintenance_payments')
+        if not_modified:
+            return not_modified
+        return await db.get_ledger()
+    except Exception as e:
+        logger.error(f"Error fetching ledger: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch ledger")
+
 @app.post("/api/expenditures")
-async def create_expenditure(expenditure_data: ExpenditureCreate):
+async def create_expenditure(expenditure_data: ExpenditureCreate, response: Response):
     """Create a new expenditure"""
     try:
-        db = get_db()
-        expenditure_dict = expenditure_data.dict()
-        created_expenditure = db.create_expenditure(expenditure_dict)
+        db = get_async_db()
+        try:
+            expenditure_dict = await run_in_threadpool(store_inline_attachment, get_blob_store(), expenditure_data.model_dump())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        created_expenditure = await db.create_expenditure(expenditure_dict)
         if not created_expenditure:
             raise HTTPException(status_code=400, detail="Failed to create expenditure")
+        tag_row(response, created_expenditure)
         return created_expenditure
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating expenditure: {e}")
-        raise HTTPException(status_code=500, detail="Failed to create expenditure")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Failed to create expenditure")
+
+@app.put("/api/expenditures/{expenditure_id}/attachment")
+async def upload_expenditure_attachment(expenditure_id: int, request: Request, response: Response,
+                                        filename: Optional[str] = None, if_match: Optional[str] = Header(None)):
+    """Stream the raw request body into the blob store and attach it to an expenditure"""
+    try:
+        db = get_async_db()
+        store = get_blob_store()
+        # File writes and hashing run on the thread pool, never on the event loop
+        writer = await run_in_threadpool(store.writer)
+        try:
+            async for chunk in request.stream():
+                if writer.size + len(chunk) > MAX_ATTACHMENT_BYTES:
+                    raise HTTPException(status_code=413, detail=f"Attachment exceeds {MAX_ATTACHMENT_BYTES} bytes")
+                await run_in_threadpool(writer.write, chunk)
+            if not writer.size:
+                raise HTTPException(status_code=400, detail="Attachment is empty")
+            digest, size = await run_in_threadpool(writer.commit)
+        except BaseException:
+            await run_in_threadpool(writer.abort)
+            raise
+
+        attachment = {
+            "attachmentRef": digest,
+            "attachmentSize": size,
+            "attachmentType": request.headers.get("content-type") or "application/octet-stream",
+            "attachmentData": None
+        }
+        if filename:
+            attachment["attachmentName"] = filename
+        # The conditional update is the existence check: None means there is no such expenditure.
+        # A blob left unreferenced by a failed update is removed by sweep_orphaned_blobs.
+        updated_expenditure = await db.update_expenditure(expenditure_id, attachment, parse_if_match(if_match))
+        if not updated_expenditure:
+            raise HTTPException(status_code=404, detail="Expenditure not found")
+        tag_row(response, updated_expenditure)
+        return updated_expenditure
+    except HTTPException:
+        raise
+    except VersionConflictError as e:
+        raise version_conflict(e)
+    except Exception as e:
+        logger.error(f"Error uploading attachment for expenditure {expenditure_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to upload attachment")
+
+@app.get("/api/expenditures/{expenditure_id}/attachment")
+async def download_expenditure_attachment(expenditure_id: int, request: Request):
+    """Stream an expenditure's attachment from the blob store"""
+    try:
+        db = get_async_db()
+        expenditure = await db.get_expenditure_by_id(expenditure_id)
+        if not expenditure:
+            raise HTTPException(status_code=404, detail="Expenditure not found")
+        media_type = expenditure.get("attachmentType") or "application/octet-stream"
+        filename = expenditure.get("attachmentName")
+
+        ref = expenditure.get("attachmentRef")
+        if ref:
+            # Content-addressed, so the digest is a strong validator
+            headers = {"ETag": f'"{ref}"', "Cache-Control": "no-cache"}
+            if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+                return Response(status_code=304, headers=headers)
+            path = get_blob_store().path(ref)
+            if not path.exists():
+                raise HTTPException(status_code=404, detail="Attachment content missing")
+            return FileResponse(path, media_type=media_type, filename=filename, headers=headers)
+
+        # Rows not yet migrated still carry the file inline
+        if expenditure.get("attachmentData"):
+            content, inline_type = decode_attachment_data(expenditure["attachmentData"])
+            headers = {"Content-Disposition": f'attachment; filename="{filename}"'} if filename else None
+            return Response(content=content, media_type=inline_type or media_type, headers=headers)
+        raise HTTPException(status_code=404, detail="Expenditure has no attachment")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error downloading attachment for expenditure {expenditure_id}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to download attachment")
+
+# Export endpoints
+EXPORT_TABLES = {
+    'houses': 'houses',
+    'members': 'members',
+    'vehicles': 'vehicles',
+    'payments': 'maintenance_payments',
+    'maintenance_payments': 'maintenance_payments',
+    'expenditures': 'expenditures',
+}
+
+@app.get("/api/export/{entity}")
+async def export_entity(
+    request: Request,
+    entity: str,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    gzip: bool = False,
+    fields: Optional[str] = None
+):
+    """Stream every row of an entity as NDJSON or CSV, optionally gzipped.
+
+    Equality filters of the entity's list endpoint (e.g. ?status=paid) apply.
+    """
+    table = EXPORT_TABLES.get(entity)
+    if table is None:
+        raise HTTPException(status_code=404, detail=f"Cannot export {entity}")
+    try:
+        columns = parse_fields(table, fields) or [
+            f for f in LIST_MODELS[table].model_fields if f not in UNLISTED_FIELDS.get(table, set())
+        ]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filters = {k: v for k, v in request.query_params.items() if k in LIST_SPECS[table]['filters']}
+
+    filename = f"{entity}-{datetime.utcnow().strftime('%Y%m%d')}.{format}" + (".gz" if gzip else "")
+    media_type = "application/gzip" if gzip else CONTENT_TYPES[format]
+    return StreamingResponse(
+        export_stream(get_async_db(), table, columns, format, gzip, filters),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+# Import endpoints
+@app.post("/api/import/{entity}")
+async def import_entity(entity: str, file: UploadFile = File(...), dry_run: bool = Query(False, alias="dryRun")):
+    """Bulk-import a CSV or Excel file, reporting the rows that failed validation"""
+    # Deferred: pandas is the heaviest import in the app and only imports need it
+    from importer import IMPORT_SPECS, import_file
+    table = EXPORT_TABLES.get(entity)
+    if table not in IMPORT_SPECS:
+        raise HTTPException(status_code=404, detail=f"Cannot import {entity}")
+    try:
+        db = get_async_db()
+        return await run_in_threadpool(import_file, db.repo, table, file.file, file.filename or "", dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error importing {entity}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to import {entity}")
+
+# Entity cache
+@app.get("/api/admin/cache")
+async def get_cache_stats():
+    """Hit/miss counters of the entity cache"""
+    db = get_async_db()
+    return await db.cache_stats()
+
+# Aggregate store maintenance
+@app.get("/api/admin/aggregates/verify")
+async def verify_aggregates():
+    """Recompute summary aggregates from scratch and report any drift"""
+    try:
+        db = get_async_db()
+        drift = await db.verify_aggregates()
+        return {"ok": not drift, "drift": drift}
+    except Exception as e:
+        logger.error(f"Error verifying aggregates: {e}")
+        raise HTTPException(status_code=500, detail="Failed to verify aggregates")
+
+@app.post("/api/admin/aggregates/rebuild")
+async def rebuild_aggregates():
+    """Rebuild summary aggregates from the raw tables"""
+    try:
+        db = get_async_db()
+        await db.rebuild_aggregates()
+        return {"message": "Aggregates rebuilt successfully"}
+    except Exception as e:
+        logger.error(f"Error rebuilding aggregates: {e}")
+        raise HTTPException(status_code=500, detail="Failed to rebuild aggregates")
+
+@app.post("/api/admin/attachments/migrate")
+async def migrate_attachments(limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None):
+    """Move inline base64 attachments of one page of expenditures into the blob store"""
+    try:
+        db = get_async_db()
+        return await db.run(migrate_inline_attachments, db.repo, get_blob_store(), limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error migrating attachments: {e}")
+        raise HTTPException(status_code=500, detail="Failed to migrate attachments")
+
+@app.post("/api/admin/attachments/sweep")
+async def sweep_attachments():
+    """Delete stored attachments that no expenditure references any more"""
+    try:
+        db = get_async_db()
+        return await db.run(sweep_orphaned_blobs, db.repo, get_blob_store())
+    except Exception as e:
+        logger.error(f"Error sweeping attachments: {e}")
+        raise HTTPException(status_code=500, detail="Failed to sweep attachments")
+
+@app.get("/api/admin/ledger/reconcile")
+async def reconcile_ledger():
+    """Check the maintained ledger against the raw payments and expenditures"""
+    try:
+        db = get_async_db()
+        return await db.reconcile_ledger()
+    except Exception as e:
+        logger.error(f"Error reconciling ledger: {e}")
+        raise HTTPException(status_code=500, detail="Failed to reconcile ledger")
@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from database_simple import get_async_db
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class WarmupReport:
+    """Duration of each warm-up step in milliseconds, and the steps that failed"""
+    steps: Dict[str, float] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"ok": self.ok, "totalMs": round(sum(self.steps.values()), 1), "stepsMs": self.steps,
+                "errors": self.errors}
+
+async def warm_up(app) -> WarmupReport:
+    """Pay the first-request costs before traffic arrives.
+
+    client  build the repository (Supabase import, client, TLS set up lazily by the first call)
+    pool    start every DB worker thread with a ping, opening its connection
+    caches  build the summary aggregates from the tables
+    openapi render the OpenAPI schema FastAPI otherwise builds on the first /docs hit
+
+    A failed step is logged and reported but never stops the app from
+    starting; readiness keeps failing until the database answers.
+    """
+    report = WarmupReport()
+
+    async def step(name: str, fn: Callable[[], Awaitable[Any]]) -> bool:
+        started = time.perf_counter()
+        try:
+            await fn()
+            return True
+        except Exception as e:
+            logger.error(f"Warm-up step {name} failed: {e}")
+            report.errors[name] = str(e)
+            return False
+        finally:
+            report.steps[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    if await step("client", lambda: run_in_threadpool(get_async_db)):
+        db = get_async_db()
+        if await step("pool", lambda: db.prestart(db.repo.ping)):
+            await step("caches", db.get_house_summary)
+    await step("openapi", lambda: run_in_threadpool(app.openapi))
+    logger.info(f"Warm-up finished in {sum(report.steps.values()):.0f} ms: {report.steps}")
+    return report
+
+async def ping_database(timeout: float) -> Dict[str, Any]:
+    """Timed round trip to the database; status is "up" or "down" """
+    started = time.perf_counter()
+    error: Optional[str] = None
+    try:
+        await asyncio.wait_for(get_async_db().ping(), timeout)
+    except asyncio.TimeoutError:
+        error = f"no response within {timeout}s"
+    except Exception as e:
+        error = str(e) or type(e).__name__
+    latency = round((time.perf_counter() - started) * 1000, 1)
+    if error is not None:
+        logger.error(f"Database ping failed: {error}")
+        return {"status": "down", "latencyMs": latency, "error": error}
+    return {"status": "up", "latencyMs": latency}
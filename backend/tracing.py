@@ -0,0 +1,132 @@
+import contextvars
+import logging
+import os
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+from metrics import route_label
+
+logger = logging.getLogger(__name__)
+
+# Database calls one request may make before a warning is logged
+QUERY_BUDGET = int(os.getenv("QUERY_BUDGET", "20"))
+
+# Single-row calls on one table repeated this often in a request look like an N+1 loop
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "5"))
+
+SINGLE_ROW_OPS = ('insert_row', 'get_row', 'update_row', 'delete_row')
+
+@dataclass
+class DbCall:
+    table: str
+    op: str
+    duration: float
+    rows: int
+    error: Optional[str] = None
+
+@dataclass
+class RequestTrace:
+    """Every repository primitive call made while handling one request"""
+    calls: List[DbCall] = field(default_factory=list)
+    started: float = field(default_factory=time.perf_counter)
+
+    def record(self, call: DbCall) -> None:
+        self.calls.append(call)
+
+    @property
+    def db_time(self) -> float:
+        return sum(call.duration for call in self.calls)
+
+    def by_operation(self) -> Dict[Tuple[str, str], Tuple[int, float]]:
+        """(table, op) -> (calls, seconds)"""
+        summary: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        for call in self.calls:
+            count, seconds = summary.get((call.table, call.op), (0, 0.0))
+            summary[(call.table, call.op)] = (count + 1, seconds + call.duration)
+        return summary
+
+    def repeated_calls(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> List[Tuple[str, str, int]]:
+        """Single-row operations issued at least `threshold` times on the same table"""
+        counts = Counter((call.table, call.op) for call in self.calls if call.op in SINGLE_ROW_OPS)
+        return [(table, op, count) for (table, op), count in counts.most_common() if count >= threshold]
+
+    def server_timing(self) -> str:
+        """Server-Timing header value: total, all database time, then each table.op"""
+        entries = [
+            f'total;dur={(time.perf_counter() - self.started) * 1000:.1f}',
+            f'db;dur={self.db_time * 1000:.1f};desc="{len(self.calls)} calls"',
+        ]
+        for (table, op), (count, seconds) in sorted(self.by_operation().items()):
+            entries.append(f'{table}.{op};dur={seconds * 1000:.1f};desc="{count} calls"')
+        return ', '.join(entries)
+
+_current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar('request_trace', default=None)
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current_trace.get()
+
+@contextmanager
+def trace_calls() -> Iterator[RequestTrace]:
+    """Collect the database calls made inside the block (tests, scripts)"""
+    trace = RequestTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+class CallTracer:
+    """Call listener adding each primitive call to the trace of the request that made it.
+
+    The trace lives in a context variable; AsyncRepository runs calls in a
+    copy of the caller's context, so calls on the DB thread pool land in
+    the right request.
+    """
+
+    def on_call(self, table: str, op: str, duration: float, rows: int, error: Optional[BaseException] = None) -> None:
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.record(DbCall(table, op, duration, rows, type(error).__name__ if error is not None else None))
+
+class TracingMiddleware:
+    """Traces the database calls of each request into a Server-Timing header.
+
+    Requests over `query_budget` calls, or repeating a single-row operation
+    `n_plus_one_threshold` times, are logged as warnings.
+    """
+
+    def __init__(self, app, query_budget: int = QUERY_BUDGET, n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.query_budget = query_budget
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+        trace = RequestTrace()
+        token = _current_trace.set(trace)
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                MutableHeaders(scope=message).append('Server-Timing', trace.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_trace.reset(token)
+            self.check(scope, trace)
+
+    def check(self, scope, trace: RequestTrace) -> None:
+        request = f"{scope['method']} {route_label(scope)}"
+        if len(trace.calls) > self.query_budget:
+            counts = ', '.join(f"{table}.{op} x{count}" for (table, op), (count, _) in trace.by_operation().items())
+            logger.warning(f"{request} made {len(trace.calls)} database calls (budget {self.query_budget}): {counts}")
+        for table, op, count in trace.repeated_calls(self.n_plus_one_threshold):
+            logger.warning(f"{request} called {op} on {table} {count} times; possible N+1 query")
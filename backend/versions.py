@@ -0,0 +1,116 @@
+import base64
+import hashlib
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+# Seconds a table state read from the database is trusted before it is read again
+STATE_TTL = float(os.getenv("ETAG_STATE_TTL", "1"))
+
+class TableVersions:
+    """Per-table versions taken from the database, for tagging list responses.
+
+    A table's version is the change counter the database keeps for it (see
+    TableState), so every worker looking at the same rows hands out the
+    same tag, and tags stay valid across restarts. States are cached for `ttl` seconds: this
+    process's own writes drop the cached state at once, while a write by
+    another worker or outside the API shows up within `ttl`.
+    """
+
+    def __init__(self, ttl: float = STATE_TTL):
+        self._lock = threading.Lock()
+        self._states: Dict[str, Tuple[float, Any]] = {}
+        self._generations: Dict[str, int] = {}
+        self.ttl = ttl
+
+    def _cached(self, table: str) -> Optional[Any]:
+        entry = self._states.get(table)
+        if entry is None or time.monotonic() - entry[0] >= self.ttl:
+            return None
+        return entry[1]
+
+    def state(self, repo, table: str) -> Any:
+        state = self._cached(table)
+        if state is not None:
+            return state
+        generation = self._generations.get(table, 0)
+        state = repo.table_state(table)
+        with self._lock:
+            # A write that landed during the read may or may not be in it: don't cache
+            if self._generations.get(table, 0) == generation:
+                self._states[table] = (time.monotonic(), state)
+        return state
+
+    @staticmethod
+    def _tag(states: Iterable[Any], key: str) -> str:
+        versions = '|'.join(str(state.version) for state in states)
+        return f'W/"{hashlib.sha1(f"{versions}|{key}".encode()).hexdigest()[:20]}"'
+
+    def etag(self, repo, tables: Iterable[str], key: str = '') -> str:
+        """Weak ETag for a response derived from `tables`, varied by `key` (e.g. the URL)"""
+        return self._tag([self.state(repo, table) for table in tables], key)
+
+    def cached_etag(self, tables: Iterable[str], key: str = '') -> Optional[str]:
+        """The ETag from cached states only; None if any of them has to be read again"""
+        states = [self._cached(table) for table in tables]
+        if any(state is None for state in states):
+            return None
+        return self._tag(states, key)
+
+    # Write listener
+    def on_write(self, table: str, op: str, row_id: Any, row: Optional[Dict[str, Any]] = None) -> None:
+        with self._lock:
+            self._generations[table] = self._generations.get(table, 0) + 1
+            self._states.pop(table, None)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+# Row tags are unpadded base64url; a bare updatedAt always contains ':', which that alphabet lacks
+_ROW_TAG = re.compile(r'^[A-Za-z0-9_-]+$')
+
+def row_etag(row: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Strong ETag of one row: its updatedAt, encoded as an opaque token.
+
+    Detail GETs and write responses carry it, and parse_if_match turns it
+    back into the updatedAt a conditional write must still find.
+    """
+    version = (row or {}).get('updatedAt')
+    if version is None:
+        return None
+    if not isinstance(version, str):
+        version = version.isoformat()
+    return '"' + base64.urlsafe_b64encode(version.encode()).decode().rstrip('=') + '"'
+
+def parse_if_match(if_match: Optional[str]) -> Optional[str]:
+    """Row version (the updatedAt value) a write is conditional on; None when absent or *.
+
+    Takes the row ETag from row_etag, or a quoted updatedAt as sent by
+    older clients. Anything else (e.g. a weak list tag) matches no row.
+    """
+    if not if_match or if_match.strip() == '*':
+        return None
+    version = if_match.strip()
+    if version.startswith('W/'):
+        version = version[2:]
+    version = version.strip('"')
+    if _ROW_TAG.match(version):
+        try:
+            return base64.urlsafe_b64decode(version + '=' * (-len(version) % 4)).decode()
+        except (ValueError, UnicodeDecodeError):
+            pass
+    return version
@@ -0,0 +1,154 @@
+"""Per-call latency of SupabaseDB over cold and warm HTTP connections.
+
+  cold  keep-alive off: every call opens a new connection (TCP, plus TLS)
+  warm  the tuned pool from http_pool, connections opened by a warm-up call
+
+By default the calls go to a local PostgREST stand-in over loopback, with
+TLS on a throwaway self-signed certificate when openssl is available. Pass
+--url and --key to measure a real Supabase project, where connection setup
+costs network round trips and the gap is far wider.
+
+Usage: python benchmarks/bench_http_pool.py [--calls 200] [--no-tls] [--url URL --key KEY]
+"""
+import argparse
+import json
+import logging
+import os
+import shutil
+import ssl
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+import httpx  # noqa: E402
+from supabase import create_client  # noqa: E402
+from supabase.lib.client_options import SyncClientOptions  # noqa: E402
+
+import metrics  # noqa: E402
+from database_simple import SupabaseDB  # noqa: E402
+from http_pool import PoolConfig, build_http_client  # noqa: E402
+
+class PostgRESTStub(BaseHTTPRequestHandler):
+    """Answers every GET with one row, keeping connections alive (HTTP/1.1)"""
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out as separate writes; without this, delayed ACKs stall keep-alive calls ~40 ms
+    disable_nagle_algorithm = True
+    delay = 0.0
+
+    def do_GET(self):
+        if self.delay:
+            time.sleep(self.delay)
+        body = json.dumps([{'id': 'h1'}]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Range', '0-0/1')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class StubServer:
+    """A PostgREST stand-in on a free loopback port, optionally behind TLS"""
+
+    def __init__(self, tls: bool = False, delay: float = 0.0):
+        handler = type('Handler', (PostgRESTStub,), {'delay': delay})
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        self.server.daemon_threads = True
+        self.ssl_context: Optional[ssl.SSLContext] = None
+        self._certs = None
+        if tls:
+            self._certs = tempfile.TemporaryDirectory()
+            cert, key = os.path.join(self._certs.name, 'cert.pem'), os.path.join(self._certs.name, 'key.pem')
+            subprocess.run(['openssl', 'req', '-x509', '-newkey', 'rsa:2048', '-nodes', '-keyout', key, '-out', cert,
+                            '-days', '1', '-subj', '/CN=127.0.0.1', '-addext', 'subjectAltName=IP:127.0.0.1'],
+                           check=True, capture_output=True)
+            server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            server_context.load_cert_chain(cert, key)
+            self.server.socket = server_context.wrap_socket(self.server.socket, server_side=True)
+            self.ssl_context = ssl.create_default_context(cafile=cert)
+        scheme = 'https' if tls else 'http'
+        self.url = f'{scheme}://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if self._certs is not None:
+            self._certs.cleanup()
+
+def pooled_client(config: PoolConfig, verify: Any = True) -> httpx.Client:
+    return build_http_client(config, httpx.HTTPTransport(http2=config.http2, limits=config.limits(), verify=verify))
+
+def measure(db: SupabaseDB, calls: int, warmup: int) -> Dict[str, float]:
+    for _ in range(warmup):
+        db.ping()
+    opened = metrics.HTTP_POOL_CONNECTIONS_OPENED.value()
+    handshakes = metrics.HTTP_POOL_TLS_HANDSHAKES.value()
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        db.ping()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'connections_opened': int(metrics.HTTP_POOL_CONNECTIONS_OPENED.value() - opened),
+        'tls_handshakes': int(metrics.HTTP_POOL_TLS_HANDSHAKES.value() - handshakes),
+    }
+
+def run(url: str, key: str, calls: int = 200, verify: Any = True,
+        config: Optional[PoolConfig] = None) -> Dict[str, Dict[str, float]]:
+    """cold and warm per-call latency of SupabaseDB.ping against `url`"""
+    config = config or PoolConfig.from_env()
+    modes = {
+        'cold': (replace(config, max_keepalive=0), 0),
+        'warm': (config, 1),
+    }
+    results = {}
+    for name, (mode_config, warmup) in modes.items():
+        http = pooled_client(mode_config, verify)
+        try:
+            db = SupabaseDB(client=create_client(url, key, options=SyncClientOptions(httpx_client=http)))
+            results[name] = measure(db, calls, warmup)
+        finally:
+            http.close()
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--no-tls', action='store_true', help='plain HTTP to the local stand-in')
+    parser.add_argument('--url', help='a real Supabase project URL instead of the local stand-in')
+    parser.add_argument('--key', default=os.environ.get('SUPABASE_SERVICE_ROLE_KEY', ''))
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    stub = None
+    verify: Any = True
+    url = args.url
+    if url is None:
+        stub = StubServer(tls=not args.no_tls and shutil.which('openssl') is not None)
+        url, verify = stub.url, stub.ssl_context or True
+    try:
+        results = run(url, args.key or 'local-key', args.calls, verify)
+    finally:
+        if stub is not None:
+            stub.close()
+    print(f"{url} ({args.calls} calls each)")
+    for name, result in results.items():
+        print(f"{name:<5} median {result['median_ms']:7.2f} ms  p95 {result['p95_ms']:7.2f} ms  "
+              f"{result['connections_opened']} connections, {result['tls_handshakes']} TLS handshakes")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""List latency before and after the trusted serialization path.
+
+Seeds an in-memory SQLite database and times GET /api/houses against two
+reconstructions of the old handlers on the same data:
+
+  validated  - House(**row) per row plus response_model validation (routes/)
+  encoded    - plain dict run through FastAPI's jsonable_encoder (server.py)
+
+Usage: python benchmarks/bench_list_latency.py [--rows 1000] [--repeat 50]
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ['SQLITE_PATH'] = ':memory:'
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+import database_simple  # noqa: E402
+from models import House, HousesListResponse  # noqa: E402
+from repository import ListQuery  # noqa: E402
+from server import app  # noqa: E402
+
+logging.disable(logging.INFO)
+
+before = FastAPI()
+
+@before.get('/validated', response_model=HousesListResponse)
+async def validated(limit: int):
+    db = database_simple.get_async_db()
+    page = await db.list_houses(ListQuery(limit=limit))
+    summary = await db.get_house_summary()
+    return HousesListResponse(list=[House(**row) for row in page.rows], summary=summary, pagination={})
+
+@before.get('/encoded')
+async def encoded(limit: int):
+    db = database_simple.get_async_db()
+    page = await db.list_houses(ListQuery(limit=limit))
+    summary = await db.get_house_summary()
+    return {"list": page.rows, "summary": summary, "pagination": {}}
+
+def seed(rows: int) -> None:
+    database_simple.get_db().insert_rows('houses', [
+        House(houseNo=f'B-{i:05d}', block='B', floor=str(i % 20), status='occupied' if i % 3 else 'vacant',
+              ownerName=f'Owner {i}', notes='Corner flat').model_dump()
+        for i in range(rows)
+    ])
+
+def timed(client: TestClient, url: str, params: dict, repeat: int) -> float:
+    client.get(url, params=params).raise_for_status()  # warm up
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        client.get(url, params=params).raise_for_status()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    params = {'limit': min(args.rows, 1000)}
+    results = {
+        'before (validated)': timed(TestClient(before), '/validated', params, args.repeat),
+        'before (encoded)': timed(TestClient(before), '/encoded', params, args.repeat),
+        'after (trusted)': timed(TestClient(app), '/api/houses', params, args.repeat),
+    }
+    for name, median in results.items():
+        print(f"{name:<20} {median:8.2f} ms  (median of {args.repeat}, {params['limit']} rows)")
+
+if __name__ == '__main__':
+    main()
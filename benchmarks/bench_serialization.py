@@ -0,0 +1,74 @@
+"""Serialization cost of list payloads built from the API models.
+
+For each model, N rows are encoded three ways:
+
+  fastapi    - jsonable_encoder + stdlib json (what a returned dict went through)
+  json       - FastJSONResponse with JSON_ENCODER=json
+  orjson     - FastJSONResponse with JSON_ENCODER=orjson
+
+Usage: python benchmarks/bench_serialization.py [--rows 5000] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+import responses  # noqa: E402
+from models import Expenditure, House, MaintenancePayment, Member, Vehicle  # noqa: E402
+
+def sample_rows(rows: int) -> dict:
+    return {
+        'houses': [House(houseNo=f'A-{i:05d}', block='A', floor=str(i % 20), status='occupied',
+                         ownerName=f'Owner {i}').model_dump() for i in range(rows)],
+        'members': [Member(name=f'Member {i}', house=f'A-{i:05d}', role='Owner', phone='9820000000',
+                           email=f'member{i}@example.com').model_dump() for i in range(rows)],
+        'vehicles': [Vehicle(number=f'MH01AB{i:04d}', type='Four Wheeler', brandModel='Swift', color='White',
+                             house=f'A-{i:05d}', registrationDate='2021-04-01').model_dump() for i in range(rows)],
+        'payments': [MaintenancePayment(id=i, house=f'A-{i:05d}', owner=f'Owner {i}', amount=1500, amountPaid=750,
+                                        month='May 2025', dueDate='2025-05-10', status='partial').model_dump()
+                     for i in range(rows)],
+        'expenditures': [Expenditure(id=i, title=f'Lift service {i}', category='Maintenance', amount=12500.75,
+                                     paymentMode='Bank', date='2025-05-01', description='Quarterly AMC visit').model_dump()
+                         for i in range(rows)],
+    }
+
+def fastapi_default(content) -> bytes:
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                      separators=(',', ':')).encode('utf-8')
+
+def with_encoder(name: str):
+    def render(content) -> bytes:
+        responses.JSON_ENCODER = name
+        return responses.FastJSONResponse(content).body
+    return render
+
+def timed(render, content, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        render(content)
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    encoders = {'fastapi': fastapi_default, 'json': with_encoder('json')}
+    if responses.orjson is not None:
+        encoders['orjson'] = with_encoder('orjson')
+    print(f"{'model':<14}" + ''.join(f"{name:>12}" for name in encoders) + f"   (median ms, {args.rows} rows)")
+    for model, rows in sample_rows(args.rows).items():
+        content = {'list': rows, 'summary': {}}
+        print(f"{model:<14}" + ''.join(f"{timed(render, content, args.repeat):12.2f}" for render in encoders.values()))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,292 @@
+"""Load generator replaying the society's traffic mix against the API.
+
+Request kinds are weighted per profile:
+
+  dashboard  admins' screens polling lists and summaries (with If-None-Match)
+  billing    month-start storm: bill generation retries, pending lists, one-off payments
+  bulk       batch updates of houses next to list reads
+  mixed      all of the above (default)
+
+Arrivals are open-loop at --rate requests/s (Poisson, seeded) with at most
+--concurrency in flight; latency is measured from each request's
+scheduled start, so time spent waiting for a free slot counts. --rate 0
+runs closed-loop: --concurrency workers issuing back to back.
+
+Without --url a local server is started (uvicorn, one worker) on the
+in-process Supabase stand-in with FAKE_SUPABASE_LATENCY_MS of injected
+latency and seeded with --houses houses, so runs are reproducible.
+
+  python benchmarks/loadtest.py --profile mixed --rate 200 --concurrency 32 --duration 30 --output load.json
+  python benchmarks/loadtest.py --url http://localhost:8001 --rate 0 --concurrency 8 --requests 2000
+
+Per endpoint the report gives requests, throughput, error rate and
+p50/p95/p99; --slo-p95-ms and --max-error-rate make the run exit 1 when
+an endpoint misses them.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BILLING_MONTH = '2025-06'
+
+class Traffic:
+    """Builds the next request of each kind; the counters keep generated data unique"""
+
+    def __init__(self, house_ids: List[str], seed: int):
+        self.house_ids = house_ids or ['missing']
+        self.random = random.Random(seed)
+        self.serial = itertools.count()
+
+    def house_id(self) -> str:
+        return self.random.choice(self.house_ids)
+
+    def kinds(self) -> Dict[str, Callable[[], Tuple[str, str, Dict[str, Any]]]]:
+        return {
+            'GET /api/houses': lambda: ('GET', '/api/houses', {'params': {'limit': 50}}),
+            'GET /api/houses/{id}': lambda: ('GET', f'/api/houses/{self.house_id()}', {}),
+            'GET /api/payments?status=pending': lambda: ('GET', '/api/payments', {'params': {'status': 'pending', 'limit': 100}}),
+            'GET /api/payments/summary': lambda: ('GET', '/api/payments/summary', {}),
+            'GET /api/expenditures': lambda: ('GET', '/api/expenditures', {'params': {'limit': 50}}),
+            'GET /api/ledger': lambda: ('GET', '/api/ledger', {}),
+            'GET /api/members': lambda: ('GET', '/api/members', {'params': {'limit': 50}}),
+            'POST /api/payments/generate-monthly': lambda: (
+                'POST', '/api/payments/generate-monthly', {'params': {'default_amount': 1500, 'month': BILLING_MONTH}}),
+            'POST /api/payments': lambda: ('POST', '/api/payments', {'json': {
+                'house': f'EXTRA-{next(self.serial):07d}', 'owner': 'Walk-in', 'amount': 500,
+                'month': 'June 2025', 'dueDate': '2025-06-05', 'status': 'paid', 'amountPaid': 500}}),
+            'POST /api/houses/batch': lambda: ('POST', '/api/houses/batch', {'json': {'operations': [
+                {'op': 'update', 'id': self.house_id(), 'data': {'notes': f'audit {next(self.serial)}'}}
+                for _ in range(50)]}}),
+        }
+
+PROFILES: Dict[str, Dict[str, int]] = {
+    'dashboard': {
+        'GET /api/houses': 3, 'GET /api/payments?status=pending': 3, 'GET /api/payments/summary': 2,
+        'GET /api/expenditures': 2, 'GET /api/ledger': 1, 'GET /api/members': 1, 'GET /api/houses/{id}': 2,
+    },
+    'billing': {
+        'POST /api/payments/generate-monthly': 1, 'GET /api/payments?status=pending': 4,
+        'GET /api/payments/summary': 3, 'POST /api/payments': 2,
+    },
+    'bulk': {'POST /api/houses/batch': 1, 'GET /api/houses': 2, 'GET /api/houses/{id}': 2},
+}
+PROFILES['mixed'] = {kind: weight for profile in PROFILES.values() for kind, weight in profile.items()}
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(round(fraction * len(sorted_values), 9)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+def summarize(samples: Dict[str, List[Tuple[float, bool]]], elapsed: float,
+              slo_p95_ms: Optional[float] = None, max_error_rate: Optional[float] = None) -> Dict[str, Any]:
+    endpoints = {}
+    everything: List[Tuple[float, bool]] = []
+    for kind, values in sorted(samples.items()):
+        everything.extend(values)
+        endpoints[kind] = _stats(values, elapsed, slo_p95_ms, max_error_rate)
+    return {'elapsed_s': round(elapsed, 3), 'overall': _stats(everything, elapsed, None, None), 'endpoints': endpoints}
+
+def _stats(values: List[Tuple[float, bool]], elapsed: float,
+           slo_p95_ms: Optional[float], max_error_rate: Optional[float]) -> Dict[str, Any]:
+    latencies = sorted(latency for latency, _ in values)
+    errors = sum(1 for _, ok in values if not ok)
+    stats = {
+        'requests': len(values),
+        'throughput_rps': round(len(values) / elapsed, 2) if elapsed else 0.0,
+        'error_rate': round(errors / len(values), 4) if values else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50), 2),
+        'p95_ms': round(percentile(latencies, 0.95), 2),
+        'p99_ms': round(percentile(latencies, 0.99), 2),
+        'max_ms': round(latencies[-1], 2) if latencies else 0.0,
+    }
+    breaches = []
+    if slo_p95_ms is not None and stats['p95_ms'] > slo_p95_ms:
+        breaches.append(f"p95 {stats['p95_ms']}ms > {slo_p95_ms}ms")
+    if max_error_rate is not None and stats['error_rate'] > max_error_rate:
+        breaches.append(f"error rate {stats['error_rate']:.2%} > {max_error_rate:.2%}")
+    if breaches:
+        stats['slo_breaches'] = breaches
+    return stats
+
+async def run_load(base_url: str, profile: str, concurrency: int, rate: float, duration: Optional[float],
+                   total_requests: Optional[int], house_ids: List[str], seed: int = 0, etags: bool = True,
+                   transport: Optional[httpx.AsyncBaseTransport] = None
+                   ) -> Tuple[Dict[str, List[Tuple[float, bool]]], float]:
+    """Drive the mix and return (kind -> [(latency ms, ok)], elapsed seconds)"""
+    traffic = Traffic(house_ids, seed)
+    builders = traffic.kinds()
+    weights = PROFILES[profile]
+    kinds, cumulative = list(weights), list(itertools.accumulate(weights.values()))
+    chooser = random.Random(seed + 1)
+    samples: Dict[str, List[Tuple[float, bool]]] = {kind: [] for kind in kinds}
+    known_etags: Dict[str, str] = {}
+    slots = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0, transport=transport) as client:
+        async def issue(kind: str, scheduled: float) -> None:
+            method, url, options = builders[kind]()
+            headers = {}
+            cache_key = f"{url}?{options.get('params')}"
+            if etags and method == 'GET' and cache_key in known_etags:
+                headers['If-None-Match'] = known_etags[cache_key]
+            async with slots:
+                try:
+                    response = await client.request(method, url, headers=headers, **options)
+                    ok = response.status_code < 400
+                    if etags and 'etag' in response.headers:
+                        known_etags[cache_key] = response.headers['etag']
+                except httpx.HTTPError:
+                    ok = False
+            samples[kind].append(((time.perf_counter() - scheduled) * 1000, ok))
+
+        def next_kind() -> str:
+            return kinds[chooser.choices(range(len(kinds)), cum_weights=cumulative)[0]]
+
+        started = time.perf_counter()
+        deadline = started + duration if duration else None
+        issued = 0
+
+        def more() -> bool:
+            if total_requests is not None and issued >= total_requests:
+                return False
+            return deadline is None or time.perf_counter() < deadline
+
+        if rate > 0:
+            tasks = []
+            scheduled = started
+            while more():
+                scheduled += chooser.expovariate(rate)
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                tasks.append(asyncio.create_task(issue(next_kind(), scheduled)))
+                issued += 1
+            await asyncio.gather(*tasks)
+        else:
+            async def worker() -> None:
+                nonlocal issued
+                while more():
+                    issued += 1
+                    await issue(next_kind(), time.perf_counter())
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return {kind: values for kind, values in samples.items() if values}, elapsed
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_local_server(houses: int, latency_ms: float, jitter_ms: float,
+                       log_path: Optional[str] = None) -> Tuple[subprocess.Popen, str]:
+    """Start uvicorn on the fake Supabase backend and seed it through the API"""
+    port = _free_port()
+    env = {**os.environ, 'DB_BACKEND': 'fake-supabase', 'FAKE_SUPABASE_LATENCY_MS': str(latency_ms),
+           'FAKE_SUPABASE_JITTER_MS': str(jitter_ms)}
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'server:app', '--app-dir', os.path.join(ROOT_DIR, 'backend'),
+         '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning', '--no-access-log'],
+        env=env,
+        stdout=subprocess.DEVNULL if log_path is None else open(log_path, 'w'),
+        stderr=subprocess.STDOUT,
+    )
+    base_url = f'http://127.0.0.1:{port}'
+    for _ in range(200):
+        try:
+            httpx.get(f'{base_url}/api/', timeout=1.0)
+            break
+        except httpx.HTTPError:
+            if process.poll() is not None:
+                raise RuntimeError('API server exited during startup')
+            time.sleep(0.05)
+    seed_society(base_url, houses)
+    return process, base_url
+
+def seed_society(base_url: str, houses: int) -> None:
+    with httpx.Client(base_url=base_url, timeout=120.0) as client:
+        for start in range(0, houses, 5000):
+            client.post('/api/houses/batch', json={'operations': [
+                {'op': 'create', 'data': {'houseNo': f'{chr(65 + i % 26)}-{i:06d}', 'block': chr(65 + i % 26),
+                                          'floor': str(i % 20), 'status': 'occupied', 'ownerName': f'Owner {i}'}}
+                for i in range(start, min(houses, start + 5000))]}).raise_for_status()
+        for month in ('2025-03', '2025-04', '2025-05'):
+            client.post('/api/payments/generate-monthly', params={'default_amount': 1500, 'month': month}).raise_for_status()
+        for i in range(200):
+            client.post('/api/expenditures', json={
+                'title': f'Expense {i}', 'category': 'Maintenance', 'amount': 1000 + i,
+                'paymentMode': 'Bank', 'date': f'2025-05-{i % 28 + 1:02d}'}).raise_for_status()
+
+def fetch_house_ids(base_url: str) -> List[str]:
+    """Ids the per-house requests pick from"""
+    response = httpx.get(f'{base_url}/api/export/houses', params={'fields': 'id'}, timeout=120.0)
+    response.raise_for_status()
+    return [json.loads(line)['id'] for line in response.text.splitlines()]
+
+def print_report(report: Dict[str, Any]) -> None:
+    header = f"{'endpoint':<38}{'reqs':>7}{'rps':>9}{'err%':>7}{'p50':>9}{'p95':>9}{'p99':>9}"
+    print(header, file=sys.stderr)
+    rows = list(report['endpoints'].items()) + [('overall', report['overall'])]
+    for kind, stats in rows:
+        flag = '  SLO: ' + '; '.join(stats['slo_breaches']) if stats.get('slo_breaches') else ''
+        print(f"{kind:<38}{stats['requests']:>7}{stats['throughput_rps']:>9.1f}{stats['error_rate'] * 100:>7.2f}"
+              f"{stats['p50_ms']:>9.1f}{stats['p95_ms']:>9.1f}{stats['p99_ms']:>9.1f}{flag}", file=sys.stderr)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', help='target an already running API instead of starting one')
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='mixed')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rate', type=float, default=100.0, help='arrivals per second; 0 for closed loop')
+    parser.add_argument('--duration', type=float, default=20.0, help='seconds (ignored with --requests)')
+    parser.add_argument('--requests', type=int, help='stop after this many requests')
+    parser.add_argument('--houses', type=int, default=2000)
+    parser.add_argument('--latency-ms', type=float, default=3.0, help='injected DB latency of the local server')
+    parser.add_argument('--jitter-ms', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--server-log', help='where the local server writes its log (default: discarded)')
+    parser.add_argument('--no-etags', action='store_true', help='never send If-None-Match')
+    parser.add_argument('--slo-p95-ms', type=float)
+    parser.add_argument('--max-error-rate', type=float)
+    parser.add_argument('--output', help='write the report JSON here')
+    args = parser.parse_args(argv)
+
+    process = None
+    base_url = args.url
+    if base_url is None:
+        process, base_url = start_local_server(args.houses, args.latency_ms, args.jitter_ms, args.server_log)
+    try:
+        samples, elapsed = asyncio.run(run_load(
+            base_url, args.profile, args.concurrency, args.rate, None if args.requests else args.duration,
+            args.requests, fetch_house_ids(base_url), args.seed, not args.no_etags))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    report = summarize(samples, elapsed, args.slo_p95_ms, args.max_error_rate)
+    report['config'] = {key: value for key, value in vars(args).items() if key != 'output'}
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+            f.write('\n')
+    return 1 if any(stats.get('slo_breaches') for stats in report['endpoints'].values()) else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""Hermetic benchmarks of the backend hot paths with a regression gate.
+
+Every benchmark runs in-process against the FastAPI app and a local
+database (in-memory SQLite, or SupabaseDB over the fake client with
+--backend fake-supabase) seeded with 1k/10k/100k rows:
+
+  list_houses, list_payments, list_expenditures   first 1000-row page over HTTP
+  summary_rebuild                                  aggregates recomputed from the tables
+  validate_houses, serialize_payments              pydantic validation / JSON rendering of every row
+  generate_monthly                                 POST /api/payments/generate-monthly for every house
+
+Results are written as JSON. With --baseline, a benchmark whose median
+is slower than the baseline by more than its threshold (default 25%,
+and always at least --min-delta-ms) fails the run with exit code 1.
+
+  python benchmarks/suite.py --sizes 1000,10000 --output results.json --baseline benchmarks/baseline.json
+  python benchmarks/suite.py --update-baseline benchmarks/baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend'))
+os.environ.setdefault('DB_BACKEND', 'sqlite')
+os.environ.setdefault('SQLITE_PATH', ':memory:')
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import database_simple  # noqa: E402
+import responses  # noqa: E402
+from models import House  # noqa: E402
+from server import app  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+DEFAULT_THRESHOLD = 0.25
+
+CATEGORIES = ('Security', 'Cleaning', 'Repairs', 'Utilities', 'Events', 'Maintenance', 'Administration', 'Other')
+STATUSES = ('pending', 'partial', 'paid', 'overdue')
+
+BENCHMARKS: Dict[str, Callable[['Context'], Callable[[], Any]]] = {}
+
+def benchmark(fn: Callable[['Context'], Callable[[], Any]]):
+    """Register a benchmark: fn(ctx) does any setup and returns the callable to time"""
+    BENCHMARKS[fn.__name__] = fn
+    return fn
+
+class Context:
+    """A freshly seeded database of `rows` houses, payments and expenditures"""
+
+    def __init__(self, rows: int):
+        self.rows = rows
+        database_simple.close_async_db()
+        database_simple._db_instance = None
+        self.db = database_simple.get_db()
+        self.client = TestClient(app)
+        self.seed()
+
+    def seed(self) -> None:
+        self.db.insert_rows('houses', [
+            {'id': f'h{i:06d}', 'houseNo': f'{chr(65 + i % 26)}-{i:06d}', 'block': chr(65 + i % 26),
+             'floor': str(i % 20), 'status': 'occupied' if i % 4 else 'vacant', 'ownerName': f'Owner {i}'}
+            for i in range(self.rows)
+        ])
+        self.db.insert_rows('maintenance_payments', [
+            {'house': f'{chr(65 + i % 26)}-{i:06d}', 'owner': f'Owner {i}', 'amount': 1500,
+             'amountPaid': (0, 750, 1500, 0)[i % 4], 'month': 'January 2020', 'dueDate': '2020-01-05',
+             'status': STATUSES[i % 4]}
+            for i in range(self.rows)
+        ])
+        self.db.insert_rows('expenditures', [
+            {'title': f'Expense {i}', 'category': CATEGORIES[i % len(CATEGORIES)], 'amount': 100 + i % 900,
+             'paymentMode': 'Bank', 'date': f'2024-{i % 12 + 1:02d}-{i % 28 + 1:02d}'}
+            for i in range(self.rows)
+        ])
+
+    def get(self, url: str, **params: Any) -> Callable[[], Any]:
+        def run():
+            self.client.get(url, params=params).raise_for_status()
+        return run
+
+@benchmark
+def list_houses(ctx: Context):
+    return ctx.get('/api/houses', limit=1000)
+
+@benchmark
+def list_payments(ctx: Context):
+    return ctx.get('/api/payments', limit=1000)
+
+@benchmark
+def list_expenditures(ctx: Context):
+    return ctx.get('/api/expenditures', limit=1000)
+
+@benchmark
+def summary_rebuild(ctx: Context):
+    return lambda: ctx.db.rebuild_aggregates()
+
+@benchmark
+def validate_houses(ctx: Context):
+    rows = ctx.db.fetch_all('houses')
+    return lambda: [House(**row) for row in rows]
+
+@benchmark
+def serialize_payments(ctx: Context):
+    rows = ctx.db.fetch_all('maintenance_payments')
+    return lambda: responses.dumps({'list': rows})
+
+@benchmark
+def generate_monthly(ctx: Context):
+    months = iter(f'{2021 + n // 12}-{n % 12 + 1:02d}' for n in range(1000))
+
+    def run():
+        response = ctx.client.post('/api/payments/generate-monthly',
+                                   params={'default_amount': 1500, 'month': next(months)})
+        response.raise_for_status()
+    return run
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return {
+        'median_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        'min_ms': round(samples[0], 3),
+        'runs': repeat,
+    }
+
+def run_suite(sizes=DEFAULT_SIZES, names: Optional[List[str]] = None, repeat: int = 5) -> Dict[str, Any]:
+    results = []
+    for rows in sizes:
+        ctx = Context(rows)
+        for name in names or BENCHMARKS:
+            # Big inputs get fewer runs; the medians stay stable and the suite stays minutes long
+            runs = max(1, repeat if rows < 100000 else repeat // 2)
+            result = {'name': name, 'rows': rows, **measure(BENCHMARKS[name](ctx), runs)}
+            results.append(result)
+            print(f"{name:<20} {rows:>7} rows  median {result['median_ms']:9.2f} ms  p95 {result['p95_ms']:9.2f} ms",
+                  file=sys.stderr)
+    database_simple.close_async_db()
+    database_simple._db_instance = None
+    return {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat() + 'Z',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'backend': os.environ.get('DB_BACKEND'),
+            'json_encoder': responses.JSON_ENCODER,
+        },
+        'results': results,
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float = DEFAULT_THRESHOLD,
+            min_delta_ms: float = 1.0) -> List[Dict[str, Any]]:
+    """Benchmarks whose median regressed past their threshold against the baseline.
+
+    The baseline may carry per-benchmark thresholds under "thresholds",
+    e.g. {"generate_monthly": 0.5}.
+    """
+    reference = {(r['name'], r['rows']): r for r in baseline.get('results', [])}
+    thresholds = baseline.get('thresholds', {})
+    regressions = []
+    for result in results['results']:
+        base = reference.get((result['name'], result['rows']))
+        if base is None:
+            continue
+        limit = thresholds.get(result['name'], threshold)
+        delta = result['median_ms'] - base['median_ms']
+        if delta > min_delta_ms and delta > base['median_ms'] * limit:
+            regressions.append({
+                'name': result['name'], 'rows': result['rows'], 'baseline_ms': base['median_ms'],
+                'median_ms': result['median_ms'], 'change': round(delta / base['median_ms'], 3), 'threshold': limit,
+            })
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)))
+    parser.add_argument('--only', help='comma-separated benchmark names')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--backend', choices=('sqlite', 'fake-supabase'))
+    parser.add_argument('--output', help='write the results JSON here (default: stdout)')
+    parser.add_argument('--baseline', help='fail on regressions against this results JSON')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument('--min-delta-ms', type=float, default=1.0)
+    parser.add_argument('--update-baseline', metavar='PATH', help='store the results as the new baseline')
+    args = parser.parse_args(argv)
+
+    if args.backend:
+        os.environ['DB_BACKEND'] = args.backend
+    logging.disable(logging.WARNING)
+    names = args.only.split(',') if args.only else None
+    unknown = set(names or ()) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    results = run_suite([int(size) for size in args.sizes.split(',')], names, args.repeat)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        results['regressions'] = compare(results, baseline, args.threshold, args.min_delta_ms)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    if args.update_baseline:
+        thresholds = {}
+        if os.path.exists(args.update_baseline):
+            with open(args.update_baseline) as f:
+                thresholds = json.load(f).get('thresholds', {})
+        with open(args.update_baseline, 'w') as f:
+            json.dump({'thresholds': thresholds, 'meta': results['meta'], 'results': results['results']}, f, indent=2)
+            f.write('\n')
+
+    for regression in results.get('regressions', []):
+        print(f"REGRESSION {regression['name']} @ {regression['rows']} rows: {regression['baseline_ms']} -> "
+              f"{regression['median_ms']} ms (+{regression['change']:.0%}, limit {regression['threshold']:.0%})",
+              file=sys.stderr)
+    return 1 if results.get('regressions') else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
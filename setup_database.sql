@@ -82,6 +82,9 @@ CREATE TABLE IF NOT EXISTS expenditures (
     description TEXT,
     "attachmentName" TEXT,
     "attachmentData" TEXT,
+    "attachmentRef" TEXT,
+    "attachmentSize" INTEGER,
+    "attachmentType" TEXT,
     "createdAt" TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
     "updatedAt" TIMESTAMP WITH TIME ZONE
 );
@@ -95,6 +98,56 @@ CREATE INDEX IF NOT EXISTS idx_payments_status ON maintenance_payments(status);
 CREATE INDEX IF NOT EXISTS idx_expenditures_category ON expenditures(category);
 CREATE INDEX IF NOT EXISTS idx_expenditures_date ON expenditures(date);
 
+-- Keyset pagination indexes (default sort key, id)
+CREATE INDEX IF NOT EXISTS idx_houses_house_no_id ON houses("houseNo", id);
+CREATE INDEX IF NOT EXISTS idx_members_name_id ON members(name, id);
+CREATE INDEX IF NOT EXISTS idx_vehicles_number_id ON vehicles(number, id);
+CREATE INDEX IF NOT EXISTS idx_payments_due_date_id ON maintenance_payments("dueDate", id);
+CREATE INDEX IF NOT EXISTS idx_expenditures_date_id ON expenditures(date, id);
+
+-- One bill per house per month (monthly bill generation relies on it to stay idempotent;
+-- remove duplicate (house, month) rows before applying to an existing database)
+CREATE UNIQUE INDEX IF NOT EXISTS uq_payments_house_month ON maintenance_payments(house, month);
+
+-- Change counter per table, bumped on every row written by the API, a dashboard edit or a script.
+-- Workers compare it with what their own writes account for to notice changes made elsewhere.
+CREATE TABLE IF NOT EXISTS table_versions (
+    name TEXT PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO table_versions (name) VALUES
+    ('houses'), ('members'), ('vehicles'), ('maintenance_payments'), ('expenditures')
+ON CONFLICT (name) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS TRIGGER AS $$
+BEGIN
+    UPDATE table_versions SET version = version + 1 WHERE name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS houses_version ON houses;
+CREATE TRIGGER houses_version AFTER INSERT OR UPDATE OR DELETE ON houses
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+DROP TRIGGER IF EXISTS members_version ON members;
+CREATE TRIGGER members_version AFTER INSERT OR UPDATE OR DELETE ON members
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+DROP TRIGGER IF EXISTS vehicles_version ON vehicles;
+CREATE TRIGGER vehicles_version AFTER INSERT OR UPDATE OR DELETE ON vehicles
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+DROP TRIGGER IF EXISTS maintenance_payments_version ON maintenance_payments;
+CREATE TRIGGER maintenance_payments_version AFTER INSERT OR UPDATE OR DELETE ON maintenance_payments
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+DROP TRIGGER IF EXISTS expenditures_version ON expenditures;
+CREATE TRIGGER expenditures_version AFTER INSERT OR UPDATE OR DELETE ON expenditures
+    FOR EACH ROW EXECUTE FUNCTION bump_table_version();
+
+-- Attachments live in the blob store; rows only keep a reference (for databases created before)
+ALTER TABLE expenditures ADD COLUMN IF NOT EXISTS "attachmentRef" TEXT;
+ALTER TABLE expenditures ADD COLUMN IF NOT EXISTS "attachmentSize" INTEGER;
+ALTER TABLE expenditures ADD COLUMN IF NOT EXISTS "attachmentType" TEXT;
+
 -- Insert some sample data
 INSERT INTO houses (id, "houseNo", block, floor, status, "ownerName") VALUES
     ('house-1', 'A-101', 'A', '1', 'occupied', 'John Doe'),
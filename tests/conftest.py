@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+# Tests never talk to Supabase
+os.environ['DB_BACKEND'] = 'sqlite'
+os.environ['SQLITE_PATH'] = ':memory:'
+
+import database_simple  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def fresh_db():
+    """Give every test its own empty in-memory database"""
+    database_simple.close_async_db()
+    database_simple._db_instance = None
+    yield
+    database_simple.close_async_db()
+    database_simple._db_instance = None
@@ -0,0 +1,131 @@
+from fastapi.testclient import TestClient
+
+import database_simple
+from database_sqlite import SQLiteDB
+from server import app
+
+client = TestClient(app)
+
+
+def _payment(house, month, amount, status='pending', amount_paid=0):
+    response = client.post('/api/payments', json={
+        'house': house, 'owner': 'Owner', 'amount': amount, 'month': month,
+        'dueDate': '2025-05-05', 'status': status,
+    })
+    payment = response.json()
+    if amount_paid:
+        payment = database_simple.get_db().update_payment(payment['id'], {'amountPaid': amount_paid})
+    return payment
+
+
+def test_summaries_follow_creates_updates_and_deletes():
+    client.get('/api/payments')  # build the store before any writes
+    _payment('A-101', 'May 2025', 1000, 'paid', 1000)
+    partial = _payment('A-102', 'May 2025', 1000, 'partial', 400)
+    overdue = _payment('A-101', 'June 2025', 500, 'overdue')
+
+    db = database_simple.get_db()
+    db.update_payment(partial['id'], {'status': 'paid', 'amountPaid': 1000})
+    db.delete_payment(overdue['id'])
+
+    summary = client.get('/api/payments').json()['summary']
+    assert summary == {'total': 2000.0, 'collected': 2000.0, 'pending': 0.0, 'overdue': 0.0, 'collectionRate': 100.0}
+    assert client.get('/api/payments/summary', params={'month': 'June 2025'}).json()['total'] == 0
+    assert client.get('/api/admin/aggregates/verify').json() == {'ok': True, 'drift': []}
+
+
+def test_house_and_expenditure_summaries():
+    for status in ('occupied', 'occupied', 'vacant', 'maintenance'):
+        client.post('/api/houses', json={'houseNo': 'A-1', 'block': 'A', 'floor': '1', 'status': status})
+    for category, amount in (('Security', 300), ('Security', 200), ('Repairs', 50)):
+        client.post('/api/expenditures', json={
+            'title': 'Bill', 'category': category, 'amount': amount,
+            'paymentMode': 'Cash', 'date': '2025-05-10',
+        })
+
+    assert client.get('/api/houses').json()['summary'] == {'total': 4, 'occupied': 2, 'vacant': 1}
+    summary = client.get('/api/expenditures').json()['summary']
+    assert summary['totalExpenditure'] == 550
+    assert summary['categoryBreakdown'] == {'Security': 500, 'Repairs': 50}
+
+
+def test_verify_reports_drift_and_rebuild_repairs_it():
+    client.get('/api/houses')
+    # Bypass the entity methods so the store never hears about this row
+    database_simple.get_db().insert_row('houses', {'id': 'h-x', 'houseNo': 'Z-1', 'block': 'Z', 'floor': '1'})
+
+    report = client.get('/api/admin/aggregates/verify').json()
+    assert not report['ok']
+    assert {'table': 'houses', 'dimension': 'total', 'key': None, 'measure': 'count',
+            'expected': 1, 'actual': 0} in report['drift']
+
+    client.post('/api/admin/aggregates/rebuild')
+    assert client.get('/api/admin/aggregates/verify').json()['ok']
+
+
+def _house(db, house_id, status='occupied'):
+    return db.create_house({'id': house_id, 'houseNo': house_id, 'block': 'A', 'floor': '1', 'status': status})
+
+
+def test_writes_by_another_worker_are_picked_up(tmp_path):
+    path = str(tmp_path / 'society.db')
+    ours, theirs = SQLiteDB(path), SQLiteDB(path)
+    try:
+        ours.aggregates.check_interval = 0
+        _house(ours, 'h1')
+        assert ours.get_house_summary()['total'] == 1
+
+        _house(theirs, 'h2', 'vacant')
+        assert ours.get_house_summary() == {'total': 2, 'occupied': 1, 'vacant': 1}
+        theirs.update_house('h1', {'status': 'vacant'})
+        assert ours.get_house_summary() == {'total': 2, 'occupied': 0, 'vacant': 2}
+        theirs.delete_house('h2')
+        assert ours.get_house_summary() == {'total': 1, 'occupied': 0, 'vacant': 1}
+    finally:
+        ours.close()
+        theirs.close()
+
+
+def test_another_workers_update_is_not_hidden_by_a_later_one_of_ours(tmp_path):
+    path = str(tmp_path / 'society.db')
+    ours, theirs = SQLiteDB(path), SQLiteDB(path)
+    try:
+        ours.aggregates.check_interval = 0
+        _house(ours, 'h1')
+        _house(ours, 'h2')
+        assert ours.get_house_summary()['occupied'] == 2
+
+        # Same row count, and our later stamp becomes max(updatedAt) again
+        theirs.update_house('h1', {'status': 'vacant'})
+        ours.update_house('h2', {'status': 'maintenance'})
+        assert ours.get_house_summary() == {'total': 2, 'occupied': 0, 'vacant': 1}
+        assert ours.verify_aggregates() == []
+    finally:
+        ours.close()
+        theirs.close()
+
+
+def test_own_writes_do_not_trigger_a_rebuild(monkeypatch):
+    db = database_simple.get_db()
+    db.aggregates.check_interval = 0
+    _house(db, 'h1')
+    db.get_house_summary()
+
+    rebuilds = []
+    monkeypatch.setattr(db.aggregates, 'rebuild', rebuilds.append)
+    _house(db, 'h2')
+    db.update_house('h1', {'status': 'vacant'})
+    db.delete_house('h2')
+    assert db.get_house_summary() == {'total': 1, 'occupied': 0, 'vacant': 1}
+    assert rebuilds == []
+
+
+def test_staleness_is_checked_at_most_every_interval():
+    db = database_simple.get_db()
+    db.aggregates.check_interval = 3600
+    db.get_house_summary()
+    db.insert_row('houses', {'id': 'h-x', 'houseNo': 'Z-1', 'block': 'Z', 'floor': '1'})
+    assert db.get_house_summary()['total'] == 0
+
+    db.aggregates.check_interval = 0
+    assert db.get_house_summary()['total'] == 1
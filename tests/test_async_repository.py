@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+import database_simple
+from async_repository import AsyncRepository, DatabaseTimeoutError
+from database_sqlite import SQLiteDB
+from server import app
+
+DELAY = 0.3
+
+
+class SlowSQLiteDB(SQLiteDB):
+    """Simulates a slow network round trip on every list query"""
+
+    def list_rows(self, table, query):
+        time.sleep(DELAY)
+        return super().list_rows(table, query)
+
+
+async def _get_concurrently(path, n):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await asyncio.gather(*(client.get(path) for _ in range(n)))
+
+
+def test_slow_queries_do_not_block_other_requests():
+    database_simple._async_db_instance = AsyncRepository(SlowSQLiteDB(), max_workers=4)
+
+    started = time.perf_counter()
+    responses = asyncio.run(_get_concurrently("/api/members", 4))
+    elapsed = time.perf_counter() - started
+
+    assert [r.status_code for r in responses] == [200] * 4
+    # Serialized calls would take 4 * DELAY
+    assert elapsed < 2 * DELAY
+
+
+def test_pool_size_bounds_concurrency():
+    database_simple._async_db_instance = AsyncRepository(SlowSQLiteDB(), max_workers=2)
+
+    started = time.perf_counter()
+    asyncio.run(_get_concurrently("/api/members", 4))
+    elapsed = time.perf_counter() - started
+
+    assert elapsed >= 2 * DELAY
+
+
+def test_call_timeout():
+    db = AsyncRepository(SlowSQLiteDB(), max_workers=1, timeout=DELAY / 3)
+    with pytest.raises(DatabaseTimeoutError):
+        asyncio.run(db.get_houses())
+    db.shutdown()
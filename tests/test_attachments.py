@@ -0,0 +1,114 @@
+import base64
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+import blob_store
+import database_simple
+from server import app
+
+client = TestClient(app)
+
+RECEIPT = b'%PDF-1.4 receipt ' * 1000
+
+
+@pytest.fixture(autouse=True)
+def attachments_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(blob_store, '_blob_store', blob_store.BlobStore(str(tmp_path)))
+    return tmp_path
+
+
+def _expenditure(**extra):
+    return {'title': 'Plumber', 'category': 'Repairs', 'amount': 800, 'paymentMode': 'Cash',
+            'date': '2025-05-03', **extra}
+
+
+def test_inline_attachments_are_stored_once_and_lists_carry_only_a_reference(attachments_dir):
+    encoded = base64.b64encode(RECEIPT).decode()
+    first = client.post('/api/expenditures', json=_expenditure(attachmentName='r.pdf', attachmentData=encoded)).json()
+    second = client.post('/api/expenditures', json=_expenditure(attachmentData=f'data:application/pdf;base64,{encoded}')).json()
+
+    assert first['attachmentRef'] == second['attachmentRef']
+    assert first['attachmentSize'] == len(RECEIPT)
+    assert second['attachmentType'] == 'application/pdf'
+    assert len([p for p in attachments_dir.rglob('*') if p.is_file()]) == 1
+
+    listed = client.get('/api/expenditures').json()['list']
+    assert all('attachmentData' not in row for row in listed)
+    assert listed[0]['attachmentSize'] == len(RECEIPT)
+
+    download = client.get(f"/api/expenditures/{first['id']}/attachment")
+    assert download.content == RECEIPT
+    assert 'r.pdf' in download.headers['content-disposition']
+
+    assert client.post('/api/expenditures', json=_expenditure(attachmentData='not base64!')).status_code == 400
+
+
+def test_streaming_upload_and_conditional_download():
+    created = client.post('/api/expenditures', json=_expenditure()).json()
+
+    chunks = (RECEIPT[i:i + 4096] for i in range(0, len(RECEIPT), 4096))
+    uploaded = client.put(f"/api/expenditures/{created['id']}/attachment", params={'filename': 'bill.pdf'},
+                          content=chunks, headers={'Content-Type': 'application/pdf'}).json()
+    assert uploaded['attachmentSize'] == len(RECEIPT)
+    assert uploaded['attachmentName'] == 'bill.pdf'
+
+    download = client.get(f"/api/expenditures/{created['id']}/attachment")
+    assert download.content == RECEIPT
+    assert download.headers['content-type'] == 'application/pdf'
+    assert download.headers['etag'] == f'"{uploaded["attachmentRef"]}"'
+
+    cached = client.get(f"/api/expenditures/{created['id']}/attachment", headers={'If-None-Match': download.headers['etag']})
+    assert cached.status_code == 304
+
+    assert client.put('/api/expenditures/999/attachment', content=b'x').status_code == 404
+
+
+def _blobs(directory):
+    return [p for p in directory.rglob('*') if p.is_file()]
+
+
+def test_sweep_removes_blobs_left_by_rejected_uploads_once_their_grace_period_is_over(attachments_dir):
+    store = blob_store.get_blob_store()
+    assert client.put('/api/expenditures/999/attachment', content=b'lost receipt').status_code == 404
+    created = client.post('/api/expenditures', json=_expenditure()).json()
+    stale = client.put(f"/api/expenditures/{created['id']}/attachment", content=b'second receipt',
+                       headers={'If-Match': '"c3RhbGU"'})
+    assert stale.status_code == 409
+    shared = client.post('/api/expenditures', json=_expenditure(attachmentData=base64.b64encode(RECEIPT).decode())).json()
+    assert len(_blobs(attachments_dir)) == 3
+
+    # A concurrent identical upload may still be attaching them: recent blobs are kept
+    assert client.post('/api/admin/attachments/sweep').json() == {'deleted': 0, 'kept': 3}
+    for path in _blobs(attachments_dir):
+        os.utime(path, (0, 0))
+    # Storing content again restarts its grace period
+    assert client.put('/api/expenditures/999/attachment', content=b'lost receipt').status_code == 404
+
+    db = database_simple.get_db()
+    assert blob_store.sweep_orphaned_blobs(db, store) == {'deleted': 1, 'kept': 2}
+    assert blob_store.sweep_orphaned_blobs(db, store, grace=0) == {'deleted': 1, 'kept': 1}
+    # Content a row references is never removed
+    assert client.get(f"/api/expenditures/{shared['id']}/attachment").content == RECEIPT
+
+
+def test_upload_keeps_the_stored_name_without_a_filename():
+    created = client.post('/api/expenditures', json=_expenditure(attachmentName='first.pdf')).json()
+    uploaded = client.put(f"/api/expenditures/{created['id']}/attachment", content=RECEIPT).json()
+    assert uploaded['attachmentName'] == 'first.pdf'
+
+
+def test_migration_moves_legacy_inline_rows():
+    db = database_simple.get_db()
+    legacy = db.insert_row('expenditures', _expenditure(attachmentName='old.png',
+                                                        attachmentData=base64.b64encode(b'png bytes').decode()))
+    assert client.get(f"/api/expenditures/{legacy['id']}/attachment").content == b'png bytes'
+
+    result = client.post('/api/admin/attachments/migrate').json()
+    assert (result['migrated'], result['failed'], result['nextCursor']) == (1, 0, None)
+
+    row = db.get_row('expenditures', legacy['id'])
+    assert row['attachmentData'] is None
+    assert row['attachmentSize'] == len(b'png bytes')
+    assert client.get(f"/api/expenditures/{legacy['id']}/attachment").content == b'png bytes'
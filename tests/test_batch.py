@@ -0,0 +1,83 @@
+from fastapi.testclient import TestClient
+
+import database_simple
+from repository import BatchOp
+from server import app
+
+client = TestClient(app)
+
+
+def _house(i):
+    return {'op': 'create', 'data': {'houseNo': f'T-{i:04d}', 'block': 'T', 'floor': str(i % 20)}}
+
+
+def test_tower_onboarding_runs_as_bulk_inserts(monkeypatch):
+    db = database_simple.get_db()
+    statements = []
+    original = db.insert_rows
+    monkeypatch.setattr(db, 'insert_rows', lambda table, rows, on_conflict=None: statements.append(len(rows)) or original(table, rows, on_conflict))
+
+    operations = [_house(i) for i in range(1000)] + [{'op': 'create', 'data': {'houseNo': 'T-X'}}]
+    body = client.post('/api/houses/batch', json={'operations': operations}).json()
+
+    assert body['summary'] == {'succeeded': 1000, 'failed': 1}
+    assert [r['status'] for r in body['results'][:2]] == [201, 201]
+    assert body['results'][-1]['status'] == 422
+    assert any('block' in error for error in body['results'][-1]['errors'])
+    assert len(statements) <= 10
+    assert client.get('/api/houses', params={'limit': 1}).json()['summary']['total'] == 1000
+
+
+def test_mixed_operations_report_per_item_results():
+    created = client.post('/api/houses/batch', json={'operations': [_house(i) for i in range(3)]}).json()['results']
+    (a, b, c) = created
+
+    operations = [
+        {'op': 'update', 'id': a['id'], 'data': {'status': 'occupied'}, 'version': a['version']},
+        {'op': 'update', 'id': b['id'], 'data': {'status': 'occupied'}, 'version': 'stale'},
+        {'op': 'update', 'id': 'missing', 'data': {'status': 'occupied'}},
+        {'op': 'delete', 'id': c['id']},
+        {'op': 'delete', 'id': 'missing'},
+        {'op': 'delete'},
+        {'op': 'update', 'id': a['id'], 'data': {'status': 'demolished'}},
+    ]
+    results = client.post('/api/houses/batch', json={'operations': operations}).json()['results']
+
+    assert [r['status'] for r in results] == [200, 409, 404, 200, 404, 422, 400]
+    assert results[1]['current']['id'] == b['id']
+    assert client.get(f"/api/houses/{a['id']}").json()['status'] == 'occupied'
+    assert client.get(f"/api/houses/{c['id']}").status_code == 404
+    assert client.get('/api/houses').json()['summary'] == {'total': 2, 'occupied': 1, 'vacant': 1}
+
+
+def test_members_and_vehicles_batches():
+    members = client.post('/api/members/batch', json={'operations': [
+        {'op': 'create', 'data': {'name': f'M{i}', 'house': 'A-101', 'role': 'Owner', 'phone': '1'}} for i in range(5)
+    ]}).json()
+    vehicles = client.post('/api/vehicles/batch', json={'operations': [
+        {'op': 'create', 'data': {'number': f'GJ{i}', 'type': 'Two Wheeler', 'house': 'A-101'}} for i in range(5)
+    ]}).json()
+
+    assert members['summary']['succeeded'] == vehicles['summary']['succeeded'] == 5
+    assert len(client.get('/api/vehicles', params={'house': 'A-101'}).json()['list']) == 5
+    assert client.post('/api/vehicles/batch', json={'operations': []}).status_code == 422
+
+
+def test_creates_are_matched_to_inserted_rows_by_id(monkeypatch):
+    db = database_simple.get_db()
+    db.create_house({'id': 'taken', 'houseNo': 'A-1', 'block': 'A', 'floor': '1'})
+    original = db.insert_rows
+    # Nothing promises RETURNING order
+    monkeypatch.setattr(db, 'insert_rows', lambda table, rows, on_conflict=None: original(table, rows, on_conflict)[::-1])
+
+    def create(house_id, house_no):
+        return BatchOp('create', house_id, {'id': house_id, 'houseNo': house_no, 'block': 'B', 'floor': '2'})
+    outcomes = db.apply_batch('houses', [create('b1', 'B-1'), create('taken', 'B-2'), create('b3', 'B-3'),
+                                         create('b1', 'B-4')])
+
+    assert [(o.outcome, o.id) for o in outcomes] == [
+        ('created', 'b1'), ('conflict', 'taken'), ('created', 'b3'), ('conflict', 'b1')]
+    assert outcomes[0].row['houseNo'] == 'B-1'
+    assert outcomes[2].row['houseNo'] == 'B-3'
+    assert outcomes[1].row['houseNo'] == 'A-1'
+    assert db.get_house_summary()['total'] == 3
@@ -0,0 +1,14 @@
+from benchmarks import suite
+
+
+def test_suite_runs_and_flags_regressions_against_a_baseline():
+    results = suite.run_suite(sizes=[50], names=['list_houses', 'summary_rebuild', 'generate_monthly'], repeat=1)
+    assert [(r['name'], r['rows']) for r in results['results']] == [
+        ('list_houses', 50), ('summary_rebuild', 50), ('generate_monthly', 50)]
+    assert all(r['median_ms'] > 0 for r in results['results'])
+
+    baseline = {'thresholds': {'summary_rebuild': 10.0}, 'results': [
+        {'name': r['name'], 'rows': r['rows'], 'median_ms': r['median_ms'] / 4} for r in results['results']]}
+    flagged = {r['name'] for r in suite.compare(results, baseline, threshold=0.25, min_delta_ms=0)}
+    assert flagged == {'list_houses', 'generate_monthly'}  # summary_rebuild is within its own threshold
+    assert suite.compare(results, {'results': results['results']}) == []
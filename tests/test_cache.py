@@ -0,0 +1,87 @@
+from fastapi.testclient import TestClient
+
+import database_simple
+from cache import EntityCache
+from server import app
+
+client = TestClient(app)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _create_house(house_no='A-101'):
+    return client.post('/api/houses', json={'houseNo': house_no, 'block': 'A', 'floor': '1'}).json()
+
+
+def test_detail_reads_hit_the_cache_and_writes_keep_it_fresh(monkeypatch):
+    house = _create_house()
+    db = database_simple.get_db()
+    reads = []
+    original = db.get_row
+    monkeypatch.setattr(db, 'get_row', lambda table, row_id: reads.append(row_id) or original(table, row_id))
+
+    client.get(f"/api/houses/{house['id']}")
+    client.get(f"/api/houses/{house['id']}")
+    client.put(f"/api/houses/{house['id']}", json={'status': 'occupied'})
+
+    assert client.get(f"/api/houses/{house['id']}").json()['status'] == 'occupied'
+    assert reads == [house['id']]
+
+    client.delete(f"/api/houses/{house['id']}")
+    assert client.get(f"/api/houses/{house['id']}").status_code == 404
+
+    stats = client.get('/api/admin/cache').json()
+    assert stats['tables']['houses']['hits'] >= 2
+    assert stats['misses'] >= 2
+
+
+def test_lru_eviction_and_ttl():
+    clock = FakeClock()
+    cache = EntityCache(max_entries=2, ttls={'houses': 10}, clock=clock)
+    for row_id in ('a', 'b'):
+        cache.put('houses', row_id, {'id': row_id})
+    cache.get('houses', 'a')
+    cache.put('houses', 'c', {'id': 'c'})
+
+    assert cache.get('houses', 'b') is None
+    assert cache.get('houses', 'a') == {'id': 'a'}
+    assert cache.stats()['evictions'] == 1
+
+    clock.now = 11
+    assert cache.get('houses', 'a') is None
+
+
+def test_read_through_never_overwrites_a_newer_write(monkeypatch):
+    house = _create_house()
+    db = database_simple.get_db()
+    db.cache.clear()
+    original = db.get_row
+
+    def read_then_lose_the_race(table, row_id):
+        row = original(table, row_id)
+        # Another request updates the row after this read, before it is cached
+        monkeypatch.setattr(db, 'get_row', original)
+        db.update_house(row_id, {'status': 'occupied'})
+        return row
+    monkeypatch.setattr(db, 'get_row', read_then_lose_the_race)
+
+    assert db.get_house_by_id(house['id'])['status'] == 'vacant'
+    assert db.cache.get('houses', house['id'])['status'] == 'occupied'
+    assert db.get_house_by_id(house['id'])['status'] == 'occupied'
+
+
+def test_put_with_a_stale_generation_is_dropped():
+    cache = EntityCache(ttls={'houses': 10})
+    generation = cache.generation('houses', 'a')
+    cache.on_write('houses', 'delete', 'a')
+    cache.put('houses', 'a', {'id': 'a'}, generation)
+    assert cache.get('houses', 'a') is None
+
+    cache.put('houses', 'a', {'id': 'a'}, cache.generation('houses', 'a'))
+    assert cache.get('houses', 'a') == {'id': 'a'}
@@ -0,0 +1,82 @@
+import gzip
+import json
+
+import brotli
+from fastapi.testclient import TestClient
+
+import database_simple
+from compression import choose_encoding
+from server import app, compressed_bodies
+
+client = TestClient(app)
+
+
+def _raw_body(path, encoding, **params):
+    """The body as sent on the wire, before httpx decodes it"""
+    with client.stream('GET', path, params=params, headers={'Accept-Encoding': encoding}) as response:
+        return response.headers.get('content-encoding'), b''.join(response.iter_raw())
+
+
+def _seed_payments(n, start=0):
+    database_simple.get_db().insert_rows('maintenance_payments', [
+        {'house': f'H-{i:05d}', 'owner': 'Owner', 'amount': 1500, 'month': 'May 2025', 'dueDate': '2025-05-10'}
+        for i in range(start, start + n)
+    ])
+
+
+def test_choose_encoding_honours_q_values():
+    assert choose_encoding('gzip, deflate, br') == 'br'
+    assert choose_encoding('gzip, br;q=0') == 'gzip'
+    assert choose_encoding('br;q=0.5, gzip;q=0.9') == 'gzip'
+    assert choose_encoding('*') == 'br'
+    assert choose_encoding('identity') is None
+    assert choose_encoding(None) is None
+
+
+def test_list_is_compressed_once_per_table_version():
+    _seed_payments(200)
+    compressed_bodies.clear()
+    hits, misses = compressed_bodies.hits, compressed_bodies.misses
+
+    first = client.get('/api/payments', params={'limit': 200}, headers={'Accept-Encoding': 'br'})
+    assert 'Accept-Encoding' in first.headers['vary']
+    plain = client.get('/api/payments', params={'limit': 200}, headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in plain.headers
+    assert first.content == plain.content
+
+    encoding, body = _raw_body('/api/payments', 'br', limit=200)
+    assert encoding == 'br'
+    assert len(body) < len(plain.content)
+    assert brotli.decompress(body) == plain.content
+    assert (compressed_bodies.hits - hits, compressed_bodies.misses - misses) == (1, 1)
+
+    # Each encoding is compressed and cached on its own
+    encoding, body = _raw_body('/api/payments', 'gzip', limit=200)
+    assert encoding == 'gzip'
+    assert gzip.decompress(body) == plain.content
+    assert compressed_bodies.misses - misses == 2
+
+
+def test_small_and_streamed_responses_are_left_alone():
+    small = client.get('/api/members', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in small.headers
+
+    _seed_payments(3000)
+    export = client.get('/api/export/payments', headers={'Accept-Encoding': 'gzip'})
+    assert 'content-encoding' not in export.headers
+    assert len(export.text.splitlines()) == 3000
+
+
+def test_rows_sharing_a_version_never_share_a_cached_body():
+    ids = [client.post('/api/houses', json={'houseNo': f'A-{i}', 'block': 'A', 'floor': '1',
+                                            'notes': f'house {i} ' * 200}).json()['id'] for i in range(2)]
+    # One batch update gives both rows the same updatedAt, so the same row ETag
+    client.post('/api/houses/batch', json={'operations': [
+        {'op': 'update', 'id': house_id, 'data': {'status': 'occupied'}} for house_id in ids]})
+    first, second = (client.get(f'/api/houses/{house_id}') for house_id in ids)
+    assert first.headers['etag'] == second.headers['etag']
+
+    for house_id in ids:
+        encoding, body = _raw_body(f'/api/houses/{house_id}', 'gzip')
+        assert encoding == 'gzip'
+        assert json.loads(gzip.decompress(body))['id'] == house_id
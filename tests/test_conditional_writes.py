@@ -0,0 +1,95 @@
+from fastapi.testclient import TestClient
+
+import database_simple
+from server import app
+
+client = TestClient(app)
+
+
+def _create_house(house_no='A-101'):
+    return client.post('/api/houses', json={'houseNo': house_no, 'block': 'A', 'floor': '1'}).json()
+
+
+def test_update_and_delete_are_single_statements(monkeypatch):
+    house = _create_house()
+    db = database_simple.get_db()
+    monkeypatch.setattr(db, 'get_row', lambda *args: (_ for _ in ()).throw(AssertionError('row was read first')))
+
+    assert client.put(f"/api/houses/{house['id']}", json={'status': 'occupied'}).json()['status'] == 'occupied'
+    assert client.delete(f"/api/houses/{house['id']}").status_code == 200
+    assert client.put('/api/houses/missing', json={'status': 'occupied'}).status_code == 404
+    assert client.delete('/api/houses/missing').status_code == 404
+
+
+def test_stale_if_match_is_rejected_with_409():
+    house = _create_house()
+    version = house['updatedAt']
+
+    # First admin saves against the version they loaded
+    first = client.put(f"/api/houses/{house['id']}", json={'ownerName': 'Asha'}, headers={'If-Match': f'"{version}"'})
+    assert first.status_code == 200
+    assert first.json()['updatedAt'] != version
+
+    # Second admin still holds the old version
+    second = client.put(f"/api/houses/{house['id']}", json={'ownerName': 'Ravi'}, headers={'If-Match': f'"{version}"'})
+    assert second.status_code == 409
+    assert second.json()['detail']['current']['ownerName'] == 'Asha'
+    assert client.delete(f"/api/houses/{house['id']}", headers={'If-Match': f'"{version}"'}).status_code == 409
+
+    current = first.json()['updatedAt']
+    assert client.delete(f"/api/houses/{house['id']}", headers={'If-Match': f'"{current}"'}).status_code == 200
+    assert client.put('/api/houses/missing', json={'status': 'vacant'}, headers={'If-Match': f'"{current}"'}).status_code == 404
+
+
+def test_etag_from_a_read_or_write_is_accepted_as_if_match():
+    house = _create_house()
+    detail = client.get(f"/api/houses/{house['id']}")
+    etag = detail.headers['etag']
+    assert not etag.startswith('W/')
+    assert client.get(f"/api/houses/{house['id']}", headers={'If-None-Match': etag}).status_code == 304
+
+    saved = client.put(f"/api/houses/{house['id']}", json={'ownerName': 'Asha'}, headers={'If-Match': etag})
+    assert saved.status_code == 200
+    assert saved.headers['etag'] != etag
+
+    stale = client.put(f"/api/houses/{house['id']}", json={'ownerName': 'Ravi'}, headers={'If-Match': etag})
+    assert stale.status_code == 409
+    assert stale.headers['etag'] == saved.headers['etag']
+
+    # The ETag of the write (or of the 409) is the one to send next
+    assert client.delete(f"/api/houses/{house['id']}", headers={'If-Match': stale.headers['etag']}).status_code == 200
+
+
+def test_list_tag_never_matches_a_row():
+    house = _create_house()
+    list_tag = client.get('/api/houses').headers['etag']
+    assert client.put(f"/api/houses/{house['id']}", json={'ownerName': 'Asha'},
+                      headers={'If-Match': list_tag}).status_code == 409
+
+
+def test_batch_version_accepts_the_row_etag():
+    house = _create_house()
+    etag = client.get(f"/api/houses/{house['id']}").headers['etag']
+    result = client.post('/api/houses/batch', json={'operations': [
+        {'op': 'update', 'id': house['id'], 'data': {'ownerName': 'Asha'}, 'version': etag}]}).json()
+    assert result['results'][0]['status'] == 200
+
+
+def test_rows_without_a_version_are_served_untagged():
+    from fastapi import FastAPI
+    from routes import houses
+
+    legacy = FastAPI()
+    legacy.include_router(houses.router, prefix='/api')
+    legacy_client = TestClient(legacy)
+    # Rows written before versions were stamped have no updatedAt
+    database_simple.get_db().insert_row('houses', {'id': 'h-old', 'houseNo': 'A-1', 'block': 'A', 'floor': '1',
+                                                   'updatedAt': None})
+
+    for http in (client, legacy_client):
+        response = http.get('/api/houses/h-old')
+        assert response.status_code == 200
+        assert 'etag' not in response.headers
+    updated = legacy_client.put('/api/houses/h-old', json={'status': 'occupied'})
+    assert updated.status_code == 200
+    assert updated.headers['etag']
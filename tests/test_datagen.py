@@ -0,0 +1,59 @@
+import json
+from collections import Counter
+
+from typer.testing import CliRunner
+
+from database_sqlite import SQLiteDB
+from datagen import TABLES, DatasetSpec, SocietyGenerator, app, block_name
+
+SPEC = DatasetSpec(seed=7, blocks=3, flats=30, members=80, vehicles=40, years=1, expenses_per_month=8)
+
+def _rows(spec: DatasetSpec):
+    return {table: list(rows()) for table, rows in SocietyGenerator(spec).tables().items()}
+
+def test_same_seed_same_rows():
+    first = _rows(SPEC)
+    assert first == _rows(SPEC)
+    other = _rows(DatasetSpec(**{**SPEC.__dict__, 'seed': 8}))
+    assert first['members'] != other['members']
+
+def test_rows_are_consistent():
+    rows = _rows(SPEC)
+    assert len(rows['houses']) == 30
+    assert len(rows['members']) == 80
+    assert len(rows['vehicles']) == 40
+    assert len(rows['maintenance_payments']) == 30 * 12
+    assert len(rows['expenditures']) == 8 * 12
+
+    per_house = Counter(member['house'] for member in rows['members'])
+    assert all(house['membersCount'] == per_house[house['houseNo']] for house in rows['houses'])
+    assert len({vehicle['number'] for vehicle in rows['vehicles']}) == 40
+    assert len({(p['house'], p['month']) for p in rows['maintenance_payments']}) == 30 * 12
+    for payment in rows['maintenance_payments']:
+        if payment['status'] == 'partial':
+            assert 0 < payment['amountPaid'] < payment['amount']
+        assert (payment['paidDate'] is None) == (payment['amountPaid'] == 0)
+    # Only the last month can still be pending
+    assert {p['month'] for p in rows['maintenance_payments'] if p['status'] == 'pending'} <= {'December 2025'}
+
+def test_block_names():
+    assert [block_name(n) for n in (0, 25, 26, 27)] == ['A', 'Z', 'AA', 'AB']
+
+def test_cli_writes_sqlite_and_ndjson(tmp_path):
+    sizes = ['--seed', '7', '--blocks', '3', '--flats', '30', '--members', '80', '--vehicles', '40',
+             '--years', '1', '--expenses-per-month', '8']
+    runner = CliRunner()
+    result = runner.invoke(app, ['--to', 'sqlite', '--output', str(tmp_path / 'society.db'), *sizes])
+    assert result.exit_code == 0, result.output
+    db = SQLiteDB(str(tmp_path / 'society.db'))
+    assert len(db.fetch_all('maintenance_payments')) == 360
+    assert db.verify_aggregates() == []
+
+    result = runner.invoke(app, ['--to', 'ndjson', '--output', str(tmp_path / 'data'), *sizes])
+    assert result.exit_code == 0, result.output
+    for table in TABLES:
+        lines = (tmp_path / 'data' / f'{table}.ndjson').read_text().splitlines()
+        assert [json.loads(line) for line in lines] == _rows(SPEC)[table]
+
+    result = runner.invoke(app, ['--to', 'sqlite', '--output', str(tmp_path / 'society.db'), *sizes])
+    assert result.exit_code != 0
@@ -0,0 +1,81 @@
+from fastapi.testclient import TestClient
+
+import database_simple
+from database_sqlite import SQLiteDB
+from server import app
+
+client = TestClient(app)
+
+
+def _create_house(house_no):
+    return client.post('/api/houses', json={'houseNo': house_no, 'block': 'A', 'floor': '1'}).json()
+
+
+def test_unchanged_list_returns_304_without_touching_the_database(monkeypatch):
+    _create_house('A-101')
+    first = client.get('/api/houses')
+    etag = first.headers['etag']
+
+    db = database_simple.get_db()
+    monkeypatch.setattr(db, 'list_rows', lambda *args: (_ for _ in ()).throw(AssertionError('database was queried')))
+
+    second = client.get('/api/houses', headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.headers['etag'] == etag
+    assert second.content == b''
+
+
+def test_writes_change_the_tag():
+    house = _create_house('A-101')
+    etag = client.get('/api/houses').headers['etag']
+    detail_etag = client.get(f"/api/houses/{house['id']}").headers['etag']
+
+    client.put(f"/api/houses/{house['id']}", json={'status': 'occupied'})
+
+    assert client.get('/api/houses', headers={'If-None-Match': etag}).status_code == 200
+    assert client.get(f"/api/houses/{house['id']}", headers={'If-None-Match': detail_etag}).status_code == 200
+
+
+def test_tag_varies_with_query_and_tables():
+    houses_page_1 = client.get('/api/houses', params={'limit': 1}).headers['etag']
+    houses_page_2 = client.get('/api/houses', params={'limit': 2}).headers['etag']
+    assert houses_page_1 != houses_page_2
+
+    # The expenditures summary includes collections, so payment writes invalidate it
+    etag = client.get('/api/expenditures').headers['etag']
+    client.post('/api/payments', json={
+        'house': 'A-101', 'owner': 'Owner', 'amount': 100, 'month': 'May 2025', 'dueDate': '2025-05-05',
+    })
+    assert client.get('/api/expenditures', headers={'If-None-Match': etag}).status_code == 200
+
+
+def test_tags_follow_database_state_across_workers(tmp_path):
+    path = str(tmp_path / 'society.db')
+    ours, theirs = SQLiteDB(path), SQLiteDB(path)
+    try:
+        ours.versions.ttl = theirs.versions.ttl = 60
+        house = ours.create_house({'id': 'h1', 'houseNo': 'A-101', 'block': 'A', 'floor': '1'})
+        etag = ours.table_etag(['houses'], '/api/houses?')
+        # Same rows, same tag, whichever worker answers
+        assert theirs.table_etag(['houses'], '/api/houses?') == etag
+
+        theirs.update_house(house['id'], {'status': 'occupied'})
+        assert theirs.table_etag(['houses'], '/api/houses?') != etag
+        # Ours still trusts its cached state until the TTL runs out
+        assert ours.table_etag(['houses'], '/api/houses?') == etag
+        ours.versions.ttl = 0
+        assert ours.table_etag(['houses'], '/api/houses?') == theirs.table_etag(['houses'], '/api/houses?')
+    finally:
+        ours.close()
+        theirs.close()
+
+
+def test_own_writes_invalidate_the_cached_state():
+    db = database_simple.get_db()
+    db.versions.ttl = 60
+    etag = db.table_etag(['houses'])
+    assert db.versions.cached_etag(['houses']) == etag
+
+    _create_house('A-101')
+    assert db.versions.cached_etag(['houses']) is None
+    assert db.table_etag(['houses']) != etag
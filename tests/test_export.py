@@ -0,0 +1,57 @@
+import csv
+import gzip
+import io
+import json
+import threading
+
+from fastapi.testclient import TestClient
+
+import database_simple
+from server import app
+
+client = TestClient(app)
+
+
+def _seed_payments(n):
+    database_simple.get_db().insert_rows('maintenance_payments', [
+        {'house': f'H-{i:05d}', 'owner': 'Owner', 'amount': 1500, 'month': 'May 2025', 'dueDate': '2025-05-10',
+         'status': 'paid' if i % 2 else 'pending'}
+        for i in range(n)
+    ])
+
+
+def test_ndjson_export_pages_through_the_database(monkeypatch):
+    _seed_payments(2500)
+    db = database_simple.get_db()
+    pages = []
+    original = db.list_rows
+    monkeypatch.setattr(db, 'list_rows', lambda table, query: pages.append(
+        (query.limit, threading.current_thread().name)) or original(table, query))
+
+    response = client.get('/api/export/payments')
+    assert response.headers['content-type'] == 'application/x-ndjson'
+    assert 'payments-' in response.headers['content-disposition']
+
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 2500
+    assert rows[0]['house'] == 'H-00000'
+    assert [limit for limit, _ in pages] == [1000] * 3
+    # Pages are fetched on the database pool, under its call timeout
+    assert all(thread.startswith('db') for _, thread in pages)
+
+
+def test_gzipped_csv_with_fields_and_filters():
+    _seed_payments(10)
+    response = client.get('/api/export/maintenance_payments',
+                          params={'format': 'csv', 'gzip': 'true', 'fields': 'house,status', 'status': 'paid'})
+    assert response.headers['content-type'] == 'application/gzip'
+
+    rows = list(csv.reader(io.StringIO(gzip.decompress(response.content).decode())))
+    assert rows[0] == ['house', 'status']
+    assert len(rows) == 6
+    assert {row[1] for row in rows[1:]} == {'paid'}
+
+
+def test_export_rejects_unknown_entities_and_fields():
+    assert client.get('/api/export/users').status_code == 404
+    assert client.get('/api/export/expenditures', params={'fields': 'attachmentData'}).status_code == 400
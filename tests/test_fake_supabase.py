@@ -0,0 +1,67 @@
+import time
+from datetime import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+import database_simple
+from database_simple import SupabaseDB
+from fake_supabase import APIError, FakeSupabaseClient
+from server import app
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def fake_supabase(monkeypatch):
+    """Run the API on SupabaseDB over the in-process fake"""
+    monkeypatch.setenv('DB_BACKEND', 'fake-supabase')
+
+
+def test_backend_is_supabase_db_over_the_fake():
+    db = database_simple.get_db()
+    assert isinstance(db, SupabaseDB) and isinstance(db.supabase, FakeSupabaseClient)
+
+
+def test_keyset_pages_with_ties_on_the_sort_key():
+    for i in range(5):
+        client.post('/api/houses', json={'houseNo': f'A-{i}', 'block': 'B' if i % 2 else 'A', 'floor': '1'})
+    seen, cursor = [], None
+    while True:
+        params = {'sort': 'block', 'limit': 2, **({'cursor': cursor} if cursor else {})}
+        body = client.get('/api/houses', params=params).json()
+        seen.extend(house['houseNo'] for house in body['list'])
+        cursor = body['pagination']['nextCursor']
+        if not cursor:
+            break
+    assert sorted(seen) == [f'A-{i}' for i in range(5)] and len(seen) == 5
+    assert [house['status'] for house in client.get('/api/houses').json()['list']] == ['vacant'] * 5
+
+
+def test_conditional_writes_and_unique_constraints():
+    house = client.post('/api/houses', json={'houseNo': 'A-1', 'block': 'A', 'floor': '1'}).json()
+    stale = {'If-Match': '"1999-01-01T00:00:00Z"'}
+    assert client.put(f"/api/houses/{house['id']}", json={'notes': 'x'}, headers=stale).status_code == 409
+    assert client.put(f"/api/houses/{house['id']}", json={'notes': 'x'}).json()['notes'] == 'x'
+
+    first = client.post('/api/payments/generate-monthly', params={'default_amount': 1500, 'month': '2025-05'}).json()
+    again = client.post('/api/payments/generate-monthly', params={'default_amount': 1500, 'month': '2025-05'}).json()
+    assert (first['created'], again['created'], again['skipped']) == (1, 0, 1)
+    payment = client.get('/api/payments').json()['list'][0]
+    assert payment['id'] == 1 and payment['latePayment'] is False and payment['amountPaid'] == 0
+
+
+def test_client_level_behaviour():
+    fake = FakeSupabaseClient(latency=0.02)
+    started = time.perf_counter()
+    fake.table('houses').select('*').eq('id', 'x').execute()
+    assert time.perf_counter() - started >= 0.02 and fake.requests == 1
+
+    with pytest.raises(TypeError):  # the real client cannot JSON-encode it either
+        fake.table('houses').update({'updatedAt': datetime.utcnow()})
+    with pytest.raises(APIError):
+        fake.table('houses').insert({'id': 'h', 'houseNo': 'A', 'block': 'A', 'floor': '1', 'status': 'sold'}).execute()
+    with pytest.raises(APIError):
+        fake.rpc('exec_sql', {'sql': 'select 1'}).execute()
+    fake.register_function('house_count', lambda c: c.table('houses').select('id', count='exact').execute().count)
+    assert fake.rpc('house_count').execute().data == 0
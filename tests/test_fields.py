@@ -0,0 +1,50 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import database_simple
+from server import LIST_MODELS, UNLISTED_FIELDS, app
+
+client = TestClient(app)
+
+ENDPOINTS = {
+    'houses': '/api/houses',
+    'members': '/api/members',
+    'vehicles': '/api/vehicles',
+    'maintenance_payments': '/api/payments',
+    'expenditures': '/api/expenditures',
+}
+
+
+def _rows(response):
+    return response.json()['list']
+
+
+def test_vehicle_gate_check_gets_only_what_it_asked_for(monkeypatch):
+    for i in range(3):
+        client.post('/api/vehicles', json={'number': f'GJ01AB{i:04d}', 'type': 'Four Wheeler', 'house': 'A-101'})
+    db = database_simple.get_db()
+    selected = []
+    original = db.list_rows
+    monkeypatch.setattr(db, 'list_rows', lambda table, query: selected.append(query.columns) or original(table, query))
+
+    first = client.get('/api/vehicles', params={'fields': 'house,number', 'sort': 'number', 'limit': 2})
+    assert _rows(first) == [{'number': 'GJ01AB0000', 'house': 'A-101'}, {'number': 'GJ01AB0001', 'house': 'A-101'}]
+    assert selected == [['house', 'number']]
+
+    # The cursor still works although neither the sort key nor id was returned
+    rest = client.get('/api/vehicles', params={'fields': 'house', 'sort': 'number', 'limit': 2,
+                                               'cursor': first.json()['pagination']['nextCursor']})
+    assert _rows(rest) == [{'house': 'A-101'}]
+
+
+@pytest.mark.parametrize('table', sorted(ENDPOINTS))
+def test_every_model_field_can_be_projected(table):
+    fields = set(LIST_MODELS[table].model_fields) - UNLISTED_FIELDS.get(table, set())
+    response = client.get(ENDPOINTS[table], params={'fields': ','.join(sorted(fields))})
+    assert response.status_code == 200
+
+
+def test_unknown_and_unlisted_fields_are_rejected():
+    assert client.get('/api/houses', params={'fields': 'houseNo,password'}).status_code == 400
+    assert client.get('/api/expenditures', params={'fields': 'attachmentData'}).status_code == 400
+    assert client.get('/api/houses', params={'fields': ','}).status_code == 400
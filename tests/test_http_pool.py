@@ -0,0 +1,88 @@
+import threading
+from dataclasses import replace
+
+import httpx
+import pytest
+from supabase import create_client
+from supabase.lib.client_options import SyncClientOptions
+
+import http_pool
+import metrics
+from benchmarks.bench_http_pool import StubServer, pooled_client, run
+from database_simple import SupabaseDB
+from http_pool import PoolConfig
+
+CONFIG = PoolConfig(max_connections=4, max_keepalive=4, http2=False)
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
+
+def _db(http: httpx.Client, url: str) -> SupabaseDB:
+    return SupabaseDB(client=create_client(url, 'test-key', options=SyncClientOptions(httpx_client=http)))
+
+def test_pool_reuses_connections(stub):
+    opened = metrics.HTTP_POOL_CONNECTIONS_OPENED.value()
+    in_flight = metrics.HTTP_POOL_IN_FLIGHT.value()
+    with pooled_client(CONFIG) as http:
+        db = _db(http, stub.url)
+        for _ in range(5):
+            db.ping()
+    assert metrics.HTTP_POOL_CONNECTIONS_OPENED.value() - opened == 1
+    assert metrics.HTTP_POOL_IN_FLIGHT.value() == in_flight
+
+    opened = metrics.HTTP_POOL_CONNECTIONS_OPENED.value()
+    with pooled_client(replace(CONFIG, max_keepalive=0)) as http:
+        db = _db(http, stub.url)
+        for _ in range(5):
+            db.ping()
+    assert metrics.HTTP_POOL_CONNECTIONS_OPENED.value() - opened == 5
+
+def test_saturated_pool_counts_timeouts(monkeypatch):
+    slow = StubServer(delay=0.3)
+    timeouts = metrics.HTTP_POOL_TIMEOUTS.value()
+    errors = []
+    config = replace(CONFIG, max_connections=1, pool_timeout=0.05)
+    try:
+        with pooled_client(config) as http:
+            monkeypatch.setattr(http_pool, '_client', http)
+
+            def call():
+                try:
+                    http.get(slow.url)
+                except httpx.PoolTimeout as e:
+                    errors.append(e)
+            threads = [threading.Thread(target=call) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            text = metrics.REGISTRY.render()
+    finally:
+        slow.close()
+    assert len(errors) == 1
+    assert metrics.HTTP_POOL_TIMEOUTS.value() - timeouts == 1
+    assert 'supabase_http_pool_connections{state="idle"} 1' in text
+    assert 'supabase_http_pool_max_connections 1' in text
+
+def test_supabase_db_shares_the_tuned_pool(stub, monkeypatch):
+    monkeypatch.setenv('SUPABASE_URL', stub.url)
+    monkeypatch.setenv('SUPABASE_SERVICE_ROLE_KEY', 'test-key')
+    monkeypatch.setenv('SUPABASE_MAX_CONNECTIONS', '7')
+    monkeypatch.setenv('SUPABASE_HTTP2', 'false')
+    http_pool.close_http_client()
+    try:
+        first, second = SupabaseDB(), SupabaseDB()
+        assert first.http_client is second.http_client is http_pool.get_http_client()
+        assert first.http_client.timeout.read == 10
+        first.ping()
+        assert 'supabase_http_pool_max_connections 7' in metrics.REGISTRY.render()
+    finally:
+        http_pool.close_http_client()
+
+def test_benchmark_warm_calls_open_no_connections(stub):
+    results = run(stub.url, 'test-key', calls=5, config=CONFIG)
+    assert results['cold']['connections_opened'] == 5
+    assert results['warm']['connections_opened'] == 0
@@ -0,0 +1,70 @@
+import io
+
+import pandas as pd
+from fastapi.testclient import TestClient
+
+import database_simple
+from server import app
+
+client = TestClient(app)
+
+
+def _upload(entity, content, filename='data.csv', **params):
+    return client.post(f'/api/import/{entity}', params=params, files={'file': (filename, content)})
+
+
+def test_houses_import_normalizes_and_reports_row_errors(monkeypatch):
+    lines = ['House No,Block, FLOOR ,Status,Owner Name']
+    lines += [f'T-{i:05d},T,{i % 20},{"Occupied" if i % 2 else ""},Owner {i}' for i in range(20000)]
+    lines += ['T-X1,T,1,bogus,', 'T-X2,,1,vacant,']
+    db = database_simple.get_db()
+    statements = []
+    original = db.insert_rows
+    monkeypatch.setattr(db, 'insert_rows', lambda table, rows, on_conflict=None: statements.append(len(rows)) or original(table, rows, on_conflict))
+
+    result = _upload('houses', '\n'.join(lines).encode()).json()
+
+    assert (result['rows'], result['imported'], result['failed']) == (20002, 20000, 2)
+    assert result['errors'] == [
+        {'row': 20002, 'column': 'status', 'error': 'must be one of occupied, vacant, maintenance'},
+        {'row': 20003, 'column': 'block', 'error': 'is required'},
+    ]
+    assert len(statements) == 40
+    assert client.get('/api/houses', params={'limit': 1}).json()['summary'] == {'total': 20000, 'occupied': 10000, 'vacant': 10000}
+
+
+def test_payments_import_parses_numbers_dates_and_reports_database_rejections():
+    csv = (
+        'house,owner,amount,month,dueDate,monthsCount,latePayment\n'
+        'A-101,Asha,"1,500",May 2025,10/05/2025,1,no\n'
+        'A-102,Ravi,1500.50,May 2025,2025-05-10,,yes\n'
+        'A-101,Asha,1500,May 2025,2025-05-10,1,\n'
+        'A-103,Meera,abc,May 2025,someday,1.5,maybe\n'
+    )
+    result = _upload('payments', csv.encode()).json()
+
+    assert (result['imported'], result['failed']) == (2, 2)
+    assert {(e['row'], e['column']) for e in result['errors'] if e['row'] == 5} == {
+        (5, 'amount'), (5, 'dueDate'), (5, 'monthsCount'), (5, 'latePayment')}
+    assert [e['row'] for e in result['errors'] if e['column'] is None] == [4]  # duplicate house/month
+
+    rows = {row['house']: row for row in database_simple.get_db().fetch_all('maintenance_payments')}
+    assert rows['A-101']['amount'] == 1500 and rows['A-101']['dueDate'] == '2025-05-10'
+    assert rows['A-102']['latePayment'] is True and rows['A-102']['monthsCount'] == 1
+
+
+def test_excel_dry_run_and_missing_columns():
+    buffer = io.BytesIO()
+    pd.DataFrame({'Name': ['Asha', 'Ravi'], 'House': ['A-101', 'A-102'], 'Role': ['owner', 'tenant'],
+                  'Phone': ['98200', '98201']}).to_excel(buffer, index=False)
+
+    dry = _upload('members', buffer.getvalue(), 'members.xlsx', dryRun='true').json()
+    assert (dry['dryRun'], dry['imported']) == (True, 2)
+    assert client.get('/api/members').json()['list'] == []
+
+    result = _upload('members', buffer.getvalue(), 'members.xlsx').json()
+    assert result['imported'] == 2
+    assert {m['role'] for m in client.get('/api/members').json()['list']} == {'Owner', 'Tenant'}
+
+    assert _upload('members', b'name,house\nAsha,A-101\n').status_code == 400
+    assert _upload('expenditures', b'title\nx\n').status_code == 404
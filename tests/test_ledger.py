@@ -0,0 +1,119 @@
+from fastapi.testclient import TestClient
+
+import database_simple
+from database_sqlite import SQLiteDB
+from server import app
+
+client = TestClient(app)
+
+
+def _paid_payment(paid_date, amount):
+    payment = client.post('/api/payments', json={
+        'house': 'A-101', 'owner': 'Owner', 'amount': amount, 'month': paid_date[:7],
+        'dueDate': paid_date, 'status': 'pending',
+    }).json()
+    database_simple.get_db().update_payment(payment['id'], {
+        'amountPaid': amount, 'status': 'paid', 'paidDate': paid_date,
+    })
+
+
+def _expenditure(date, amount):
+    client.post('/api/expenditures', json={
+        'title': 'Bill', 'category': 'Utilities', 'amount': amount, 'paymentMode': 'Bank', 'date': date,
+    })
+
+
+def test_running_balance_per_month():
+    client.get('/api/ledger')
+    _paid_payment('2025-04-03', 1000)
+    _paid_payment('2025-05-02', 1500)
+    _expenditure('2025-04-20', 400)
+    _expenditure('2025-06-01', 300)
+
+    ledger = client.get('/api/ledger').json()
+
+    assert ledger['balance'] == 1800
+    assert [(m['month'], m['net'], m['runningBalance']) for m in ledger['months']] == [
+        ('2025-04', 600, 600), ('2025-05', 1500, 2100), ('2025-06', -300, 1800),
+    ]
+    assert client.get('/api/admin/ledger/reconcile').json() == {'ok': True, 'mismatches': [], 'balance': 1800}
+
+
+def test_expenditure_summary_reads_the_ledger_without_scanning_payments(monkeypatch):
+    _paid_payment('2025-04-03', 1000)
+    _expenditure('2025-04-20', 250)
+    client.get('/api/ledger')
+
+    db = database_simple.get_db()
+    scanned = []
+    original = db.list_rows
+    monkeypatch.setattr(db, 'list_rows', lambda table, query: scanned.append(table) or original(table, query))
+
+    summary = client.get('/api/expenditures').json()['summary']
+
+    assert summary['totalCollection'] == 1000
+    assert summary['remainingBalance'] == 750
+    assert scanned == ['expenditures']
+
+
+def test_reconcile_detects_unrecorded_rows():
+    client.get('/api/ledger')
+    database_simple.get_db().insert_row('expenditures', {
+        'title': 'Untracked', 'category': 'Other', 'amount': 99, 'paymentMode': 'Cash', 'date': '2025-07-01',
+    })
+
+    report = client.get('/api/admin/ledger/reconcile').json()
+
+    assert not report['ok']
+    assert {'field': 'balance', 'expected': -99, 'actual': 0} in report['mismatches']
+
+
+def test_ledger_and_expenditure_summary_follow_other_workers(tmp_path):
+    path = str(tmp_path / 'society.db')
+    ours, theirs = SQLiteDB(path), SQLiteDB(path)
+    try:
+        ours.aggregates.check_interval = 0
+        assert ours.get_ledger()['balance'] == 0
+
+        payment = theirs.create_payment({
+            'id': 1, 'house': 'A-101', 'owner': 'Owner', 'amount': 1000, 'month': '2025-04',
+            'dueDate': '2025-04-05', 'status': 'pending',
+        })
+        theirs.update_payment(payment['id'], {'amountPaid': 1000, 'status': 'paid', 'paidDate': '2025-04-03'})
+        theirs.create_expenditure({
+            'id': 1, 'title': 'Bill', 'category': 'Utilities', 'amount': 400, 'paymentMode': 'Bank',
+            'date': '2025-04-20',
+        })
+
+        ledger = ours.get_ledger()
+        assert ledger['balance'] == 600
+        assert [(m['month'], m['runningBalance']) for m in ledger['months']] == [('2025-04', 600)]
+        summary = ours.get_expenditure_summary()
+        assert (summary['totalCollection'], summary['remainingBalance']) == (1000, 600)
+        assert ours.reconcile_ledger()['ok']
+    finally:
+        ours.close()
+        theirs.close()
+
+
+def test_ledger_follows_another_workers_update_between_ours(tmp_path):
+    path = str(tmp_path / 'society.db')
+    ours, theirs = SQLiteDB(path), SQLiteDB(path)
+    try:
+        ours.aggregates.check_interval = 0
+        for payment_id in (1, 2):
+            ours.create_payment({
+                'id': payment_id, 'house': f'A-10{payment_id}', 'owner': 'Owner', 'amount': 1000,
+                'month': '2025-04', 'dueDate': '2025-04-05', 'status': 'pending',
+            })
+        assert ours.get_ledger()['balance'] == 0
+
+        theirs.update_payment(1, {'amountPaid': 1000, 'status': 'paid', 'paidDate': '2025-04-03'})
+        ours.update_payment(2, {'amountPaid': 500, 'status': 'paid', 'paidDate': '2025-04-04'})
+
+        assert ours.get_ledger()['balance'] == 1500
+        assert ours.get_expenditure_summary()['totalCollection'] == 1500
+        assert ours.reconcile_ledger()['ok']
+    finally:
+        ours.close()
+        theirs.close()
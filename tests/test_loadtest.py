@@ -0,0 +1,33 @@
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+
+from benchmarks import loadtest
+from server import app
+
+
+def test_closed_loop_run_reports_every_endpoint_of_the_profile():
+    client = TestClient(app)
+    client.post('/api/houses', json={'houseNo': 'A-1', 'block': 'A', 'floor': '1'})
+    house_ids = [house['id'] for house in client.get('/api/houses').json()['list']]
+
+    samples, elapsed = asyncio.run(loadtest.run_load(
+        'http://testserver', 'mixed', concurrency=4, rate=0, duration=None, total_requests=120,
+        house_ids=house_ids, transport=httpx.ASGITransport(app=app)))
+    report = loadtest.summarize(samples, elapsed, slo_p95_ms=10_000, max_error_rate=0.0)
+
+    assert report['overall']['requests'] == 120
+    assert set(report['endpoints']) <= set(loadtest.PROFILES['mixed'])
+    assert len(report['endpoints']) >= 8
+    for stats in report['endpoints'].values():
+        assert stats['error_rate'] == 0 and 'slo_breaches' not in stats
+        assert stats['p50_ms'] <= stats['p95_ms'] <= stats['p99_ms'] <= stats['max_ms']
+
+
+def test_percentiles_and_slo_breaches():
+    values = [(float(ms), ms != 100) for ms in range(1, 101)]
+    stats = loadtest.summarize({'GET /x': values}, 10.0, slo_p95_ms=50, max_error_rate=0.005)['endpoints']['GET /x']
+    assert (stats['p50_ms'], stats['p95_ms'], stats['p99_ms']) == (50, 95, 99)
+    assert stats['throughput_rps'] == 10 and stats['error_rate'] == 0.01
+    assert len(stats['slo_breaches']) == 2
@@ -0,0 +1,42 @@
+from fastapi.testclient import TestClient
+
+import metrics
+from server import app
+
+client = TestClient(app)
+
+
+def test_requests_and_database_calls_are_measured_by_route_and_table():
+    requests_before = metrics.HTTP_REQUESTS.value(method='GET', route='/api/houses/{house_id}', status=404)
+    gets_before = metrics.DB_LATENCY.count(table='houses', op='get_row')
+    created = client.post('/api/houses', json={'houseNo': 'A-1', 'block': 'A', 'floor': '1'}).json()
+    client.get('/api/houses')  # first summary read rebuilds the aggregates from the table
+    lists_before = metrics.DB_LATENCY.count(table='houses', op='list_rows')
+    client.get('/api/houses/missing-1')
+    client.get('/api/houses/missing-2')
+    client.get('/api/houses')
+
+    assert metrics.HTTP_REQUESTS.value(method='GET', route='/api/houses/{house_id}', status=404) - requests_before == 2
+    assert metrics.DB_LATENCY.count(table='houses', op='get_row') - gets_before == 2
+    assert metrics.DB_LATENCY.count(table='houses', op='list_rows') - lists_before == 1
+    assert metrics.DB_ROWS.value(table='houses', op='insert_row') >= 1
+    assert created['houseNo'] == 'A-1'
+
+    body = client.get('/metrics').text
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/api/houses",status="200",le="+Inf"}' in body
+    assert 'db_call_duration_seconds_count{table="houses",op="get_row"}' in body
+    assert 'http_requests_in_flight 1' in body  # the /metrics request itself
+
+
+def test_histogram_buckets_are_cumulative():
+    histogram = metrics.Histogram('t_seconds', 'test', ('op',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, op='x')
+    assert histogram.samples() == [
+        't_seconds_bucket{op="x",le="0.1"} 2',
+        't_seconds_bucket{op="x",le="1"} 3',
+        't_seconds_bucket{op="x",le="+Inf"} 4',
+        't_seconds_sum{op="x"} 3.65',
+        't_seconds_count{op="x"} 4',
+    ]
@@ -0,0 +1,48 @@
+import uuid
+
+from fastapi.testclient import TestClient
+
+import database_simple
+from server import app
+
+client = TestClient(app)
+
+
+def _seed_houses(n):
+    database_simple.get_db().insert_rows('houses', [
+        {'id': str(uuid.uuid4()), 'houseNo': f'T-{i:05d}', 'block': 'T', 'floor': str(i % 20), 'ownerName': f'Owner {i}'}
+        for i in range(n)
+    ])
+
+
+def test_generation_is_idempotent_per_house_and_month():
+    _seed_houses(30)
+
+    first = client.post('/api/payments/generate-monthly', params={'default_amount': 1500, 'month': '2025-05'}).json()
+    second = client.post('/api/payments/generate-monthly', params={'default_amount': 1500, 'month': '2025-05'}).json()
+
+    assert (first['created'], first['skipped']) == (30, 0)
+    assert (second['created'], second['skipped']) == (0, 30)
+    assert first['month'] == 'May 2025'
+    assert client.get('/api/payments/summary', params={'month': 'May 2025'}).json()['total'] == 45000
+
+
+def test_five_thousand_flats_in_a_handful_of_statements(monkeypatch):
+    _seed_houses(5000)
+    db = database_simple.get_db()
+    calls = []
+    for name in ('list_rows', 'insert_rows', 'insert_row'):
+        original = getattr(db, name)
+        monkeypatch.setattr(db, name, lambda *args, _name=name, _original=original: calls.append(_name) or _original(*args))
+
+    result = client.post('/api/payments/generate-monthly', params={'default_amount': 1000, 'month': '2025-06'}).json()
+
+    assert result['created'] == 5000
+    assert calls.count('insert_row') == 0
+    assert calls.count('insert_rows') == 10
+    assert calls.count('list_rows') <= 6
+
+
+def test_rejects_malformed_month():
+    response = client.post('/api/payments/generate-monthly', params={'default_amount': 1000, 'month': 'May'})
+    assert response.status_code == 400
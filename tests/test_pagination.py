@@ -0,0 +1,80 @@
+from fastapi.testclient import TestClient
+
+from server import app
+
+client = TestClient(app)
+
+
+def _create_houses(n):
+    for i in range(n):
+        response = client.post('/api/houses', json={
+            'houseNo': f'A-{i:03d}',
+            'block': 'A' if i % 2 == 0 else 'B',
+            'floor': '1',
+            'status': 'occupied' if i % 3 == 0 else 'vacant',
+        })
+        assert response.status_code == 200
+
+
+def test_cursor_walks_every_row_once():
+    _create_houses(25)
+
+    seen, cursor = [], None
+    while True:
+        params = {'limit': 10}
+        if cursor:
+            params['cursor'] = cursor
+        body = client.get('/api/houses', params=params).json()
+        seen.extend(h['houseNo'] for h in body['list'])
+        cursor = body['pagination']['nextCursor']
+        if not body['pagination']['hasMore']:
+            break
+
+    assert seen == [f'A-{i:03d}' for i in range(25)]
+    assert body['summary'] == {'total': 25, 'occupied': 9, 'vacant': 16}
+    assert body['pagination']['total'] == 25
+
+
+def test_filters_and_descending_sort():
+    _create_houses(10)
+
+    body = client.get('/api/houses', params={'block': 'B', 'status': 'vacant', 'order': 'desc'}).json()
+
+    assert [h['houseNo'] for h in body['list']] == ['A-007', 'A-005', 'A-001']
+    # The summary covers every house, the pagination total only the matching ones
+    assert body['summary']['total'] == 10
+    assert body['pagination']['total'] == 3
+    assert client.get('/api/houses', params={'block': 'B', 'limit': 2}).json()['pagination']['total'] == 5
+
+
+def test_payment_due_date_range():
+    for month in range(1, 7):
+        client.post('/api/payments', json={
+            'house': 'A-001', 'owner': 'Owner', 'amount': 1000,
+            'month': f'2025-{month:02d}', 'dueDate': f'2025-{month:02d}-05',
+        })
+
+    body = client.get('/api/payments', params={'dueFrom': '2025-02-01', 'dueTo': '2025-04-30'}).json()
+
+    assert [p['dueDate'] for p in body['list']] == ['2025-02-05', '2025-03-05', '2025-04-05']
+
+
+def test_invalid_sort_and_cursor_are_rejected():
+    assert client.get('/api/houses', params={'sort': 'notes'}).status_code == 400
+    assert client.get('/api/houses', params={'cursor': 'not-a-cursor'}).status_code == 400
+
+
+def test_members_and_vehicles_share_the_list_contract():
+    for i in range(3):
+        client.post('/api/members', json={'name': f'M{i}', 'house': 'A-001', 'role': 'Owner', 'phone': '1'})
+        client.post('/api/vehicles', json={'number': f'GJ{i}', 'type': 'Two Wheeler', 'house': 'A-001'})
+
+    for path in ('/api/members', '/api/vehicles'):
+        first = client.get(path, params={'limit': 2})
+        assert 'x-next-cursor' not in first.headers
+        body = first.json()
+        assert len(body['list']) == 2
+        assert body['pagination']['hasMore']
+        rest = client.get(path, params={'limit': 2, 'cursor': body['pagination']['nextCursor']}).json()
+        assert len(rest['list']) == 1
+        assert rest['pagination'] == {'pageSize': 2, 'nextCursor': None, 'hasMore': False}
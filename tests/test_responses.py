@@ -0,0 +1,43 @@
+import json
+
+from fastapi.testclient import TestClient
+
+from models import House, Member
+from server import app
+
+client = TestClient(app)
+
+
+def test_trusted_rows_serialize_like_the_models_and_keep_headers():
+    for i in range(3):
+        client.post('/api/houses', json={'houseNo': f'A-{i}', 'block': 'A', 'floor': '1'})
+        client.post('/api/members', json={'name': f'M{i}', 'house': f'A-{i}', 'role': 'Owner', 'phone': '1'})
+
+    houses = client.get('/api/houses')
+    assert houses.headers['etag']
+    for row in houses.json()['list']:
+        assert row == House(**row).model_dump(mode='json')
+
+    members = client.get('/api/members', params={'limit': 2}).json()
+    assert members['pagination']['nextCursor']
+    assert [Member(**row).model_dump(mode='json') for row in members['list']] == members['list']
+
+
+def test_both_encoders_write_datetimes_and_decimals_the_way_the_api_stores_them(monkeypatch):
+    from datetime import date, datetime, timedelta, timezone
+    from decimal import Decimal
+
+    import responses
+
+    content = {
+        'updatedAt': datetime(2025, 5, 10, 8, 30),
+        'paidAt': datetime(2025, 5, 10, 14, 0, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+        'dueDate': date(2025, 5, 10),
+        'amount': Decimal('1500.50'),
+        'count': Decimal('3'),
+    }
+    expected = {'updatedAt': '2025-05-10T08:30:00Z', 'paidAt': '2025-05-10T08:30:00Z', 'dueDate': '2025-05-10',
+                'amount': 1500.5, 'count': 3}
+    for encoder in ('orjson', 'json'):
+        monkeypatch.setattr(responses, 'JSON_ENCODER', encoder)
+        assert json.loads(responses.FastJSONResponse(content).body) == expected
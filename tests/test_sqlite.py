@@ -0,0 +1,151 @@
+import sqlite3
+from dataclasses import replace
+
+import pytest
+
+from database_sqlite import COLUMN_MIGRATIONS, SQLiteDB
+from repository import ListQuery, TableState
+
+
+@pytest.fixture
+def db():
+    database = SQLiteDB()
+    yield database
+    database.close()
+
+
+def _house(house_id, house_no, block='A', status='vacant', **extra):
+    return {'id': house_id, 'houseNo': house_no, 'block': block, 'floor': '1', 'status': status, **extra}
+
+
+def _payment(house, month, **extra):
+    return {'house': house, 'owner': 'Owner', 'amount': 1000, 'month': month, 'dueDate': f'{month}-05', **extra}
+
+
+def test_insert_row_returns_the_stored_row(db):
+    row = db.insert_row('maintenance_payments', _payment('A-101', '2025-05', latePayment=1))
+
+    assert row['id'] == 1
+    assert row['status'] == 'pending'
+    assert row['amountPaid'] == 0
+    assert row['latePayment'] is True
+    assert row['createdAt']
+
+    with pytest.raises(sqlite3.IntegrityError):
+        db.insert_row('maintenance_payments', _payment('A-101', '2025-05'))
+    with pytest.raises(ValueError):
+        db.insert_row('houses', {**_house('h1', 'A-1'), 'password': 'x'})
+
+
+def test_insert_rows_skips_conflicts_only_when_asked(db):
+    db.insert_row('maintenance_payments', _payment('A-101', '2025-05'))
+    batch = [_payment('A-101', '2025-05'), _payment('A-102', '2025-05'), _payment('A-101', '2025-06', remarks='late')]
+
+    # Without on_conflict the whole statement fails and inserts nothing
+    with pytest.raises(sqlite3.IntegrityError):
+        db.insert_rows('maintenance_payments', batch)
+    assert db.count_rows('maintenance_payments', ListQuery()) == 1
+
+    inserted = db.insert_rows('maintenance_payments', batch, on_conflict=('house', 'month'))
+    assert sorted((row['house'], row['month']) for row in inserted) == [('A-101', '2025-06'), ('A-102', '2025-05')]
+    assert db.count_rows('maintenance_payments', ListQuery()) == 3
+    assert db.insert_rows('maintenance_payments', []) == []
+
+
+def test_list_rows_filters_ranges_sorts_and_pages(db):
+    for i in range(6):
+        db.insert_row('maintenance_payments', _payment(f'A-{i % 2}', f'2025-0{i + 1}', status='paid' if i < 3 else 'pending'))
+
+    query = ListQuery(filters={'house': 'A-0'}, ranges={'dueDate': ('2025-02-01', None)}, sort='dueDate',
+                      descending=True, limit=1, columns=['month'])
+    first = db.list_rows('maintenance_payments', query)
+    assert [row['month'] for row in first.rows] == ['2025-05']
+    assert set(first.rows[0]) == {'month', 'dueDate', 'id'}  # keyset columns are always selected
+    assert first.has_more
+
+    second = db.list_rows('maintenance_payments', replace(query, cursor=first.next_cursor))
+    assert [row['month'] for row in second.rows] == ['2025-03']
+    assert not second.has_more
+
+    assert db.count_rows('maintenance_payments', ListQuery(filters={'status': 'paid'})) == 3
+    assert db.count_rows('maintenance_payments', ListQuery(ranges={'dueDate': (None, '2025-02-28')})) == 2
+    with pytest.raises(ValueError):
+        db.list_rows('maintenance_payments', ListQuery(filters={'password': 'x'}))
+
+
+def test_update_row_only_matches_the_expected_version(db):
+    db.insert_row('houses', _house('h1', 'A-1', updatedAt='v1'))
+
+    assert db.update_row('houses', 'h1', {'status': 'occupied', 'updatedAt': 'v2'}, {'updatedAt': 'v0'}) is None
+    assert db.get_row('houses', 'h1')['status'] == 'vacant'
+
+    updated = db.update_row('houses', 'h1', {'status': 'occupied', 'updatedAt': 'v2'}, {'updatedAt': 'v1'})
+    assert (updated['status'], updated['updatedAt']) == ('occupied', 'v2')
+    # Null-safe: a row without notes matches expected None
+    assert db.update_row('houses', 'h1', {'notes': 'corner'}, {'notes': None})['notes'] == 'corner'
+    assert db.update_row('houses', 'missing', {'status': 'vacant'}) is None
+
+
+def test_delete_with_expected_and_in_bulk(db):
+    for i in range(3):
+        db.insert_row('houses', _house(f'h{i}', f'A-{i}', updatedAt='v1'))
+
+    assert not db.delete_row('houses', 'h0', {'updatedAt': 'v0'})
+    assert db.delete_row('houses', 'h0', {'updatedAt': 'v1'})
+    assert not db.delete_row('houses', 'h0')
+    assert sorted(db.delete_rows('houses', ['h1', 'h2', 'missing'])) == ['h1', 'h2']
+    assert db.count_rows('houses', ListQuery()) == 0
+
+
+def test_table_state_counts_every_row_written(db):
+    assert db.table_state('houses') == TableState(0)
+    db.insert_rows('houses', [_house('h1', 'A-1'), _house('h2', 'A-2')])
+    db.update_row('houses', 'h1', {'status': 'occupied'})
+    db.update_row('houses', 'h2', {'status': 'occupied'}, {'status': 'maintenance'})  # matches nothing
+    db.insert_rows('houses', [_house('h1', 'A-1')], on_conflict=('id',))  # skipped
+    assert db.table_state('houses') == TableState(3)
+
+    # Writes that bypass the repository count too
+    db.conn.execute("DELETE FROM houses WHERE id = 'h2'")
+    assert db.table_state('houses') == TableState(4)
+    assert db.table_state('members') == TableState(0)
+
+
+def test_schema_and_column_migrations_apply_to_an_existing_file(tmp_path):
+    path = str(tmp_path / 'society.db')
+    conn = sqlite3.connect(path)
+    # An expenditures table as the first release created it, before blob references
+    conn.executescript('''
+        CREATE TABLE expenditures (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, title TEXT NOT NULL, category TEXT NOT NULL,
+            amount REAL NOT NULL, "paymentMode" TEXT NOT NULL, date TEXT NOT NULL, description TEXT,
+            "attachmentName" TEXT, "attachmentData" TEXT, "createdAt" TEXT, "updatedAt" TEXT
+        );
+        INSERT INTO expenditures (title, category, amount, "paymentMode", date)
+        VALUES ('Plumber', 'Repairs', 800, 'Cash', '2025-05-03');
+    ''')
+    conn.close()
+
+    for _ in range(2):  # reopening is a no-op
+        db = SQLiteDB(path)
+        columns = {row['name'] for row in db.conn.execute('PRAGMA table_info("expenditures")')}
+        assert {column for table, column, _ in COLUMN_MIGRATIONS if table == 'expenditures'} <= columns
+        assert db.get_row('expenditures', 1)['title'] == 'Plumber'
+        assert db.get_row('expenditures', 1)['attachmentRef'] is None
+        # The other tables come from SCHEMA
+        assert db.table_state('houses') == TableState(0)
+        db.close()
+
+
+def test_file_databases_run_in_wal_mode(tmp_path):
+    db = SQLiteDB(str(tmp_path / 'society.db'))
+    try:
+        assert db.conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    finally:
+        db.close()
+
+    memory = SQLiteDB()
+    try:
+        assert memory.conn.execute('PRAGMA journal_mode').fetchone()[0] == 'memory'
+    finally:
+        memory.close()
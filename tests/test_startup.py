@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+import database_simple
+import server
+from server import app
+
+from .conftest import BACKEND_DIR
+
+# Generous enough for a loaded CI box; a heavy module imported at startup again blows well past it
+IMPORT_BUDGET = float(os.environ.get('STARTUP_IMPORT_BUDGET', '3'))
+WARMUP_BUDGET = float(os.environ.get('STARTUP_WARMUP_BUDGET', '3'))
+
+def test_import_time_and_deferred_modules():
+    script = ("import json, sys, time; started = time.perf_counter(); import server; "
+              "print(json.dumps({'seconds': time.perf_counter() - started, "
+              "'loaded': [m for m in ('pandas', 'numpy', 'supabase') if m in sys.modules]}))")
+    output = subprocess.run([sys.executable, '-c', script], cwd=BACKEND_DIR, capture_output=True, text=True,
+                            check=True, env={**os.environ, 'DB_BACKEND': 'sqlite', 'SQLITE_PATH': ':memory:'})
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    assert result['loaded'] == []
+    assert result['seconds'] < IMPORT_BUDGET
+
+def test_startup_warms_client_pool_caches_and_schema():
+    app.openapi_schema = None
+    started = time.perf_counter()
+    with TestClient(app):
+        elapsed = time.perf_counter() - started
+        report = app.state.warmup
+        assert report.ok, report.errors
+        assert set(report.steps) == {'client', 'pool', 'caches', 'openapi'}
+        db = database_simple.get_async_db()
+        assert len(db._executor._threads) == db.max_workers
+        assert db.repo.aggregates._built
+        assert app.openapi_schema is not None
+    assert elapsed < WARMUP_BUDGET
+
+def test_readiness_pings_the_database():
+    client = TestClient(app)
+    response = client.get('/api/health/ready')
+    assert response.status_code == 200
+    assert response.json()['database']['status'] == 'up'
+    assert 'desc="1 calls"' in response.headers['server-timing']
+    assert 'houses.list_rows' in response.headers['server-timing']
+
+    response = client.get('/api/health/live')
+    assert response.json()['status'] == 'alive'
+    assert 'desc="0 calls"' in response.headers['server-timing']
+
+def test_readiness_fails_when_the_database_does_not_answer(monkeypatch):
+    client = TestClient(app)
+    repo = database_simple.get_db()
+
+    def broken():
+        raise ConnectionError("connection refused")
+    monkeypatch.setattr(repo, 'ping', broken)
+    response = client.get('/api/health/ready')
+    assert response.status_code == 503
+    assert response.json()['database']['error'] == 'connection refused'
+    assert client.get('/api/health').json() == {
+        'status': 'unhealthy', 'database': 'unreachable', 'error': 'connection refused'}
+    assert client.get('/api/health/live').status_code == 200
+
+    monkeypatch.setattr(server, 'READINESS_TIMEOUT', 0.05)
+    monkeypatch.setattr(repo, 'ping', lambda: time.sleep(0.3))
+    response = client.get('/api/health/ready')
+    assert response.status_code == 503
+    assert 'no response within' in response.json()['database']['error']
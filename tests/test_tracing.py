@@ -0,0 +1,52 @@
+import logging
+
+from fastapi.testclient import TestClient
+
+import database_simple
+from server import app
+from tracing import trace_calls
+
+client = TestClient(app)
+
+
+def _timings(response):
+    entries = {}
+    for entry in response.headers['server-timing'].split(', '):
+        name, *params = entry.split(';')
+        entries[name] = dict(param.split('=', 1) for param in params)
+    return entries
+
+
+def test_server_timing_reports_each_table_operation():
+    client.post('/api/houses', json={'houseNo': 'A-1', 'block': 'A', 'floor': '1'})
+    timings = _timings(client.get('/api/houses'))
+    assert {'total', 'db', 'houses.list_rows'} <= set(timings)
+    assert timings['houses.list_rows']['desc'] == '"2 calls"'  # page + first aggregate rebuild
+
+
+def test_monthly_billing_stays_within_a_fixed_number_of_calls():
+    database_simple.get_db().insert_rows('houses', [
+        {'id': f'h{i}', 'houseNo': f'A-{i:04d}', 'block': 'A', 'floor': '1'} for i in range(1200)
+    ])
+    response = client.post('/api/payments/generate-monthly', params={'default_amount': 1500, 'month': '2025-05'})
+    assert response.json()['created'] == 1200
+    timings = _timings(response)
+    assert timings['houses.list_rows']['desc'] == '"2 calls"'
+    assert timings['maintenance_payments.insert_rows']['desc'] == '"3 calls"'
+
+
+def test_n_plus_one_and_budget_warnings(caplog):
+    db = database_simple.get_db()
+    with trace_calls() as trace:
+        for i in range(6):
+            db.get_row('houses', f'missing-{i}')
+    assert trace.repeated_calls() == [('houses', 'get_row', 6)]
+
+    database_simple.get_db().insert_rows('houses', [
+        {'id': f'h{i}', 'houseNo': f'A-{i}', 'block': 'A', 'floor': '1'} for i in range(25)
+    ])
+    with caplog.at_level(logging.WARNING, logger='tracing'):
+        client.post('/api/houses/batch', json={'operations': [
+            {'op': 'update', 'id': f'h{i}', 'data': {'notes': 'x'}} for i in range(25)]})
+    assert any('possible N+1' in record.message for record in caplog.records)
+    assert any('database calls (budget 20)' in record.message for record in caplog.records)